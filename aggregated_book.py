@@ -0,0 +1,277 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from base_api import API
+from fixed_point import FIXED, FLOAT, Fixed, format_scaled
+
+# one side of venue book: scaled prices and amounts
+VenueSide = Tuple[List[int], List[int]]
+# one side of merged book: scaled prices, scaled amounts and venues
+MergedSide = Tuple[List[int], List[int], List[str]]
+
+
+class AggregatedOrderBook:
+    """
+    Consolidated order book of one market on several exchanges.
+
+    refresh() calls get_order_book of every venue at the same time and
+    waits for each not longer than its timeout. Venue which didn't answer
+    in time or failed keeps its previous book until it gets older than
+    max_age. Books are merged into price sorted levels tagged with venue,
+    kept as integers scaled to the largest decimals of all venues, so
+    queries do no parsing and no float rounding.
+
+    with AggregatedOrderBook({'kickex': Kickex('del_usdt'), 'paper': paper}) as book:
+        book.refresh()
+        book.best_ask()  # {'ok': True, 'result': {'price': '1.0010', 'amount': '5', 'venue': 'kickex'}}
+        book.cost_to_fill('buy', '100')
+    """
+
+    def __init__(
+            self,
+            venues: Union[Dict[str, API], Iterable[API]],
+            timeout: float = 1.0,
+            timeouts: Optional[Dict[str, float]] = None,
+            max_age: Optional[float] = 10.0,
+            numeric: str = FLOAT,
+    ) -> None:
+        """
+        :param venues: {venue name: API}, or APIs named after their class
+        :param timeout: float. seconds to wait for a venue book
+        :param timeouts: {venue name: seconds} exceptions from timeout
+        :param max_age: float. seconds after which venue book is left out
+            of the merged one, None to keep it forever
+        :param numeric: 'float' gives strings like Kickex, 'fixed' gives Fixed
+        """
+        if numeric not in (FLOAT, FIXED):
+            raise ValueError(f'unknown numeric mode {numeric!r}')
+        if not isinstance(venues, dict):
+            named = {}
+            for api in venues:
+                name = type(api).__name__.lower()
+                named[name if name not in named else f'{name}_{len(named)}'] = api
+            venues = named
+        if not venues:
+            raise Exception('venues must not be empty')
+        self.venues: Dict[str, API] = dict(venues)
+        self.timeouts = {venue: timeout for venue in self.venues}
+        self.timeouts.update(timeouts or {})
+        self.max_age = max_age
+        self.numeric = numeric
+        # venue: (time.monotonic() of book, price decimals, amount decimals, asks, bids)
+        self.books: Dict[str, tuple] = {}
+        self.pending: Dict[str, Future] = {}
+        self.executor = ThreadPoolExecutor(
+            max_workers=len(self.venues), thread_name_prefix='aggregated_book'
+        )
+        # (price decimals, amount decimals, asks, bids), sides are best first
+        # (scaled prices, scaled amounts, venues). Replaced as a whole by
+        # merge, so readers in other threads take it once and see one merge
+        self.merged: Tuple[int, int, MergedSide, MergedSide] = (0, 0, ([], [], []), ([], [], []))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop worker threads, venues are not closed.
+        """
+        self.executor.shutdown(wait=False)
+
+    def refresh(self) -> Dict[str, dict]:
+        """
+        Download books of all venues concurrently and merge them.
+
+        Venue whose previous request is still running is not asked again,
+        so slow venue never gets more than one request in flight.
+
+        :return: {venue: {'ok': bool, 'result': {'age': seconds of used book,
+            'message': error if venue failed}}}
+        """
+        started = time.monotonic()
+        for venue, api in self.venues.items():
+            if venue not in self.pending:
+                self.pending[venue] = self.executor.submit(api.get_order_book)
+
+        status = {}
+        for venue, future in list(self.pending.items()):
+            deadline = started + self.timeouts[venue]
+            try:
+                result = future.result(max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                status[venue] = {'ok': False, 'result': {'message': 'timeout'}}
+                continue
+            except Exception as e:
+                result = {'ok': False, 'result': {'message': repr(e)}}
+            del self.pending[venue]
+            if result['ok']:
+                try:
+                    self.books[venue] = (time.monotonic(),) + self.scale_book(result['result'])
+                except (KeyError, TypeError, ValueError, ArithmeticError) as e:
+                    result = {'ok': False, 'result': {'message': f'bad order book: {e!r}'}}
+            status[venue] = {'ok': result['ok'], 'result': {} if result['ok'] else result['result']}
+
+        self.merge()
+        now = time.monotonic()
+        for venue, venue_status in status.items():
+            if venue in self.books:
+                venue_status['result']['age'] = now - self.books[venue][0]
+        return {venue: status[venue] for venue in self.venues}
+
+    @staticmethod
+    def scale_book(levels: dict) -> Tuple[int, int, VenueSide, VenueSide]:
+        """
+        :param levels: get_order_book result, strings, floats or Fixed
+        :return: (price decimals, amount decimals, asks, bids)
+        """
+        parse = Fixed.parse
+        sides = [
+            [(parse(price), parse(amount)) for price, amount in levels[name]]
+            for name in ('asks', 'bids')
+        ]
+        price_decimals = max((price.decimals for side in sides for price, _ in side), default=0)
+        amount_decimals = max((amount.decimals for side in sides for _, amount in side), default=0)
+        asks, bids = [
+            (
+                [price.rescale(price_decimals).value for price, _ in side],
+                [amount.rescale(amount_decimals).value for _, amount in side],
+            )
+            for side in sides
+        ]
+        return price_decimals, amount_decimals, asks, bids
+
+    def merge(self) -> None:
+        now = time.monotonic()
+        books = [
+            (venue, book) for venue, book in self.books.items()
+            if self.max_age is None or now - book[0] <= self.max_age
+        ]
+        price_decimals = max((book[1] for _, book in books), default=0)
+        amount_decimals = max((book[2] for _, book in books), default=0)
+        merged = []
+        for sign, side in ((1, 3), (-1, 4)):  # asks ascending, bids descending
+            levels = []
+            for order, (venue, book) in enumerate(books):
+                price_scale = 10 ** (price_decimals - book[1])
+                amount_scale = 10 ** (amount_decimals - book[2])
+                prices, amounts = book[side]
+                levels.extend(
+                    (sign * price * price_scale, order, amount * amount_scale, venue)
+                    for price, amount in zip(prices, amounts)
+                    if amount > 0
+                )
+            levels.sort()  # by price, then venues in given order
+            merged.append((
+                [sign * level[0] for level in levels],
+                [level[2] for level in levels],
+                [level[3] for level in levels],
+            ))
+        self.merged = (price_decimals, amount_decimals, merged[0], merged[1])
+
+    def to_number(self, value: int, decimals: int) -> Union[str, Fixed]:
+        if self.numeric == FIXED:
+            return Fixed(value, decimals)
+        return format_scaled(value, decimals)
+
+    def get_order_book(self) -> dict:
+        """
+        :return: {'ok': True, 'result': {
+            'asks': [(price, amount, venue), ...],
+            'bids': [(price, amount, venue), ...],
+        }}, best levels first
+        """
+        price_decimals, amount_decimals, asks, bids = self.merged
+        result = {}
+        for name, (prices, amounts, venues) in (('asks', asks), ('bids', bids)):
+            result[name] = [
+                (
+                    self.to_number(price, price_decimals),
+                    self.to_number(amount, amount_decimals),
+                    venue,
+                )
+                for price, amount, venue in zip(prices, amounts, venues)
+            ]
+        return {'ok': True, 'result': result}
+
+    def best(self, side: str) -> dict:
+        price_decimals, amount_decimals, asks, bids = self.merged
+        prices, amounts, venues = asks if side == 'asks' else bids
+        if not prices:
+            return {'ok': False, 'result': {'message': 'order book is empty'}}
+        return {
+            'ok': True,
+            'result': {
+                'price': self.to_number(prices[0], price_decimals),
+                'amount': self.to_number(amounts[0], amount_decimals),
+                'venue': venues[0],
+            },
+        }
+
+    def best_bid(self) -> dict:
+        return self.best('bids')
+
+    def best_ask(self) -> dict:
+        return self.best('asks')
+
+    def cost_to_fill(self, side: str, amount) -> dict:
+        """
+        Price of taking amount from the merged book, best levels first.
+
+        :param side: string. 'buy' takes asks, 'sell' takes bids
+        :param amount: string, Fixed or number. amount in base currency
+
+        :return: {
+            'ok': True,  # False if books don't have so much, result is then
+                         # for available amount and has 'message'
+            'result': {
+                'amount': '100',  # filled
+                'cost': '100.2',  # in quote currency
+                'average_price': '1.002',
+                'worst_price': '1.004',
+                'venues': {'kickex': '60', 'paper': '40'},  # amount per venue
+            }
+        }
+        """
+        if side not in ('buy', 'sell'):
+            raise ValueError(f'side must be buy or sell, not {side!r}')
+        price_decimals, amount_decimals, asks, bids = self.merged
+        prices, amounts, venues = asks if side == 'buy' else bids
+        wanted = remaining = Fixed.parse(amount).rescale(amount_decimals).value
+        cost = 0
+        worst = None
+        per_venue: Dict[str, int] = {}
+        for price, level_amount, venue in zip(prices, amounts, venues):
+            if remaining <= 0:
+                break
+            taken = min(remaining, level_amount)
+            cost += taken * price
+            remaining -= taken
+            worst = price
+            per_venue[venue] = per_venue.get(venue, 0) + taken
+
+        filled = wanted - remaining
+        result = {
+            'amount': self.to_number(filled, amount_decimals),
+            'cost': self.to_number(cost, price_decimals + amount_decimals),
+            'average_price': None,
+            'worst_price': None if worst is None else self.to_number(worst, price_decimals),
+            'venues': {
+                venue: self.to_number(taken, amount_decimals) for venue, taken in per_venue.items()
+            },
+        }
+        if filled:
+            average = Fixed(cost, price_decimals + amount_decimals).divide(
+                Fixed(filled, amount_decimals), price_decimals
+            )
+            result['average_price'] = (
+                average if self.numeric == FIXED else format_scaled(average.value, price_decimals)
+            )
+        if remaining > 0:
+            result['message'] = 'not enough liquidity'
+            return {'ok': False, 'result': result}
+        return {'ok': True, 'result': result}
@@ -0,0 +1,372 @@
+import asyncio
+from typing import TYPE_CHECKING, AsyncIterator, Optional, Union
+
+import aiohttp
+
+from base_api import AsyncAPI, ResponseException
+from fixed_point import Fixed
+from kickex_api import Kickex
+from pair_metadata import PairSpec
+from rate_limiter import (
+    CRITICAL, HIGH, HISTORY, LOW, MARKET, NORMAL, TRADING,
+)
+
+if TYPE_CHECKING:
+    from history_store import OrderHistoryStore
+
+
+class AsyncKickex(Kickex, AsyncAPI):
+    """
+    asyncio wrapper for kickex.com exchange api.
+
+    Signing and parse_* methods are inherited from Kickex, only transport
+    differs: every endpoint method is a coroutine and all of them share one
+    aiohttp connection pool, so hundreds of calls can be gathered at once.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def create_session(
+            self,
+            pool_size: int,
+            retries: int,
+            backoff_factor: float,
+    ) -> Optional[aiohttp.ClientSession]:
+        """
+        aiohttp session must be created inside running event loop,
+        so here we only remember settings. See get_session.
+        """
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.pool_owner: Optional[AsyncKickex] = None  # set by for_market
+        return None
+
+    def for_market(self, market: str) -> 'AsyncKickex':
+        """
+        See Kickex.for_market. Session is opened lazily, so the copy asks
+        this client for it and all copies share one pool, whichever of
+        them opens it first.
+        """
+        client = super().for_market(market)
+        client.pool_owner = self.pool_owner or self
+        return client
+
+    def start_recording(self, path: str) -> None:
+        """
+        Not supported, recording wraps requests.Session of Kickex.
+        """
+        raise NotImplementedError('recording works with Kickex only')
+
+    def start_replay(self, path: str, speed: Optional[float] = 1.0) -> None:
+        """
+        Not supported, see start_recording.
+        """
+        raise NotImplementedError('replay works with Kickex only')
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        if self.pool_owner is not None:
+            self.session = await self.pool_owner.get_session()
+            return self.session
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self.session
+
+    async def request(
+            self,
+            method: str,
+            url: str,
+            group: str = TRADING,
+            priority: int = NORMAL,
+            **kwargs,
+    ) -> bytes:
+        """
+        Unlike Kickex.request returns response body, because it must be read
+        before connection goes back to the pool.
+
+        GET requests are retried on connection errors and RETRY_STATUSES,
+        POST and DELETE only on connection errors.
+        """
+        if 'headers' in kwargs:
+            # get_headers_and_stuff gives bytes KICK-API-PASS, aiohttp wants str
+            kwargs['headers'] = {
+                k: v.decode('latin-1') if isinstance(v, bytes) else v
+                for k, v in kwargs['headers'].items()
+            }
+        if self.scheduler is not None:
+            await self.scheduler.acquire_async(group, priority)
+        session = await self.get_session()
+        attempt = 0
+        while True:
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    if (
+                            method == 'GET'
+                            and response.status in self.RETRY_STATUSES
+                            and attempt < self.retries
+                    ):
+                        raise _RetryableStatus(response.status)
+                    return await response.read()
+            except (aiohttp.ClientConnectionError, _RetryableStatus) as e:
+                sent = not isinstance(e, aiohttp.ClientConnectorError)
+                if attempt >= self.retries or (sent and method != 'GET'):
+                    raise
+            attempt += 1
+            await asyncio.sleep(self.backoff_factor * 2 ** (attempt - 1))
+
+    async def request_json(self, method: str, url: str, **kwargs):
+        return self.decode(await self.request(method, url, **kwargs))
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+
+    async def get_order_book(self, as_order_book: bool = False) -> dict:
+        url = self.BASE_URI + self.GET_DEPTH_URI + f"?pairName={self.pair_name}"
+        content = await self.request('GET', url, group=MARKET, priority=NORMAL)
+
+        levels = self.decode_order_book(content)
+        if levels is not None:  # typed decoder already built levels
+            return self.parse_order_book_levels(levels, as_order_book)
+        order_book = self.decode(content)
+        return self.parse_get_order_book(
+            order_book=order_book, as_order_book=as_order_book
+        )
+
+    async def check_accounts_state(self) -> dict:
+        return self.parse_check_accounts_state(await self.get_account_balance())
+
+    async def get_account_balance(self):
+        """
+        Raw balances of all currencies. With balance_cache they are
+        downloaded only when cache is stale.
+        """
+        if self.balance_cache is not None:
+            account_balance = self.balance_cache.get()
+            if account_balance is not None:
+                return account_balance
+
+        account_balance = await self.fetch_balance()
+        if self.balance_cache is not None and isinstance(account_balance, list):
+            self.balance_cache.store(account_balance)
+        return account_balance
+
+    async def fetch_balance(self):
+        """
+        See Kickex.fetch_balance
+        """
+        method = 'GET'
+        headers, url_params, params = self.get_headers_and_stuff(
+            self.GET_BALANCE_URI, method=method
+        )
+        url = self.BASE_URI + self.GET_BALANCE_URI + url_params
+        return await self.request_json(
+            method, url, headers=headers, data=params,
+            group=TRADING, priority=NORMAL,
+        )
+
+    async def place_order(
+        self,
+        side: str,
+        amount: Union[str, Fixed],
+        price: Union[str, Fixed],
+        order_type: str,
+    ) -> dict:
+        """
+        See Kickex.place_order
+        """
+        if self.pairs is not None:
+            checked = self.check_order(await self.get_pair_spec(), side, amount, price)
+            if not checked['ok']:
+                return checked
+            amount, price = checked['result']['amount'], checked['result']['price']
+
+        payload = self.get_place_order_payload(side, amount, price)
+        method = 'POST'
+
+        headers, url_params, body = self.get_headers_and_stuff(
+            self.PLACE_ORDER_URI, method, params=payload
+        )
+        url = self.BASE_URI + self.PLACE_ORDER_URI + url_params
+        placing_order_result = await self.request_json(
+            method, url, headers=headers, data=body,
+            group=TRADING, priority=HIGH,
+        )
+        result = self.parse_placing_order_result(placing_order_result)
+        self.on_order_placed(result)
+        return result
+
+    async def get_pair_spec(self) -> Optional[PairSpec]:
+        """
+        See Kickex.get_pair_spec, stale pairs are refreshed in background task.
+        """
+        if self.pairs is None:
+            return None
+        if self.pairs.should_refresh():
+            if self.pairs.updated is None:
+                await self.refresh_pairs()
+            else:  # reference kept, event loop holds tasks weakly
+                self.pairs_refresh = asyncio.create_task(self.refresh_pairs())
+        return self.pairs.get(self.pair_name)
+
+    async def refresh_pairs(self) -> bool:
+        """
+        See Kickex.refresh_pairs
+        """
+        try:
+            raw_pairs = await self.fetch_pairs()
+            if isinstance(raw_pairs, list):
+                self.pairs.update(raw_pairs)
+                return True
+        except Exception:
+            pass
+        return False
+
+    async def fetch_pairs(self):
+        url = self.BASE_URI + self.GET_PAIRS_URI
+        return await self.request_json('GET', url, group=MARKET, priority=LOW)
+
+    async def cancel_order(self, order_id: str) -> dict:
+        method = 'DELETE'
+        headers, url_params, body = self.get_headers_and_stuff(
+            self.CANCEL_ORDER_URI + order_id, method, params={}
+        )
+        url = self.BASE_URI + self.CANCEL_ORDER_URI + order_id
+
+        canceling_order_result = await self.request_json(
+            method, url, headers=headers,
+            group=TRADING, priority=CRITICAL,
+        )
+
+        result = self.parse_cancel_order(canceling_order_result)
+        self.on_order_cancelled(order_id, result)
+        return result
+
+    async def get_user_orders(self, order_status: str) -> dict:
+        method = 'GET'
+        headers, url_params, params = self.get_headers_and_stuff(
+            self.GET_USER_ORDERS, method=method
+        )
+        url = self.BASE_URI + self.GET_USER_ORDERS + url_params
+
+        current_orders = await self.request_json(
+            method, url, headers=headers, data=params,
+            group=TRADING, priority=NORMAL,
+        )
+        result = self.parse_user_orders(current_orders)
+        if result['ok']:
+            self.on_orders(result['result']['orders'], active=True)
+        return result
+
+    async def get_order_state(self, order_id: str) -> dict:
+        """
+        With order_store answers from memory while order state is fresh.
+        """
+        if self.order_store is not None:
+            order = self.order_store.get(order_id)
+            if order is not None:
+                return {'ok': True, 'result': order}
+
+        result = self.parse_order_state(await self.fetch_order(order_id))
+        if result['ok']:
+            self.on_orders([result['result']])
+        return result
+
+    async def fetch_order(self, order_id: str) -> dict:
+        method = 'GET'
+        params = {"orderId": order_id}
+        headers, url_params, params = self.get_headers_and_stuff(
+            self.FETCH_ORDER, method=method, params=params
+        )
+        url = self.BASE_URI + self.FETCH_ORDER + url_params
+        return await self.request_json(
+            method, url, headers=headers, data=params,
+            group=TRADING, priority=NORMAL,
+        )
+
+    async def get_orders_history(
+            self,
+            limit: Optional[int] = None,
+            offset: Optional[int] = None,
+    ):
+        """
+        See Kickex.get_orders_history
+        """
+        method = 'GET'
+        headers, url_params, params = self.get_headers_and_stuff(
+            self.GET_ORDERS_HISTORY, method=method,
+            params=self.get_orders_history_params(limit, offset),
+        )
+        url = self.BASE_URI + self.GET_ORDERS_HISTORY + url_params
+
+        return await self.request_json(
+            method, url, headers=headers, data=params,
+            group=HISTORY, priority=LOW,
+        )
+
+    async def iter_orders_history(
+            self,
+            page_size: int = Kickex.HISTORY_PAGE_SIZE,
+            since: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        See Kickex.iter_orders_history
+        """
+        offset = 0
+        while True:
+            page = await self.get_orders_history(limit=page_size, offset=offset)
+            if not isinstance(page, list):
+                raise ResponseException(page)
+            for order in page:
+                if since is not None and int(order['createdTimestamp']) < since:
+                    return
+                yield order
+            if len(page) < page_size:
+                return
+            offset += len(page)
+
+    async def sync_orders_history(
+            self,
+            store: 'OrderHistoryStore',
+            page_size: int = Kickex.HISTORY_PAGE_SIZE,
+    ) -> int:
+        """
+        See Kickex.sync_orders_history
+        """
+        since = store.synced_mark(self.pair_name)
+        newest = since
+        saved = 0
+        page = []
+        async for order in self.iter_orders_history(page_size, since):
+            created = int(order['createdTimestamp'])
+            newest = created if newest is None else max(newest, created)
+            page.append(order)
+            if len(page) == page_size:
+                saved += store.add(page)
+                page = []
+        saved += store.add(page)
+        if newest is not None:  # reached since, everything newer is stored
+            store.set_synced_mark(self.pair_name, newest)
+        if since is not None:  # older orders could be filled or cancelled since
+            for order_id in store.open_order_ids(self.pair_name, until=since):
+                order = await self.fetch_order(str(order_id))
+                if 'orderId' not in order:
+                    raise ResponseException(order)
+                saved += store.add([order])
+        return saved
+
+
+class _RetryableStatus(Exception):
+    pass
+
+
+if __name__ == '__main__':
+    async def main():
+        async with AsyncKickex() as k:
+            print(await k.get_order_book())
+
+    asyncio.run(main())
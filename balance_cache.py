@@ -0,0 +1,147 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from fixed_point import Fixed
+from order_store import FINAL_STATUSES
+
+
+class BalanceCache:
+    """
+    Full balance map of the account with TTL.
+
+    Between downloads balances are adjusted optimistically: placed order
+    moves its volume from available to reserved, cancel moves it back.
+    Fills can't be predicted, so any growth of order executed amount
+    drops the cache and next read goes to the exchange.
+    Balances are kept as exact Fixed, so adjustments don't accumulate
+    float errors, and are served as strings like kickex sends them.
+    """
+
+    def __init__(
+            self,
+            ttl: float = 5.0,
+            clock: Callable[[], float] = time.monotonic,
+            max_orders: int = 10000,
+    ) -> None:
+        """
+        :param max_orders: int. open orders whose executed amount is
+            remembered, the oldest are forgotten over it. Forgotten order
+            drops the cache on its next fill report, like a new one
+        """
+        self.ttl = ttl
+        self.clock = clock
+        self.max_orders = max_orders
+        self.balances: Dict[str, Dict[str, Fixed]] = {}
+        self.updated: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+        self.served_age = 0.0  # sum of ages of served snapshots
+        self.max_served_age = 0.0
+        self._reserved: Dict[int, tuple] = {}  # order_id -> (currency, volume)
+        self._executed: Dict[int, float] = {}  # open orders, oldest first
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[List[dict]]:
+        """
+        :return: balances in /user/balance shape if fresh, else None
+        """
+        with self._lock:
+            now = self.clock()
+            if self.updated is None or now - self.updated > self.ttl:
+                self.misses += 1
+                return None
+            age = now - self.updated
+            self.hits += 1
+            self.served_age += age
+            self.max_served_age = max(self.max_served_age, age)
+            return [
+                {
+                    'currencyCode': currency,
+                    'available': str(balance['available']),
+                    'reserved': str(balance['reserved']),
+                }
+                for currency, balance in self.balances.items()
+            ]
+
+    def store(self, account_balance: List[dict]) -> None:
+        with self._lock:
+            self.balances = {
+                balance['currencyCode']: {
+                    'available': Fixed.parse(balance.get('available') or 0),
+                    'reserved': Fixed.parse(balance.get('reserved') or 0),
+                }
+                for balance in account_balance
+            }
+            self.updated = self.clock()
+            self._reserved = {}
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.updated = None
+
+    def on_order_placed(self, order: dict, pair_name: Optional[str] = None) -> None:
+        """
+        Order the cache can't make sense of drops it, the order is placed
+        already and must not fail because of the cache.
+
+        :param order: placed order in parse_orders shape, float or fixed
+        :param pair_name: string. pair of the client, ex. 'DEL/USDT', for
+            answers without pair
+        """
+        try:
+            base, quote = (order.get('pair') or pair_name).upper().replace('_', '/').split('/')
+            quantity = Fixed.parse(order['quantity'])
+            if order['side'] == 'buy':
+                currency, volume = quote, quantity * Fixed.parse(order['price'])
+                if order.get('quote_decimals') is not None:
+                    volume = volume.rescale(order['quote_decimals'])
+            else:
+                currency, volume = base, quantity
+        except (KeyError, TypeError, ValueError, AttributeError, ArithmeticError):
+            self.invalidate()
+            return
+        with self._lock:
+            balance = self.balances.get(currency)
+            if balance is None:
+                self.updated = None
+                return
+            balance['available'] -= volume
+            balance['reserved'] += volume
+            self._reserved[order['order_id']] = (currency, volume)
+
+    def on_order_cancelled(self, order_id) -> None:
+        with self._lock:
+            reserved = self._reserved.pop(int(order_id), None)
+            if reserved is None:
+                self.updated = None  # order from before the snapshot
+                return
+            balance = self.balances[reserved[0]]
+            balance['available'] += reserved[1]
+            balance['reserved'] -= reserved[1]
+
+    def on_orders(self, orders: List[dict]) -> None:
+        """
+        Look for fills in fresh order states (parse_orders shape).
+        """
+        with self._lock:
+            for order in orders:
+                order_id = order['order_id']
+                executed = order['executed'] or 0
+                if executed > self._executed.pop(order_id, 0):
+                    self.updated = None
+                if order.get('status') not in FINAL_STATUSES:  # no more fills
+                    self._executed[order_id] = executed  # moved to the end
+            while len(self._executed) > self.max_orders:
+                del self._executed[next(iter(self._executed))]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            reads = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / reads if reads else 0.0,
+                'avg_served_age': self.served_age / self.hits if self.hits else 0.0,
+                'max_served_age': self.max_served_age,
+            }
@@ -1,8 +1,16 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional
+
+# code of batch results whose call raised, ex. timed out after the request
+# was sent: the exchange may have placed or cancelled the order anyway
+UNKNOWN_OUTCOME = 'unknown_outcome'
 
 
 class API(ABC):
 
+    MAX_IN_FLIGHT = 8  # default limit of parallel requests for batch methods
+
     def __init__(self, market: str = "eth_usdt") -> None:
         if not (isinstance(market, str) and '_' in market):
             raise Exception(
@@ -13,6 +21,18 @@ class API(ABC):
             s.upper() for s in self.market.split('_')
         ]
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Release connections and other resources held by exchange wrapper.
+        After close() the instance must not be used.
+        """
+
     @abstractmethod
     def get_order_book(self) -> dict:
         """
@@ -170,6 +190,88 @@ class API(ABC):
         }
         """
 
+    def place_orders(
+            self,
+            orders: List[dict],
+            max_in_flight: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Place many orders in parallel.
+
+        :param orders: list of place_order kwargs. ex. [{
+            'side': 'sell', 'amount': '0.909', 'price': '0.0465', 'order_type': 'limit'
+        }, ...]
+        :param max_in_flight: int. requests sent at the same time,
+            MAX_IN_FLIGHT by default
+
+        :return: list of place_order results in the same order as orders.
+            Result with code UNKNOWN_OUTCOME is not a rejection, the order
+            may exist: check get_user_orders before placing it again
+        """
+        return self.dispatch(
+            lambda order: self.place_order(**order), orders, max_in_flight
+        )
+
+    def cancel_orders(
+            self,
+            order_ids: List[str],
+            max_in_flight: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Cancel many orders in parallel.
+
+        :return: list of cancel_order results in the same order as order_ids,
+            see place_orders about UNKNOWN_OUTCOME
+        """
+        return self.dispatch(self.cancel_order, order_ids, max_in_flight)
+
+    def cancel_all(self, max_in_flight: Optional[int] = None) -> List[dict]:
+        """
+        Cancel all active orders of the market.
+
+        :return: list of cancel_order results, or [get_user_orders result]
+            if active orders can't be loaded
+        """
+        user_orders = self.get_user_orders('active')
+        if not user_orders['ok']:
+            return [user_orders]
+        return self.cancel_orders(
+            self.get_market_order_ids(user_orders['result']['orders']),
+            max_in_flight,
+        )
+
+    def get_market_order_ids(self, orders: List[dict]) -> List[str]:
+        return [
+            str(order['order_id']) for order in orders
+            if order['pair'] is None
+            or order['pair'].replace('/', '_').lower() == self.market.lower()
+        ]
+
+    def dispatch(
+            self,
+            call: Callable[..., dict],
+            items: Iterable,
+            max_in_flight: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Run call for every item on bounded thread pool. Exception doesn't
+        stop other calls, it becomes {'ok': False, 'result': {'code':
+        UNKNOWN_OUTCOME, 'message': ...}}, unlike exchange rejections which
+        are returned by call as they are.
+        """
+        def safe_call(item):
+            try:
+                return call(item)
+            except Exception as e:
+                return unknown_outcome(e)
+
+        items = list(items)
+        if not items:
+            return []
+        workers = min(max_in_flight or self.MAX_IN_FLIGHT, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(safe_call, items))
+
     @abstractmethod
     def parse_check_accounts_state(self, account_balance: dict) -> dict:
         pass
@@ -195,5 +297,134 @@ class API(ABC):
         pass
 
 
+class AsyncAPI(API):
+    """
+    Same contract as API, but endpoint methods are coroutines.
+    Results have exactly the same shape as in API.
+    """
+
+    def __enter__(self):
+        raise TypeError('use "async with" for async exchange wrappers')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Release connections held by exchange wrapper.
+        """
+
+    @abstractmethod
+    async def get_order_book(self) -> dict:
+        """
+        Async version of API.get_order_book
+        """
+
+    @abstractmethod
+    async def check_accounts_state(self) -> dict:
+        """
+        Async version of API.check_accounts_state
+        """
+
+    @abstractmethod
+    async def place_order(
+            self,
+            side: str,
+            amount: str,
+            price: str,
+            order_type: str,
+    ) -> dict:
+        """
+        Async version of API.place_order
+        """
+
+    @abstractmethod
+    async def cancel_order(self, order_id: str) -> dict:
+        """
+        Async version of API.cancel_order
+        """
+
+    @abstractmethod
+    async def get_user_orders(self, order_status: str) -> dict:
+        """
+        Async version of API.get_user_orders
+        """
+
+    @abstractmethod
+    async def get_order_state(self, order_id: str) -> dict:
+        """
+        Async version of API.get_order_state
+        """
+
+    async def place_orders(
+            self,
+            orders: List[dict],
+            max_in_flight: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Async version of API.place_orders
+        """
+        return await self.dispatch(
+            lambda order: self.place_order(**order), orders, max_in_flight
+        )
+
+    async def cancel_orders(
+            self,
+            order_ids: List[str],
+            max_in_flight: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Async version of API.cancel_orders
+        """
+        return await self.dispatch(self.cancel_order, order_ids, max_in_flight)
+
+    async def cancel_all(self, max_in_flight: Optional[int] = None) -> List[dict]:
+        """
+        Async version of API.cancel_all
+        """
+        user_orders = await self.get_user_orders('active')
+        if not user_orders['ok']:
+            return [user_orders]
+        return await self.cancel_orders(
+            self.get_market_order_ids(user_orders['result']['orders']),
+            max_in_flight,
+        )
+
+    async def dispatch(
+            self,
+            call: Callable[..., dict],
+            items: Iterable,
+            max_in_flight: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Async version of API.dispatch, in-flight limit is a semaphore.
+        """
+        import asyncio  # not at module level: sync clients don't need it
+
+        semaphore = asyncio.Semaphore(max_in_flight or self.MAX_IN_FLIGHT)
+
+        async def safe_call(item):
+            async with semaphore:
+                try:
+                    return await call(item)
+                except Exception as e:
+                    return unknown_outcome(e)
+
+        return list(await asyncio.gather(*[safe_call(item) for item in items]))
+
+
+def unknown_outcome(error: Exception) -> dict:
+    return {'ok': False, 'result': {'code': UNKNOWN_OUTCOME, 'message': repr(error)}}
+
+
 class EmptyKeysException(Exception):
     pass
+
+
+class ResponseException(Exception):
+    """
+    Exchange answered with error where iteration can't go on, args[0] is the answer.
+    """
@@ -0,0 +1,677 @@
+"""
+Offline benchmarks of Kickex wrapper against local MockKickex.
+
+python benchmark.py                  # everything
+python benchmark.py endpoints sign   # chosen suites
+python benchmark.py --latency 0.005 --requests 500 endpoints
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from decimal import Decimal
+from functools import reduce
+from operator import mul
+from typing import Callable, Dict, List
+
+from aggregated_book import AggregatedOrderBook
+from async_kickex_api import AsyncKickex
+from book_archive import BookArchive, BookArchiveWriter
+from decoders import DECODERS, get_decoder
+from fill_watcher import FillWatcher
+from fixed_point import FIXED, FLOAT, notional, parse_column, to_fixed_levels
+from instrumentation import HistogramRecorder
+from kickex_api import Kickex
+from kickex_parsers import KickexParser
+from mock_exchange import MockKickex
+from multi_market import KickexMarkets
+from order_book import OrderBook
+from paper_exchange import PaperExchange, synthetic_books
+from recording import iter_records
+from shared_books import BookRing, SharedOrderBooks
+
+SUITES: Dict[str, Callable] = {}
+NETWORK_LATENCY = 0.01  # for suites measuring concurrency
+KEYS = {
+    'pub_key': 'benchmark-pub-key',
+    'pr_key': 'YmVuY2htYXJrLXNlY3JldC1rZXktYmVuY2htYXJr',
+    'password': 'benchmark-password',
+}
+
+
+def suite(func):
+    SUITES[func.__name__] = func
+    return func
+
+
+def measure(call: Callable, n: int) -> dict:
+    """
+    Call n times, return throughput and latency percentiles in ms.
+    """
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(n):
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    return summary(latencies, time.perf_counter() - started)
+
+
+def summary(latencies: List[float], elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        'ops/s': len(latencies) / elapsed,
+        'p50 ms': statistics.median(latencies) * 1000,
+        'p99 ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def report(name: str, result: dict) -> None:
+    values = '  '.join(f'{key} {value:>10.3f}' for key, value in result.items())
+    print(f'{name:<40} {values}')
+
+
+def make_client(mock: MockKickex, **kwargs) -> Kickex:
+    client = Kickex('del_usdt', **KEYS, **kwargs)
+    client.BASE_URI = mock.base_uri
+    return client
+
+
+def make_mock(args, **kwargs) -> MockKickex:
+    kwargs.setdefault('latency', args.latency)
+    return MockKickex(**KEYS, **kwargs)
+
+
+@suite
+def endpoints(args) -> None:
+    """
+    Every Kickex endpoint method over keep-alive connection.
+    """
+    with make_mock(args) as mock, make_client(mock) as client:
+        order_id = str(client.place_order('sell', '1', '1', 'limit')['result']['order_id'])
+        calls = {
+            'get_order_book': client.get_order_book,
+            'check_accounts_state': client.check_accounts_state,
+            'place_order': lambda: client.place_order('sell', '1', '1', 'limit'),
+            'cancel_order': lambda: client.cancel_order(order_id),
+            'get_user_orders': lambda: client.get_user_orders('active'),
+            'get_order_state': lambda: client.get_order_state(order_id),
+            'get_orders_history': client.get_orders_history,
+        }
+        for name, call in calls.items():
+            report(name, measure(call, args.requests))
+
+
+@suite
+def concurrency(args) -> None:
+    """
+    fetch_order: sequential vs threads vs asyncio.gather over one pool.
+    Without network latency all of them are bound by local cpu,
+    so at least NETWORK_LATENCY is simulated.
+    """
+    n = args.requests
+    with make_mock(args, latency=max(args.latency, NETWORK_LATENCY)) as mock:
+        with make_client(mock, pool_size=args.workers) as client:
+            order_id = str(client.place_order('sell', '1', '1', 'limit')['result']['order_id'])
+            report('fetch_order sequential', measure(lambda: client.fetch_order(order_id), n))
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(args.workers) as executor:
+                latencies = list(executor.map(
+                    lambda _: timed_call(lambda: client.fetch_order(order_id)), range(n)
+                ))
+            report(f'fetch_order {args.workers} threads', summary(
+                latencies, time.perf_counter() - started
+            ))
+
+        async def gather():
+            async with AsyncKickex('del_usdt', pool_size=args.workers, **KEYS) as async_client:
+                async_client.BASE_URI = mock.base_uri
+
+                async def one():
+                    start = time.perf_counter()
+                    await async_client.fetch_order(order_id)
+                    return time.perf_counter() - start
+
+                started = time.perf_counter()
+                latencies = await asyncio.gather(*[one() for _ in range(n)])
+                return latencies, time.perf_counter() - started
+
+        report(f'fetch_order asyncio pool {args.workers}', summary(*asyncio.run(gather())))
+
+
+def timed_call(call: Callable) -> float:
+    start = time.perf_counter()
+    call()
+    return time.perf_counter() - start
+
+
+@suite
+def ladder(args) -> None:
+    """
+    Replace ladder of 50 orders: sequential vs place_orders/cancel_orders.
+    At least NETWORK_LATENCY is simulated.
+    """
+    orders = [
+        {'side': 'sell', 'amount': '1', 'price': f'{1 + i / 1000}', 'order_type': 'limit'}
+        for i in range(50)
+    ]
+    mock = make_mock(args, latency=max(args.latency, NETWORK_LATENCY))
+    with mock, make_client(mock) as client:
+        def sequential():
+            placed = [client.place_order(**order) for order in orders]
+            for result in placed:
+                client.cancel_order(str(result['result']['order_id']))
+
+        def batched():
+            placed = client.place_orders(orders)
+            client.cancel_orders([str(result['result']['order_id']) for result in placed])
+
+        report('ladder 50 sequential', measure(sequential, max(1, args.requests // 100)))
+        report('ladder 50 batched', measure(batched, max(1, args.requests // 100)))
+
+
+@suite
+def markets(args) -> None:
+    """
+    30 pairs: client per market vs KickexMarkets, requests and wall time
+    of balances + order books of all of them. At least NETWORK_LATENCY is
+    simulated.
+    """
+    pairs = [f'c{i}_usdt' for i in range(30)]
+    rounds = max(1, args.requests // 100)
+    with make_mock(args, latency=max(args.latency, NETWORK_LATENCY)) as mock:
+        with ExitStack() as stack:
+            clients = []
+            for pair in pairs:
+                client = stack.enter_context(Kickex(pair, **KEYS))
+                client.BASE_URI = mock.base_uri
+                clients.append(client)
+
+            def separate():
+                for client in clients:
+                    client.check_accounts_state()
+                    client.get_order_book()
+
+            before = mock.requests
+            result = measure(separate, rounds)
+            result['requests'] = (mock.requests - before) / rounds
+            report('30 clients sequential', result)
+
+        with KickexMarkets(pairs, **KEYS) as kickex_markets:
+            kickex_markets.client.BASE_URI = mock.base_uri  # balances
+            for pair in kickex_markets:
+                kickex_markets[pair].BASE_URI = mock.base_uri
+
+            def shared():
+                kickex_markets.check_accounts_state()
+                kickex_markets.get_order_books()
+
+            before = mock.requests
+            result = measure(shared, rounds)
+            result['requests'] = (mock.requests - before) / rounds
+            report('KickexMarkets 30 pairs', result)
+
+
+def legacy_signature(timestamp: str, method: str, full_path: str, body_for_signature: str) -> str:
+    """
+    Kickex.get_signature before KickexSigner: key decoded and digests
+    base64 round tripped on every call.
+    """
+    secret = base64.standard_b64decode(KEYS['pr_key'].replace('-', '+').replace('_', '/'))
+    signature = base64.standard_b64encode(hmac.new(
+        timestamp.encode('latin-1'), method.lower().encode('latin-1'), hashlib.sha512,
+    ).digest()).decode('latin-1')
+    arguments = [
+        signature,
+        full_path.encode('latin-1'),
+        body_for_signature.encode('latin-1'),
+        secret,
+    ]
+    return reduce(Kickex.generate_sign, arguments)
+
+
+@suite
+def sign(args) -> None:
+    """
+    Signatures per second, legacy signing vs KickexSigner, no network.
+    """
+    client = Kickex('del_usdt', **KEYS)
+    timestamp = str(int(time.time()))
+    cases = {
+        'GET': ('/api/v1/order', 'orderId=1'),
+        'POST': ('/api/v1/createTradeOrder', '{"a":"1"}'),
+    }
+    for method, (path, body) in cases.items():
+        assert legacy_signature(timestamp, method, path, body) == client.signer.sign(
+            timestamp, method, path, body
+        )
+        report(f'legacy signature {method}', measure(
+            lambda: legacy_signature(timestamp, method, path, body), args.requests * 10,
+        ))
+        report(f'KickexSigner.sign {method}', measure(
+            lambda: client.signer.sign(timestamp, method, path, body), args.requests * 10,
+        ))
+    report('get_headers_and_stuff GET', measure(
+        lambda: client.get_headers_and_stuff('/order', 'GET', {'orderId': '1'}),
+        args.requests * 10,
+    ))
+
+
+@suite
+def parsing(args) -> None:
+    """
+    parse_orders vs parse_orders_columnar on 100k orders.
+    """
+    client = KickexParser('del_usdt')
+    orders = [
+        MockKickex.make_order(i, 'DEL/USDT', i % 2, '1.5', '0.05', state=random.choice((4, 5, 7)))
+        for i in range(100000)
+    ]
+    report('parse_orders 100k', measure(lambda: client.parse_orders(orders), 3))
+    report('parse_orders_columnar 100k', measure(
+        lambda: client.parse_orders_columnar(orders), 3
+    ))
+
+
+@suite
+def decoding(args) -> None:
+    """
+    Decode + parse order books of growing size with every installed decoder.
+    """
+    client = KickexParser('del_usdt')
+    for depth in (100, 1000, 10000):
+        content = json.dumps(make_mock(args, book_depth=depth).order_book('DEL/USDT')).encode()
+        for name in DECODERS:
+            try:
+                decoder = get_decoder(name)
+            except ImportError:
+                continue
+
+            def decode():
+                levels = decoder.decode_order_book(content)
+                if levels is None:
+                    client.parse_get_order_book(decoder.loads(content))
+
+            report(f'order book {depth} levels {name}', measure(decode, 20))
+
+
+@suite
+def order_book(args) -> None:
+    """
+    OrderBook vs list of tuples on 10k-level books.
+    """
+    levels = 10000
+    asks = [(str(1 + i / 1e5), '1') for i in range(levels)]
+    bids = [(str(1 - i / 1e5), '1') for i in range(levels)]
+    book = OrderBook(asks, bids)
+
+    def best_from_lists():
+        return (
+            min(asks, key=lambda level: float(level[0])),
+            max(bids, key=lambda level: float(level[0])),
+        )
+
+    def vwap_from_lists(quantity=500.0):
+        filled = notional = 0.0
+        for price, amount in sorted(asks, key=lambda level: float(level[0])):
+            take = min(float(amount), quantity - filled)
+            filled += take
+            notional += take * float(price)
+            if filled >= quantity:
+                break
+        return notional / filled
+
+    def update():
+        price = 1 + random.randrange(levels) / 1e5
+        book.update('asks', price, 0)
+        book.update('asks', price, 1)
+
+    report('best bid/ask list of tuples', measure(best_from_lists, 100))
+    report('best bid/ask OrderBook', measure(lambda: (book.best_ask(), book.best_bid()), 10000))
+    report('vwap 500 list of tuples', measure(vwap_from_lists, 100))
+    report('vwap 500 OrderBook', measure(lambda: book.vwap('buy', 500), 1000))
+    report('OrderBook delete+insert level', measure(update, 10000))
+
+
+@suite
+def numeric(args) -> None:
+    """
+    float vs Decimal vs Fixed vs int columns: parse, spread + notional, format for place_order.
+    """
+    levels = [(f'{1 + i / 1e6:.6f}', f'{1 + i % 7}.{i % 1000:03d}') for i in range(1000)]
+    parsers = {
+        'float': lambda side: [(float(price), float(amount)) for price, amount in side],
+        'Decimal': lambda side: [(Decimal(price), Decimal(amount)) for price, amount in side],
+        'Fixed': lambda side: to_fixed_levels(side, 6, 3),
+    }
+    for name, parse in parsers.items():
+        book = parse(levels)
+
+        def calculate():
+            spread = book[1][0] - book[0][0]
+            notional = sum(price * amount for price, amount in book)
+            return spread, notional
+
+        report(f'parse 1000 levels {name}', measure(lambda: parse(levels), 100))
+        report(f'spread + notional 1000 levels {name}', measure(calculate, 100))
+        if name == 'Fixed':
+            report('spread + notional 1000 levels fixed_point.notional', measure(
+                lambda: (book[1][0] - book[0][0], notional(book)), 100
+            ))
+        report(f'format price {name}', measure(
+            lambda: str(book[0][0] + book[1][0]), args.requests * 50
+        ))
+
+    # hot path without objects: int columns at pair decimals
+    prices, amounts = [price for price, _ in levels], [amount for _, amount in levels]
+    report('parse 1000 levels parse_column', measure(
+        lambda: (parse_column(prices, 6), parse_column(amounts, 3)), 100
+    ))
+    price_values, amount_values = parse_column(prices, 6)[0], parse_column(amounts, 3)[0]
+    report('spread + notional 1000 levels int columns', measure(
+        lambda: (price_values[1] - price_values[0], sum(map(mul, price_values, amount_values))), 100
+    ))
+
+    orders = [
+        MockKickex.make_order(i, 'DEL/USDT', i % 2, '1.5', '0.05', state=4)
+        for i in range(10000)
+    ]
+    for mode in (FLOAT, FIXED):
+        client = KickexParser('del_usdt', numeric=mode)
+        report(f'parse_orders 10k {mode}', measure(lambda: client.parse_orders(orders), 5))
+
+
+@suite
+def shared_books(args) -> None:
+    """
+    get_order_book from MockKickex vs from shared memory ring, 50 levels.
+    """
+    with make_mock(args) as mock, make_client(mock) as client:
+        report('Kickex.get_order_book', measure(client.get_order_book, args.requests))
+        ring = BookRing.create(f'kickex_benchmark_{os.getpid()}_del_usdt')
+        try:
+            levels = client.get_order_book()['result']
+            report('BookRing.write', measure(lambda: ring.write(levels), args.requests))
+            with SharedOrderBooks('del_usdt', prefix=f'kickex_benchmark_{os.getpid()}') as books:
+                report('SharedOrderBooks.get_levels', measure(
+                    books.get_levels, args.requests * 10
+                ))
+                report('SharedOrderBooks.get_order_book', measure(
+                    books.get_order_book, args.requests * 10
+                ))
+                report('SharedOrderBooks.get_order_book OrderBook', measure(
+                    lambda: books.get_order_book(as_order_book=True), args.requests * 10
+                ))
+        finally:
+            ring.close()
+
+
+@suite
+def paper(args) -> None:
+    """
+    PaperExchange orders per second: resting, cancel, crossing snapshots.
+    """
+    n = args.requests * 100
+    books = synthetic_books(seed=args.seed)
+    exchange = PaperExchange('del_usdt', balances={'USDT': '1000000000', 'DEL': '1000000000'})
+    exchange.load_order_book(next(books))
+    report('place_order resting', measure(
+        lambda: exchange.place_order('buy', '1', '0.9', 'limit'), n
+    ))
+    order_ids = iter(range(1, n + 1))
+    report('cancel_order', measure(lambda: exchange.cancel_order(str(next(order_ids))), n))
+
+    calls = iter(range(n))
+
+    def cross():
+        i = next(calls)
+        if i % 10 == 0:
+            exchange.load_order_book(next(books))
+        if i % 2:
+            exchange.place_order('buy', '0.5', '1.01', 'limit')
+        else:
+            exchange.place_order('sell', '0.5', '0.99', 'limit')
+
+    report('place_order crossing, snapshot per 10', measure(cross, n))
+
+
+def day_of_books(snapshots: int, depth: int = 20):
+    """
+    1 second order books, each changes a few levels of the previous one.
+    """
+    books = synthetic_books(depth=depth, seed=0)
+    book = next(books)
+    for i in range(snapshots):
+        if i % 30 == 0:  # price moves
+            book = next(books)
+        else:
+            book = {side: list(levels) for side, levels in book.items()}
+            for _ in range(3):
+                side = book[random.choice(('asks', 'bids'))]
+                level = random.randrange(depth)
+                side[level] = (side[level][0], f'{random.uniform(1, 20):.4f}')
+        yield 1700000000.0 + i, book
+
+
+@suite
+def archive(args) -> None:
+    """
+    Day of 1 second books, 20 levels: json lines vs BookArchive size and scan.
+    """
+    snapshots = 24 * 60 * 60
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, 'books.jsonl')
+        archive_path = os.path.join(directory, 'books.kxa')
+        with open(json_path, 'w') as f, BookArchiveWriter(archive_path) as writer:
+            for timestamp, book in day_of_books(snapshots):
+                f.write(json.dumps({'timestamp': timestamp, **book}) + '\n')
+                writer.append(book, timestamp)
+        print(f'json lines {os.path.getsize(json_path) / 2 ** 20:.1f} MiB, '
+              f'archive {os.path.getsize(archive_path) / 2 ** 20:.2f} MiB')
+
+        def scan_json():
+            with open(json_path) as f:
+                for line in f:
+                    json.loads(line)
+
+        report('scan json lines', measure(scan_json, 1))
+        with BookArchive(archive_path) as books:
+            report('scan BookArchive.iter_books', measure(lambda: sum(1 for _ in books.iter_books()), 1))
+            report('scan BookArchive.iter_raw', measure(lambda: sum(1 for _ in books.iter_raw()), 1))
+            report('scan BookArchive.iter_blocks', measure(
+                lambda: sum(len(block[0]) for block in books.iter_blocks()), 1
+            ))
+            start = 1700000000.0
+            report('BookArchive.seek random', measure(
+                lambda: books.seek(start + random.uniform(0, snapshots)), args.requests
+            ))
+            report('BookArchive.iter_books 1 min range', measure(
+                lambda: list(books.iter_books(start + 3600, start + 3660)), args.requests
+            ))
+
+
+@suite
+def aggregated(args) -> None:
+    """
+    AggregatedOrderBook over 3 MockKickex venues and 1 paper one: refresh vs queries.
+    """
+    with ExitStack() as stack:
+        venues = {
+            f'mock_{i}': stack.enter_context(make_client(stack.enter_context(
+                make_mock(args, book_depth=50)
+            )))
+            for i in range(3)
+        }
+        venues['paper'] = PaperExchange('del_usdt', balances={})
+        venues['paper'].load_order_book(next(synthetic_books(depth=50, seed=args.seed)))
+        book = stack.enter_context(AggregatedOrderBook(venues, timeout=1.0))
+        report('sequential get_order_book', measure(
+            lambda: [venue.get_order_book() for venue in venues.values()], args.requests
+        ))
+        report('AggregatedOrderBook.refresh', measure(book.refresh, args.requests))
+        report('AggregatedOrderBook.best_ask', measure(book.best_ask, args.requests * 100))
+        report('AggregatedOrderBook.cost_to_fill 100', measure(
+            lambda: book.cost_to_fill('buy', '100'), args.requests * 100
+        ))
+
+
+@suite
+def fills(args) -> None:
+    """
+    FillWatcher on MockKickex: requests per detected fill and detection latency.
+    """
+    duration = 5.0
+    strategies = {
+        'fixed 0.25 s loop': dict(min_interval=0.25, max_interval=0.25, coalesce=0),
+        'adaptive': dict(min_interval=0.05, max_interval=1.0, coalesce=0),
+        'adaptive + coalesce': dict(min_interval=0.05, max_interval=1.0, coalesce=3),
+    }
+    for name, options in strategies.items():
+        rng = random.Random(args.seed)
+        with make_mock(args) as mock, make_client(mock) as client:
+            orders = [
+                client.place_order('buy', '10', f'{0.999 - i * 0.001:.6f}', 'limit')['result']
+                for i in range(40)
+            ]
+            filled_at: Dict[int, List[float]] = {order['order_id']: [] for order in orders}
+            latencies = []
+
+            def on_fill(previous, order):
+                now = time.perf_counter()
+                latencies.extend(now - at for at in filled_at[order['order_id']])
+                filled_at[order['order_id']].clear()
+
+            watcher = FillWatcher(
+                client, on_fill=on_fill, book_interval=1.0, far_distance=0.02, **options
+            )
+            for order in orders:
+                watcher.watch(order)
+            requests = mock.requests
+            watcher.start()
+            started = time.perf_counter()
+            while time.perf_counter() - started < duration:
+                time.sleep(0.05)
+                open_orders = [order for order in orders if mock.orders[order['order_id']]['state'] == 4]
+                if open_orders and rng.random() < 0.5:  # near the touch fills more often
+                    order = rng.choices(
+                        open_orders, [1 / (1 + i) ** 2 for i in range(len(open_orders))]
+                    )[0]
+                    filled_at[order['order_id']].append(time.perf_counter())
+                    mock.fill(order['order_id'], '2')
+            time.sleep(1.0)  # let the slowest checks come
+            watcher.stop()
+            requests = mock.requests - requests
+            missed = sum(len(times) for times in filled_at.values())
+            report(name, {
+                'requests': requests,
+                'fills': len(latencies),
+                'req/fill': requests / max(1, len(latencies)),
+                'missed': missed,
+                'p50 ms': statistics.median(latencies) * 1000,
+                'max ms': max(latencies) * 1000,
+            })
+
+
+@suite
+def instrumentation(args) -> None:
+    """
+    Cost of instrumentation on get_order_book, disabled vs enabled.
+    """
+    with make_mock(args, book_depth=20) as mock:
+        for name, recorder in (('disabled', None), ('enabled', HistogramRecorder())):
+            with make_client(mock, instrumentation=recorder) as client:
+                report(f'get_order_book instrumentation {name}', measure(
+                    client.get_order_book, args.requests * 5
+                ))
+
+
+@suite
+def replay(args) -> None:
+    """
+    parse_* on payloads from --recording file, see recording.RecordingSession.
+    """
+    if not args.recording:
+        print('skipped, no --recording given')
+        return
+    client = Kickex('del_usdt', **KEYS)
+    parsers = {
+        '/market/orderbook': client.parse_get_order_book,
+        '/user/balance': client.parse_check_accounts_state,
+        '/createTradeOrder': client.parse_placing_order_result,
+        '/activeOrders': client.parse_user_orders,
+        '/order': client.parse_order_state,
+        '/ordersHistory': client.parse_orders,
+    }
+    for url_path, parser in parsers.items():
+        payloads = [
+            client.decode(record['response'].encode('utf-8'))
+            for record in iter_records(args.recording, url_path)
+            if record['status'] == 200
+        ]
+        if not payloads:
+            continue
+        calls = iter(payloads * max(1, args.requests // len(payloads)))
+        report(f'{parser.__name__} x{len(payloads)} recorded', measure(
+            lambda: parser(next(calls)), max(1, args.requests // len(payloads)) * len(payloads)
+        ))
+
+
+@suite
+def imports(args) -> None:
+    """
+    Startup of a fresh interpreter importing wrapper modules, without keys.
+    """
+    env = {
+        key: value for key, value in os.environ.items()
+        if not key.startswith('KICKEX_')
+    }
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    statements = {
+        'python': 'pass',
+        'import kickex_parsers': 'import kickex_parsers',
+        'import kickex_api': 'import kickex_api',
+        'import async_kickex_api': 'import async_kickex_api',
+        'import requests (lazy in Kickex)': 'import requests',
+    }
+    for name, statement in statements.items():
+        report(name, measure(
+            lambda: subprocess.run(
+                [sys.executable, '-c', statement], env=env, cwd=cwd, check=True
+            ),
+            max(3, args.requests // 20),
+        ))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('suites', nargs='*', help=f'any of {", ".join(SUITES)}')
+    parser.add_argument('--requests', type=int, default=200, help='calls per case')
+    parser.add_argument('--latency', type=float, default=0.0, help='mock latency, seconds')
+    parser.add_argument('--workers', type=int, default=16, help='threads / pool size')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--recording', help='capture file for replay suite')
+    args = parser.parse_args()
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f'unknown suites: {", ".join(sorted(unknown))}')
+    random.seed(args.seed)
+
+    for name in args.suites or SUITES:
+        print(f'== {name}: {SUITES[name].__doc__.strip().splitlines()[0]}')
+        SUITES[name](args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,477 @@
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Iterator, List, Optional, Tuple
+
+from fixed_point import FIXED, FLOAT, Fixed, format_scaled
+
+MAGIC = b'KKXARCH1'
+TIME_SCALE = 10 ** 6  # timestamps are kept in microseconds
+# first and last snapshot time, snapshots count, ask and bid levels count,
+# compressed payload size, price decimals, amount decimals
+BLOCK_HEADER = struct.Struct('<qqIIIIBB2x')
+# first and last snapshot time, block offset
+INDEX_ENTRY = struct.Struct('<qqQ')
+# index offset, blocks count, magic
+FOOTER = struct.Struct('<QI4x8s')
+# largest scaled number of block columns, so price deltas fit int64 too
+BLOCK_LIMIT = 2 ** 62
+
+Snapshot = Tuple[float, dict]
+logger = logging.getLogger(__name__)
+
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder == 'big':  # files are little endian everywhere
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode: str, data) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+class BookArchiveWriter:
+    """
+    Appends order book snapshots to archive file.
+
+    Snapshots are grouped in blocks of up to block_size, every block is
+    columnar and zlib compressed: times, level counts, prices and
+    amounts of all its books in separate int64 columns. Prices are
+    scaled by block decimals and delta encoded along each side column
+    (neighbour levels differ by a few ticks), amounts are plain, so
+    unchanged levels repeat and compress to almost nothing. Index of
+    blocks is written by close, readers of unclosed files scan block
+    headers instead. Existing archive is continued: its blocks are kept
+    and its index is rewritten by close.
+
+    Block decimals are the largest of its snapshots. Pending snapshots
+    whose numbers wouldn't fit int64 at common decimals, ex. price
+    0.00001234 with amount 250000000000.0 next to amount 1.123456789,
+    go to separate blocks. Snapshot not fitting even alone is rejected
+    by append.
+
+    with BookArchiveWriter('del_usdt.kxa') as writer:
+        writer.append(client.get_order_book()['result'])
+    """
+
+    def __init__(self, path: str, block_size: int = 600, compression: int = 6) -> None:
+        """
+        :param block_size: int. snapshots per block, a seek decodes one block
+        :param compression: int. zlib level
+        """
+        self.path = path
+        self.block_size = block_size
+        self.compression = compression
+        self.index: List[Tuple[int, int, int]] = []
+        self.pending: List[tuple] = []
+        self.last_time: Optional[int] = None
+        if os.path.exists(path) and os.path.getsize(path):
+            self.file = open(path, 'r+b')
+            with mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data[:len(MAGIC)] != MAGIC:
+                    self.file.close()
+                    raise ValueError(f'{path} is not an order book archive')
+                self.index, end = read_index(data)
+            # new blocks overwrite old index, or unfinished block of a crashed writer
+            self.file.seek(end)
+            self.file.truncate()
+            if self.index:
+                self.last_time = self.index[-1][1]
+        else:
+            self.file = open(path, 'wb')
+            self.file.write(MAGIC)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def append(self, levels: dict, timestamp: Optional[float] = None) -> None:
+        """
+        :param levels: parse_get_order_book result, {'asks': [(price, amount), ...],
+            'bids': [...]}, strings or Fixed
+        :param timestamp: float. time.time() of the book, must not decrease
+        :raises ValueError: if snapshot is older than the previous one, or
+            its numbers don't fit int64 at its largest decimals
+        """
+        moment = round((time.time() if timestamp is None else timestamp) * TIME_SCALE)
+        if self.last_time is not None and moment < self.last_time:
+            raise ValueError('snapshots must be appended in time order')
+        parse = Fixed.parse
+        asks = [(parse(price), parse(amount)) for price, amount in levels['asks']]
+        bids = [(parse(price), parse(amount)) for price, amount in levels['bids']]
+        prices = _extent([price for price, _ in asks + bids])
+        amounts = _extent([amount for _, amount in asks + bids])
+        if not (_fits(prices) and _fits(amounts)):
+            raise ValueError(f'order book at {moment / TIME_SCALE} has numbers over int64 range')
+        self.last_time = moment
+        self.pending.append((moment, asks, bids, prices, amounts))
+        if len(self.pending) >= self.block_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write pending snapshots as one block, or several if their numbers
+        don't fit int64 at common decimals. Pending is empty afterwards,
+        even if writing fails.
+        """
+        pending, self.pending = self.pending, []
+        block: List[tuple] = []
+        prices = amounts = (0, Fixed(0, 0))  # block (decimals, largest number)
+        for snapshot in pending:
+            snapshot_prices, snapshot_amounts = snapshot[3], snapshot[4]
+            if block:
+                merged_prices = _merge(prices, snapshot_prices)
+                merged_amounts = _merge(amounts, snapshot_amounts)
+                if _fits(merged_prices) and _fits(merged_amounts):
+                    block.append(snapshot)
+                    prices, amounts = merged_prices, merged_amounts
+                    continue
+                self.write_block(block, prices[0], amounts[0])
+            block, prices, amounts = [snapshot], snapshot_prices, snapshot_amounts
+        if block:
+            self.write_block(block, prices[0], amounts[0])
+
+    def write_block(self, snapshots: List[tuple], price_decimals: int, amount_decimals: int) -> None:
+        times = array('q')
+        counts = array('I')
+        columns = [array('q') for _ in range(4)]  # ask prices, ask amounts, bid prices, bid amounts
+        previous_time = 0
+        previous_prices = [0, 0]
+        for moment, asks, bids, _, _ in snapshots:
+            times.append(moment - previous_time)
+            previous_time = moment
+            counts.append(len(asks))
+            counts.append(len(bids))
+            for i, side in enumerate((asks, bids)):
+                prices, amounts = columns[2 * i], columns[2 * i + 1]
+                previous_price = previous_prices[i]
+                for price, amount in side:
+                    price = price.rescale(price_decimals).value
+                    prices.append(price - previous_price)
+                    previous_price = price
+                    amounts.append(amount.rescale(amount_decimals).value)
+                previous_prices[i] = previous_price
+
+        payload = zlib.compress(
+            b''.join(_to_bytes(column) for column in [counts, times] + columns),
+            self.compression,
+        )
+        offset = self.file.tell()
+        first_time, last_time = snapshots[0][0], snapshots[-1][0]
+        self.file.write(BLOCK_HEADER.pack(
+            first_time, last_time, len(snapshots), len(columns[0]), len(columns[2]),
+            len(payload), price_decimals, amount_decimals,
+        ))
+        self.file.write(payload)
+        self.file.flush()
+        self.index.append((first_time, last_time, offset))
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        self.flush()
+        index_offset = self.file.tell()
+        for entry in self.index:
+            self.file.write(INDEX_ENTRY.pack(*entry))
+        self.file.write(FOOTER.pack(index_offset, len(self.index), MAGIC))
+        self.file.close()
+
+
+def _extent(numbers: List[Fixed]) -> Tuple[int, Fixed]:
+    """
+    :return: (largest decimals, largest absolute number)
+    """
+    return (
+        max((number.decimals for number in numbers), default=0),
+        max((abs(number) for number in numbers), default=Fixed(0, 0)),
+    )
+
+
+def _merge(extent: Tuple[int, Fixed], other: Tuple[int, Fixed]) -> Tuple[int, Fixed]:
+    return max(extent[0], other[0]), max(extent[1], other[1])
+
+
+def _fits(extent: Tuple[int, Fixed]) -> bool:
+    decimals, largest = extent
+    return largest.rescale(decimals).value <= BLOCK_LIMIT
+
+
+def read_index(data) -> Tuple[List[Tuple[int, int, int]], int]:
+    """
+    :param data: bytes or mmap of archive file
+    :return: ([(first time, last time, block offset), ...], end of the last
+        whole block)
+    """
+    size = len(data)
+    if size >= len(MAGIC) + FOOTER.size:
+        index_offset, blocks, magic = FOOTER.unpack_from(data, size - FOOTER.size)
+        if magic == MAGIC and index_offset + blocks * INDEX_ENTRY.size == size - FOOTER.size:
+            return [
+                INDEX_ENTRY.unpack_from(data, index_offset + i * INDEX_ENTRY.size)
+                for i in range(blocks)
+            ], index_offset
+    # writer didn't close the file, blocks are found by headers
+    index = []
+    offset = len(MAGIC)
+    while offset + BLOCK_HEADER.size <= size:
+        header = BLOCK_HEADER.unpack_from(data, offset)
+        end = offset + BLOCK_HEADER.size + header[5]
+        if end > size:
+            break  # block is being written
+        index.append((header[0], header[1], offset))
+        offset = end
+    return index, offset
+
+
+class BookArchive:
+    """
+    Memory mapped reader of BookArchiveWriter files.
+
+    Only blocks holding requested times are decompressed, the last
+    decoded block is kept for neighbour lookups.
+
+    with BookArchive('del_usdt.kxa') as archive:
+        timestamp, levels = archive.seek(time.time() - 3600)
+        for timestamp, levels in archive.iter_books(start, end):
+            ...
+
+    Levels of iter_books and seek are like Kickex.get_order_book results:
+    strings with block decimals, Fixed with numeric='fixed'. iter_blocks
+    gives decoded int64 columns as they are.
+    """
+
+    def __init__(self, path: str, numeric: str = FLOAT) -> None:
+        if numeric not in (FLOAT, FIXED):
+            raise ValueError(f'unknown numeric mode {numeric!r}')
+        self.path = path
+        self.numeric = numeric
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f'{path} is not an order book archive')
+        self.index = self.read_index()
+        self.first_times = [entry[0] for entry in self.index]
+        self.last_times = [entry[1] for entry in self.index]
+        self._block: Optional[tuple] = None  # (offset, decoded block)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._block = None
+        self.map.close()
+        self.file.close()
+
+    def __len__(self) -> int:
+        return sum(
+            BLOCK_HEADER.unpack_from(self.map, offset)[2] for _, _, offset in self.index
+        )
+
+    def read_index(self) -> List[Tuple[int, int, int]]:
+        return read_index(self.map)[0]
+
+    def decode_block(self, offset: int) -> tuple:
+        """
+        :return: (times, ask offsets, bid offsets, ask prices, ask amounts,
+            bid prices, bid amounts, price decimals, amount decimals). Levels
+            of book i are [offsets[i]:offsets[i + 1]] of side columns, numbers
+            are scaled ints and times are microseconds
+        """
+        if self._block is not None and self._block[0] == offset:
+            return self._block[1]
+        (
+            _, _, snapshots, n_asks, n_bids, size, price_decimals, amount_decimals,
+        ) = BLOCK_HEADER.unpack_from(self.map, offset)
+        start = offset + BLOCK_HEADER.size
+        data = zlib.decompress(self.map[start:start + size])
+
+        position = 0
+        columns = []
+        for typecode, count in (
+                ('I', 2 * snapshots), ('q', snapshots),
+                ('q', n_asks), ('q', n_asks), ('q', n_bids), ('q', n_bids),
+        ):
+            end = position + count * array(typecode).itemsize
+            columns.append(_from_bytes(typecode, data[position:end]))
+            position = end
+        counts, times, ask_prices, ask_amounts, bid_prices, bid_amounts = columns
+
+        block = (
+            list(accumulate(times)),
+            list(accumulate(counts[::2], initial=0)),
+            list(accumulate(counts[1::2], initial=0)),
+            list(accumulate(ask_prices)),
+            ask_amounts.tolist(),
+            list(accumulate(bid_prices)),
+            bid_amounts.tolist(),
+            price_decimals,
+            amount_decimals,
+        )
+        self._block = (offset, block)
+        return block
+
+    def iter_blocks(
+            self,
+            start: Optional[float] = None,
+            end: Optional[float] = None,
+    ) -> Iterator[tuple]:
+        """
+        Column scan of [start, end), the fastest way to read many books.
+
+        :return: iterator of decode_block tuples, one per block and cut to
+            the requested books, offsets start from 0 in every tuple
+        """
+        start = None if start is None else round(start * TIME_SCALE)
+        end = None if end is None else round(end * TIME_SCALE)
+        first = 0 if start is None else bisect_left(self.last_times, start)
+        last = len(self.index) if end is None else bisect_left(self.first_times, end)
+        for _, _, offset in self.index[first:last]:
+            block = self.decode_block(offset)
+            times, ask_offsets, bid_offsets = block[:3]
+            i = 0 if start is None else bisect_left(times, start)
+            stop = len(times) if end is None else bisect_left(times, end)
+            if i >= stop:
+                continue
+            if i == 0 and stop == len(times):
+                yield block
+                continue
+            ask_start, ask_end = ask_offsets[i], ask_offsets[stop]
+            bid_start, bid_end = bid_offsets[i], bid_offsets[stop]
+            yield (
+                times[i:stop],
+                [position - ask_start for position in ask_offsets[i:stop + 1]],
+                [position - bid_start for position in bid_offsets[i:stop + 1]],
+                block[3][ask_start:ask_end],
+                block[4][ask_start:ask_end],
+                block[5][bid_start:bid_end],
+                block[6][bid_start:bid_end],
+                block[7],
+                block[8],
+            )
+
+    def iter_raw(
+            self,
+            start: Optional[float] = None,
+            end: Optional[float] = None,
+    ) -> Iterator[tuple]:
+        """
+        Snapshots of [start, end) without formatting numbers.
+
+        :return: iterator of (time.time() of book, ask prices, ask amounts,
+            bid prices, bid amounts, price decimals, amount decimals), sides
+            are lists of scaled ints
+        """
+        for (
+                times, ask_offsets, bid_offsets, ask_prices, ask_amounts,
+                bid_prices, bid_amounts, price_decimals, amount_decimals,
+        ) in self.iter_blocks(start, end):
+            for i, moment in enumerate(times):
+                ask_start, ask_end = ask_offsets[i], ask_offsets[i + 1]
+                bid_start, bid_end = bid_offsets[i], bid_offsets[i + 1]
+                yield (
+                    moment / TIME_SCALE,
+                    ask_prices[ask_start:ask_end],
+                    ask_amounts[ask_start:ask_end],
+                    bid_prices[bid_start:bid_end],
+                    bid_amounts[bid_start:bid_end],
+                    price_decimals,
+                    amount_decimals,
+                )
+
+    def iter_books(
+            self,
+            start: Optional[float] = None,
+            end: Optional[float] = None,
+    ) -> Iterator[Snapshot]:
+        """
+        Snapshots of [start, end) like get_order_book results. Making a
+        tuple and two strings per level costs more than reading the
+        archive, scans of many books should use iter_blocks or iter_raw.
+
+        :param start: float. time.time() of the first book, None from the beginning
+        :param end: float. books before it, None till the end
+        :return: iterator of (time.time() of book, {'asks': [...], 'bids': [...]})
+        """
+        if self.numeric == FIXED:
+            def convert(column, decimals):
+                return [Fixed(value, decimals) for value in column]
+        else:
+            def convert(column, decimals):
+                # books repeat prices and amounts a lot
+                texts = {value: format_scaled(value, decimals) for value in set(column)}
+                return list(map(texts.__getitem__, column))
+
+        for (
+                times, ask_offsets, bid_offsets, ask_prices, ask_amounts,
+                bid_prices, bid_amounts, price_decimals, amount_decimals,
+        ) in self.iter_blocks(start, end):
+            asks = list(zip(convert(ask_prices, price_decimals), convert(ask_amounts, amount_decimals)))
+            bids = list(zip(convert(bid_prices, price_decimals), convert(bid_amounts, amount_decimals)))
+            for i, moment in enumerate(times):
+                yield moment / TIME_SCALE, {
+                    'asks': asks[ask_offsets[i]:ask_offsets[i + 1]],
+                    'bids': bids[bid_offsets[i]:bid_offsets[i + 1]],
+                }
+
+    def seek(self, timestamp: float) -> Optional[Snapshot]:
+        """
+        Book as it was at timestamp: the last one at or before it.
+
+        :return: (time.time() of book, levels) or None if archive starts later
+        """
+        moment = round(timestamp * TIME_SCALE)
+        block = bisect_right(self.first_times, moment) - 1
+        if block < 0:
+            return None
+        times = self.decode_block(self.index[block][2])[0]
+        moment = times[bisect_right(times, moment) - 1]
+        return next(self.iter_books(moment / TIME_SCALE, (moment + 1) / TIME_SCALE))
+
+
+def archive_order_books(
+        client,
+        writer: BookArchiveWriter,
+        interval: float = 1.0,
+        snapshots: Optional[int] = None,
+) -> int:
+    """
+    Poll client.get_order_book every interval and append books to writer,
+    failed requests and books writer rejects are skipped.
+
+    :param client: Kickex or any API with get_order_book
+    :param snapshots: int. stop after so many books, None to run forever
+    :return: number of archived books
+    """
+    archived = 0
+    next_poll = time.monotonic()
+    while snapshots is None or archived < snapshots:
+        result = client.get_order_book()
+        if result['ok']:
+            try:
+                writer.append(result['result'])
+            except ValueError:
+                logger.exception('order book is not archived')
+            else:
+                archived += 1
+        next_poll += interval
+        time.sleep(max(0.0, next_poll - time.monotonic()))
+    return archived
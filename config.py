@@ -1,16 +1,51 @@
 import os
+from typing import Optional, Tuple
 
-from dotenv import load_dotenv
+DEFAULT_KEY_SET = 'KICKEX'  # env names are {key set}_PUB_KEY, {key set}_PR_KEY, ...
 
-load_dotenv()
+_dotenv_loaded = False
 
-KICKEX_PUB_KEY = os.getenv('KICKEX_PUB_KEY')
-KICKEX_PR_KEY = os.getenv('KICKEX_PR_KEY')
-KICKEX_PASSWORD = os.getenv('KICKEX_PASSWORD')
 
-if not all([
-    KICKEX_PUB_KEY,
-    KICKEX_PR_KEY,
-    KICKEX_PASSWORD,
-]):
-    raise Exception('You have to create .env and insert keys like .env.example')
+def load_env() -> None:
+    """
+    Read .env into os.environ once per process, variables already set win.
+    """
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
+
+
+def get_credentials(
+        pub_key: Optional[str] = None,
+        pr_key: Optional[str] = None,
+        password: Optional[str] = None,
+        key_set: str = DEFAULT_KEY_SET,
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Kickex api keys: explicit arguments first, then environment and .env.
+    Several accounts in one process use different key sets, ex.
+    key_set='KICKEX_MM' reads KICKEX_MM_PUB_KEY, KICKEX_MM_PR_KEY and
+    KICKEX_MM_PASSWORD.
+
+    :return: (pub_key, pr_key, password), missing ones are None
+    """
+    if not all([pub_key, pr_key, password]):
+        load_env()
+        pub_key = pub_key or os.getenv(f'{key_set}_PUB_KEY')
+        pr_key = pr_key or os.getenv(f'{key_set}_PR_KEY')
+        password = password or os.getenv(f'{key_set}_PASSWORD')
+    return pub_key, pr_key, password
+
+
+def __getattr__(name: str) -> Optional[str]:
+    # old config.KICKEX_PUB_KEY style access, resolved on first use
+    names = {
+        'KICKEX_PUB_KEY': 0,
+        'KICKEX_PR_KEY': 1,
+        'KICKEX_PASSWORD': 2,
+    }
+    if name not in names:
+        raise AttributeError(f"module 'config' has no attribute '{name}'")
+    return get_credentials()[names[name]]
@@ -0,0 +1,13 @@
+# modules are at repository root, pytest puts this directory on sys.path
+import pytest
+
+KEYS = {
+    'pub_key': 'test-pub-key',
+    'pr_key': 'dGVzdC1zZWNyZXQta2V5LXRlc3Qtc2VjcmV0LWtleQ==',
+    'password': 'test-password',
+}
+
+
+@pytest.fixture
+def keys() -> dict:
+    return dict(KEYS)
@@ -0,0 +1,105 @@
+import json
+from typing import List, Optional, Union
+
+
+class JSONDecoder:
+    """
+    Stdlib json, always available.
+    """
+
+    name = 'json'
+
+    def loads(self, content: Union[bytes, str]):
+        return json.loads(content)
+
+    def decode_order_book(self, content: bytes) -> Optional[dict]:
+        """
+        Decode /market/orderbook response straight into
+        {'asks': [(price, amount), ...], 'bids': [...]}.
+
+        :return: None if content is not an order book (ex. error),
+            then caller falls back to loads + parse_get_order_book
+        """
+        return None
+
+
+class OrjsonDecoder(JSONDecoder):
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        import orjson
+        self._loads = orjson.loads
+
+    def loads(self, content: Union[bytes, str]):
+        return self._loads(content)
+
+
+class MsgspecDecoder(JSONDecoder):
+    """
+    msgspec decoder. Order book is decoded into typed structs,
+    so no dict is created for every level.
+
+    Orders are not: they go through loads to dicts like with other
+    decoders. On 100k orders an Order struct decodes in ~70 ms instead of
+    ~125 ms, but parse_orders / parse_orders_columnar then take ~550 ms
+    and need dicts, and kickex doesn't document order field types (ex.
+    orderId and createdTimestamp come as strings), so the struct would
+    save under 10% of get_orders_history and fail on the first answer
+    whose types differ.
+    """
+
+    name = 'msgspec'
+
+    def __init__(self) -> None:
+        import msgspec
+
+        class Level(msgspec.Struct):
+            price: str
+            amount: str
+
+        class OrderBook(msgspec.Struct):
+            asks: List[Level]
+            bids: List[Level]
+
+        self._error = msgspec.ValidationError
+        self._decoder = msgspec.json.Decoder()
+        self._order_book_decoder = msgspec.json.Decoder(OrderBook)
+
+    def loads(self, content: Union[bytes, str]):
+        return self._decoder.decode(content)
+
+    def decode_order_book(self, content: bytes) -> Optional[dict]:
+        try:
+            book = self._order_book_decoder.decode(content)
+        except self._error:
+            return None
+        return {
+            'asks': [(level.price, level.amount) for level in book.asks],
+            'bids': [(level.price, level.amount) for level in book.bids],
+        }
+
+
+DECODERS = {
+    JSONDecoder.name: JSONDecoder,
+    OrjsonDecoder.name: OrjsonDecoder,
+    MsgspecDecoder.name: MsgspecDecoder,
+}
+
+
+def get_decoder(decoder: Union[str, JSONDecoder] = 'json') -> JSONDecoder:
+    """
+    :param decoder: 'json', 'orjson', 'msgspec', 'auto' or decoder instance.
+        'auto' takes the fastest installed one
+    """
+    if isinstance(decoder, JSONDecoder):
+        return decoder
+    if decoder == 'auto':
+        for name in ('msgspec', 'orjson'):
+            try:
+                return DECODERS[name]()
+            except ImportError:
+                pass
+        return JSONDecoder()
+    if decoder not in DECODERS:
+        raise ValueError(f'unknown decoder {decoder}, use one of {list(DECODERS)}')
+    return DECODERS[decoder]()
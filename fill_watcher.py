@@ -0,0 +1,249 @@
+import heapq
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from order_store import FINAL_STATUSES
+
+OrderCallback = Callable[[dict, dict], None]
+
+
+class FillWatcher:
+    """
+    Tracks open orders and calls back when they change.
+
+    Every order is checked on its own schedule. Orders at the touch are
+    checked every min_interval, the interval grows with distance from
+    the best price of their side up to max_interval at far_distance.
+    An order which just got a fill is checked at min_interval again,
+    busy orders tend to keep filling. When coalesce orders or more are
+    due at once, one get_user_orders('active') answers for all tracked
+    orders instead of a request per order; orders missing from it are
+    finished, their final state is fetched once.
+
+    watcher = FillWatcher(client, on_fill=lambda previous, order: print(order['executed']))
+    watcher.watch(client.place_order('buy', '10', '0.0465', 'limit')['result'])
+    watcher.start()
+
+    Callbacks get (previous, order) dicts in parse_orders shape: on_change
+    when status changes, ex. accepted -> executed, on_fill when executed
+    amount grows. Kickex reports partial fills of open orders as
+    'accepted' with growing executed. Callbacks run in polling thread.
+    Requests and callbacks are made without holding the lock, so watch,
+    unwatch and watched never wait for the network, and callbacks may
+    call them.
+    """
+
+    def __init__(
+            self,
+            client,
+            on_change: Optional[OrderCallback] = None,
+            on_fill: Optional[OrderCallback] = None,
+            books=None,
+            min_interval: float = 0.5,
+            max_interval: float = 10.0,
+            far_distance: float = 0.02,
+            book_interval: float = 1.0,
+            coalesce: int = 3,
+            clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param client: Kickex or any API with get_order_state and get_user_orders
+        :param books: anything with get_order_book, ex. SharedOrderBooks, to
+            measure distance to the touch. client by default
+        :param min_interval: float. seconds between checks of order at the touch
+        :param max_interval: float. seconds between checks of far orders
+        :param far_distance: float. share of price, ex. 0.02 is 2% from the touch
+        :param book_interval: float. seconds order book is reused for
+        :param coalesce: int. due orders from which get_user_orders is used,
+            0 to always check orders one by one
+        """
+        self.client = client
+        self.on_change = on_change
+        self.on_fill = on_fill
+        self.books = client if books is None else books
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.far_distance = far_distance
+        self.book_interval = book_interval
+        self.coalesce = coalesce
+        self.clock = clock
+        self.orders: Dict[int, dict] = {}
+        self.schedule: List[tuple] = []  # heap of (check time, order_id)
+        self.due: Dict[int, float] = {}  # order_id: check time, newest schedule wins
+        self.book: Optional[dict] = None
+        self.book_time: Optional[float] = None
+        self.requests = 0
+        self.fills = 0
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()  # new order to schedule
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def watch(self, order: dict) -> None:
+        """
+        :param order: place_order result or any order in parse_orders shape
+        """
+        with self._lock:
+            self.orders[order['order_id']] = dict(order)
+            self.reschedule(order['order_id'], self.min_interval)
+        self._wake.set()
+
+    def unwatch(self, order_id) -> None:
+        with self._lock:
+            self.orders.pop(int(order_id), None)
+            self.due.pop(int(order_id), None)
+
+    def watched(self) -> List[dict]:
+        with self._lock:
+            return [dict(order) for order in self.orders.values()]
+
+    def reschedule(self, order_id: int, interval: float) -> None:
+        at = self.clock() + interval
+        self.due[order_id] = at
+        heapq.heappush(self.schedule, (at, order_id))
+
+    def get_touch(self) -> Optional[dict]:
+        """
+        :return: {'buy': best bid, 'sell': best ask} floats, None without book
+        """
+        now = self.clock()
+        if self.book_time is None or now - self.book_time >= self.book_interval:
+            self.book_time = now
+            result = self.books.get_order_book()
+            if self.books is self.client:
+                self.requests += 1
+            if result['ok'] and result['result']['asks'] and result['result']['bids']:
+                self.book = {
+                    'buy': float(result['result']['bids'][0][0]),
+                    'sell': float(result['result']['asks'][0][0]),
+                }
+        return self.book
+
+    def get_interval(self, order: dict, touch: Optional[dict]) -> float:
+        """
+        Seconds to the next check of order, by its distance from the touch.
+        """
+        if touch is None or order.get('price') is None:
+            return self.min_interval
+        best = touch[order['side']]
+        price = float(order['price'])
+        if order['side'] == 'buy':
+            distance = (best - price) / best
+        else:
+            distance = (price - best) / best
+        share = min(1.0, max(0.0, distance) / self.far_distance)
+        return self.min_interval + (self.max_interval - self.min_interval) * share
+
+    def poll(self) -> float:
+        """
+        Check orders which are due.
+
+        :return: seconds until the next check is due
+        """
+        with self._lock:
+            now = self.clock()
+            due = []
+            while self.schedule and self.schedule[0][0] <= now:
+                at, order_id = heapq.heappop(self.schedule)
+                if self.due.get(order_id) == at:  # else unwatched or rescheduled
+                    del self.due[order_id]  # same time may be in the heap twice
+                    due.append(order_id)
+            for order_id in due:  # retry slot, if check fails
+                self.reschedule(order_id, self.min_interval)
+        if due:
+            touch = self.get_touch()
+            if self.coalesce and len(due) >= self.coalesce:
+                self.check_active(touch)
+            else:
+                for order_id in due:
+                    self.check_order(order_id, touch)
+        with self._lock:
+            while self.schedule and self.due.get(self.schedule[0][1]) != self.schedule[0][0]:
+                heapq.heappop(self.schedule)  # drop stale entries
+            if not self.schedule:
+                return self.max_interval
+            return max(0.0, self.schedule[0][0] - self.clock())
+
+    def check_order(self, order_id: int, touch: Optional[dict]) -> None:
+        result = self.client.get_order_state(str(order_id))
+        self.requests += 1
+        if result['ok']:
+            self.update(result['result'], touch)
+
+    def check_active(self, touch: Optional[dict]) -> None:
+        result = self.client.get_user_orders('active')
+        self.requests += 1
+        if not result['ok']:
+            return
+        active = {order['order_id']: order for order in result['result']['orders']}
+        with self._lock:
+            watched = list(self.orders)
+        for order_id in watched:
+            if order_id in active:
+                self.update(active[order_id], touch)
+            else:  # finished since the last check
+                self.check_order(order_id, touch)
+
+    def update(self, order: dict, touch: Optional[dict]) -> None:
+        order_id = order['order_id']
+        with self._lock:
+            previous = self.orders.get(order_id)
+            if previous is None:
+                return  # unwatched meanwhile
+            self.orders[order_id] = dict(order)
+            filled = previous['executed'] != order['executed']
+            if filled:
+                self.fills += 1
+            if order['status'] in FINAL_STATUSES:
+                self.unwatch(order_id)
+            else:
+                self.reschedule(
+                    order_id, self.min_interval if filled else self.get_interval(order, touch)
+                )
+
+        if filled and self.on_fill is not None:
+            self.on_fill(previous, order)
+        if previous['status'] != order['status'] and self.on_change is not None:
+            self.on_change(previous, order)
+
+    def run(self) -> None:
+        """
+        Poll until stop is called.
+        """
+        while not self._stop.is_set():
+            try:
+                timeout = self.poll()
+            except Exception:  # network trouble, due orders are retried
+                timeout = self.min_interval
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def start(self) -> None:
+        """
+        Poll in background thread.
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def metrics(self) -> dict:
+        return {
+            'requests': self.requests,
+            'fills': self.fills,
+            'requests per fill': self.requests / self.fills if self.fills else None,
+            'watched': len(self.orders),
+        }
@@ -0,0 +1,335 @@
+from decimal import Decimal
+from itertools import repeat
+from typing import List, Optional, Sequence, Tuple, Union
+
+# numeric modes of Kickex
+FLOAT = 'float'
+FIXED = 'fixed'
+
+# roundings of Fixed.quantize
+DOWN = 'down'
+UP = 'up'
+HALF_UP = 'half_up'
+
+Number = Union['Fixed', int]
+# digits to zeros, '12.50' and '31.07' have the same shape '00.00'
+SHAPES = str.maketrans('123456789', '000000000')
+
+
+class Fixed:
+    """
+    Exact decimal number as integer value scaled by 10 ** decimals.
+
+    Fixed.parse('0.0465', 6) -> Fixed(46500, 6), str() gives '0.046500'
+    back, so prices and amounts go to place_order without float round trip.
+    Sum and difference keep the bigger scale, product adds scales
+    (price * amount is exact notional).
+    """
+
+    __slots__ = ('value', 'decimals')
+
+    def __init__(self, value: int, decimals: int) -> None:
+        self.value = value
+        self.decimals = decimals
+
+    @classmethod
+    def parse(cls, number, decimals: Optional[int] = None) -> 'Fixed':
+        """
+        :param number: str, int, float or Decimal. ex. '0.0465'
+        :param decimals: int. scale, ex. quote_decimals of the pair. If None,
+            as many as number has. Extra digits are rounded half up
+        """
+        if type(number) is str and decimals is not None:
+            # usual case, plain string with at most decimals digits after point
+            whole, _, fraction = number.partition('.')
+            shift = decimals - len(fraction)
+            if shift >= 0:
+                try:
+                    value = int(whole + fraction)
+                except ValueError:  # exponent or garbage, see below
+                    pass
+                else:
+                    fixed = object.__new__(cls)
+                    fixed.value = value * 10 ** shift if shift else value
+                    fixed.decimals = decimals
+                    return fixed
+
+        if type(number) is str and 'e' not in number and 'E' not in number:
+            text = number
+        elif isinstance(number, Fixed):
+            return number if decimals is None else number.rescale(decimals)
+        elif isinstance(number, float):
+            text = repr(number)
+            if 'e' in text:
+                text = format(Decimal(text), 'f')
+        else:
+            text = format(Decimal(str(number).strip()), 'f')
+
+        whole, _, fraction = text.partition('.')
+        if whole in ('', '-', '+'):  # '.5', '-.5'
+            whole += '0'
+        if decimals is None:
+            decimals = len(fraction)
+        if len(fraction) == decimals:  # usual case, kickex pads to decimals
+            value = int(whole + fraction)
+        elif len(fraction) < decimals:
+            value = int(whole + fraction) * 10 ** (decimals - len(fraction))
+        else:
+            negative = whole.startswith('-')
+            whole = whole.lstrip('+-')
+            value = int(whole + fraction[:decimals].ljust(decimals, '0'))
+            if len(fraction) > decimals and fraction[decimals] >= '5':
+                value += 1
+            if negative:
+                value = -value
+        fixed = object.__new__(cls)
+        fixed.value = value
+        fixed.decimals = decimals
+        return fixed
+
+    def rescale(self, decimals: int) -> 'Fixed':
+        """
+        Same number with another scale, rounded half up when scale shrinks.
+        """
+        shift = decimals - self.decimals
+        if shift >= 0:
+            return Fixed(self.value * 10 ** shift, decimals)
+        quotient, remainder = divmod(abs(self.value), 10 ** -shift)
+        if 2 * remainder >= 10 ** -shift:
+            quotient += 1
+        return Fixed(quotient if self.value >= 0 else -quotient, decimals)
+
+    def quantize(self, step: 'Fixed', rounding: str = HALF_UP) -> 'Fixed':
+        """
+        Nearest multiple of step, ex. of price tick size, with scale of step.
+
+        :param rounding: DOWN and UP are towards and away from zero, HALF_UP
+            is the nearest one with halves away from zero
+        """
+        value, step_value, _ = self._align(step)
+        quotient, remainder = divmod(abs(value), step_value)
+        if remainder and (
+                rounding == UP or rounding == HALF_UP and 2 * remainder >= step_value
+        ):
+            quotient += 1
+        value = quotient * step.value
+        return Fixed(value if self.value >= 0 else -value, step.decimals)
+
+    def __str__(self) -> str:
+        return format_scaled(self.value, self.decimals)
+
+    def __repr__(self) -> str:
+        return f"Fixed('{self}')"
+
+    def __float__(self) -> float:
+        return self.value / 10 ** self.decimals
+
+    def __int__(self) -> int:
+        return int(self.value / 10 ** self.decimals)
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.value).scaleb(-self.decimals)
+
+    def __hash__(self) -> int:
+        return hash(self.to_decimal())
+
+    def _align(self, other: Number):
+        if isinstance(other, int):
+            other = Fixed(other, 0)
+        elif not isinstance(other, Fixed):
+            return None
+        if self.decimals == other.decimals:
+            return self.value, other.value, self.decimals
+        if self.decimals > other.decimals:
+            return self.value, other.value * 10 ** (self.decimals - other.decimals), self.decimals
+        return self.value * 10 ** (other.decimals - self.decimals), other.value, other.decimals
+
+    def __add__(self, other: Number) -> 'Fixed':
+        if type(other) is Fixed and other.decimals == self.decimals:
+            return Fixed(self.value + other.value, self.decimals)
+        aligned = self._align(other)
+        if aligned is None:
+            return NotImplemented
+        return Fixed(aligned[0] + aligned[1], aligned[2])
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Number) -> 'Fixed':
+        if type(other) is Fixed and other.decimals == self.decimals:
+            return Fixed(self.value - other.value, self.decimals)
+        aligned = self._align(other)
+        if aligned is None:
+            return NotImplemented
+        return Fixed(aligned[0] - aligned[1], aligned[2])
+
+    def __rsub__(self, other: Number) -> 'Fixed':
+        return -self + other
+
+    def __neg__(self) -> 'Fixed':
+        return Fixed(-self.value, self.decimals)
+
+    def __abs__(self) -> 'Fixed':
+        return Fixed(abs(self.value), self.decimals)
+
+    def __mul__(self, other: Number) -> 'Fixed':
+        if type(other) is Fixed:
+            return Fixed(self.value * other.value, self.decimals + other.decimals)
+        if isinstance(other, int):
+            return Fixed(self.value * other, self.decimals)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def divide(self, other: Number, decimals: int) -> 'Fixed':
+        """
+        Division rounded half up to decimals, ex. vwap = notional.divide(amount, 6)
+        """
+        other = other if isinstance(other, Fixed) else Fixed(other, 0)
+        numerator = self.value * 10 ** (decimals + other.decimals - self.decimals)
+        quotient, remainder = divmod(abs(numerator), abs(other.value))
+        if 2 * remainder >= abs(other.value):
+            quotient += 1
+        negative = (numerator < 0) != (other.value < 0)
+        return Fixed(-quotient if negative else quotient, decimals)
+
+    def __bool__(self) -> bool:
+        return bool(self.value)
+
+    def __eq__(self, other) -> bool:
+        aligned = self._align(other)
+        if aligned is None:
+            return NotImplemented
+        return aligned[0] == aligned[1]
+
+    def __lt__(self, other: Number) -> bool:
+        aligned = self._align(other)
+        if aligned is None:
+            return NotImplemented
+        return aligned[0] < aligned[1]
+
+    def __le__(self, other: Number) -> bool:
+        aligned = self._align(other)
+        if aligned is None:
+            return NotImplemented
+        return aligned[0] <= aligned[1]
+
+    def __gt__(self, other: Number) -> bool:
+        aligned = self._align(other)
+        if aligned is None:
+            return NotImplemented
+        return aligned[0] > aligned[1]
+
+    def __ge__(self, other: Number) -> bool:
+        aligned = self._align(other)
+        if aligned is None:
+            return NotImplemented
+        return aligned[0] >= aligned[1]
+
+
+def format_scaled(value: int, decimals: int) -> str:
+    """
+    Decimal string of value / 10 ** decimals without creating Fixed.
+    """
+    if not decimals:
+        return str(value)
+    digits = str(abs(value)).rjust(decimals + 1, '0')
+    sign = '-' if value < 0 else ''
+    return f'{sign}{digits[:-decimals]}.{digits[-decimals:]}'
+
+
+def get_fixed_value_or_None(value, decimals: Optional[int] = None) -> Optional[Fixed]:
+    if value is None:
+        return None
+    return Fixed.parse(value, decimals)
+
+
+def parse_column(numbers: Sequence, decimals: Optional[int] = None) -> Tuple[List[int], int]:
+    """
+    Scaled ints of many numbers at one scale, ex. prices of order book side.
+
+    Columns of strings with the same digits after point, like kickex
+    sends them, are converted in a few passes over one joined string,
+    other columns number by number with Fixed.parse.
+
+    :param numbers: str, int, float, Decimal or Fixed
+    :param decimals: int. common scale, if None the largest of numbers
+    :return: (scaled ints, decimals)
+    """
+    if not numbers:
+        return [], decimals or 0
+    scale = decimals
+    first = numbers[0]
+    if type(first) is str:
+        if scale is None:
+            point = first.find('.')
+            scale = 0 if point < 0 else len(first) - point - 1
+        try:
+            text = ' '.join(numbers) + ' '
+        except TypeError:  # not only strings
+            text = ''
+        # every number has point followed by scale digits, or none if scale is 0
+        shapes = text.translate(SHAPES)
+        expected = len(numbers) if scale else 0
+        if shapes.count('.') == expected and (
+                not scale or shapes.count('.' + '0' * scale + ' ') == expected
+        ):
+            try:
+                values = list(map(int, text.replace('.', '').split()))
+            except ValueError:  # exponents, garbage
+                values = []
+            if len(values) == len(numbers):
+                return values, scale
+    if decimals is None:
+        decimals = max(Fixed.parse(number).decimals for number in numbers)
+    parse = Fixed.parse
+    return [parse(number, decimals).value for number in numbers], decimals
+
+
+def to_fixed_levels(
+        levels,
+        price_decimals: Optional[int] = None,
+        amount_decimals: Optional[int] = None,
+) -> List[Tuple[Fixed, Fixed]]:
+    """
+    All prices get one scale and all amounts another, so notional and
+    other sums can work on plain values.
+
+    :param levels: [(price, amount), ...] strings of order book side
+    :param price_decimals: int. ex. quote_decimals of the pair, None for
+        the largest of prices
+    :param amount_decimals: int. same for amounts
+    """
+    if not levels:
+        return []
+    prices, amounts = zip(*levels)
+    prices, price_decimals = parse_column(prices, price_decimals)
+    amounts, amount_decimals = parse_column(amounts, amount_decimals)
+    return list(zip(
+        map(Fixed, prices, repeat(price_decimals)),
+        map(Fixed, amounts, repeat(amount_decimals)),
+    ))
+
+
+def notional(levels) -> Fixed:
+    """
+    Sum of price * amount over [(Fixed, Fixed), ...] in plain integers.
+    Levels of to_fixed_levels share scales, others are rescaled first.
+    """
+    if not levels:
+        return Fixed(0, 0)
+    price_decimals, amount_decimals = levels[0][0].decimals, levels[0][1].decimals
+    total = 0
+    for price, amount in levels:
+        if price.decimals != price_decimals or amount.decimals != amount_decimals:
+            break
+        total += price.value * amount.value
+    else:
+        return Fixed(total, price_decimals + amount_decimals)
+
+    price_decimals = max(price.decimals for price, _ in levels)
+    amount_decimals = max(amount.decimals for _, amount in levels)
+    total = sum(
+        price.rescale(price_decimals).value * amount.rescale(amount_decimals).value
+        for price, amount in levels
+    )
+    return Fixed(total, price_decimals + amount_decimals)
@@ -0,0 +1,147 @@
+import json
+import sqlite3
+from typing import Iterable, Iterator, List, Optional
+
+
+class OrderHistoryStore:
+    """
+    Local append-only copy of kickex orders history in SQLite.
+
+    Raw kickex orders are kept as json, indexed by orderId and
+    createdTimestamp. synced_mark tells from where to continue
+    downloading, ids of orders stored in a non final state are kept
+    aside to be refetched, see Kickex.sync_orders_history.
+    """
+
+    FINAL_STATES = (5, 6, 7)  # executed, rejected, cancelled
+
+    def __init__(self, path: str = 'orders_history.sqlite3') -> None:
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS orders (
+                order_id INTEGER PRIMARY KEY,
+                pair TEXT,
+                created_timestamp INTEGER,
+                raw TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS orders_pair_created
+                ON orders (pair, created_timestamp);
+            CREATE TABLE IF NOT EXISTS synced_marks (
+                pair TEXT PRIMARY KEY,
+                created_timestamp INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS open_orders (
+                order_id INTEGER PRIMARY KEY
+            );
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def add(self, orders: Iterable[dict]) -> int:
+        """
+        Save raw kickex orders, already stored ones are replaced.
+
+        :return: number of saved orders
+        """
+        orders = list(orders)
+        rows = [
+            (
+                int(order['orderId']),
+                order.get('pairName'),
+                _int_or_none(order.get('createdTimestamp')),
+                json.dumps(order, separators=(',', ':')),
+            )
+            for order in orders
+        ]
+        open_ids = [
+            (row[0],) for row, order in zip(rows, orders)
+            if order.get('state') not in self.FINAL_STATES
+        ]
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO orders VALUES (?, ?, ?, ?)', rows
+            )
+            self.connection.executemany(
+                'DELETE FROM open_orders WHERE order_id = ?', [(row[0],) for row in rows]
+            )
+            self.connection.executemany(
+                'INSERT INTO open_orders VALUES (?)', open_ids
+            )
+        return len(rows)
+
+    def open_order_ids(self, pair: str, until: Optional[int] = None) -> List[int]:
+        """
+        :param until: createdTimestamp in nanoseconds, exclusive
+        :return: ids of stored orders of pair which were not final yet
+        """
+        query = (
+            'SELECT orders.order_id FROM open_orders'
+            ' JOIN orders ON orders.order_id = open_orders.order_id'
+            ' WHERE pair = ?'
+        )
+        params = [pair]
+        if until is not None:
+            query += ' AND created_timestamp < ?'
+            params.append(until)
+        return [row[0] for row in self.connection.execute(query, params)]
+
+    def synced_mark(self, pair: str) -> Optional[int]:
+        """
+        :return: createdTimestamp in nanoseconds up to which the whole
+            history of pair is stored, None before the first complete sync.
+            It doesn't move on interrupted syncs
+        """
+        row = self.connection.execute(
+            'SELECT created_timestamp FROM synced_marks WHERE pair = ?', (pair,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def set_synced_mark(self, pair: str, created_timestamp: int) -> None:
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO synced_marks VALUES (?, ?)', (pair, created_timestamp)
+            )
+
+    def count(self, pair: Optional[str] = None) -> int:
+        if pair is None:
+            return self.connection.execute('SELECT COUNT(*) FROM orders').fetchone()[0]
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM orders WHERE pair = ?', (pair,)
+        ).fetchone()[0]
+
+    def iter_orders(
+            self,
+            pair: str,
+            since: Optional[int] = None,
+            until: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """
+        Stream raw orders of pair ordered by createdTimestamp.
+
+        :param since: nanoseconds, inclusive
+        :param until: nanoseconds, exclusive
+        """
+        query = 'SELECT raw FROM orders WHERE pair = ?'
+        params = [pair]
+        if since is not None:
+            query += ' AND created_timestamp >= ?'
+            params.append(since)
+        if until is not None:
+            query += ' AND created_timestamp < ?'
+            params.append(until)
+        query += ' ORDER BY created_timestamp'
+        for (raw,) in self.connection.execute(query, params):
+            yield json.loads(raw)
+
+
+def _int_or_none(value) -> Optional[int]:
+    if value is None:
+        return None
+    return int(value)
@@ -0,0 +1,250 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from inspect import iscoroutinefunction
+from typing import Callable, Dict, List, Optional, Tuple
+
+# endpoint method being executed in current thread / task
+current_endpoint: ContextVar[Optional[str]] = ContextVar('endpoint', default=None)
+
+TOTAL = 'total'
+SIGN = 'sign'
+NETWORK = 'network'
+DECODE = 'decode'
+PARSE = 'parse'
+
+
+class Instrumentation:
+    """
+    Receiver of timings and errors from Kickex endpoint methods.
+
+    Every endpoint call gives one TOTAL record and one record per phase:
+    SIGN (get_headers_and_stuff), NETWORK (request incl. retries),
+    DECODE (json) and PARSE (parse_*). Times are time.perf_counter values.
+    """
+
+    def record(self, endpoint: str, phase: str, start: float, end: float) -> None:
+        pass
+
+    def error(self, endpoint: str, code) -> None:
+        """
+        :param code: kickex error code or exception class name
+        """
+
+
+class HistogramRecorder(Instrumentation):
+    """
+    Latency histograms per (endpoint, phase) and error counters per
+    (endpoint, code), exportable as Prometheus text.
+    """
+
+    BUCKETS = (
+        0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005,
+        0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+    )
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+        self.histograms: Dict[Tuple[str, str], List[int]] = defaultdict(
+            lambda: [0] * (len(self.buckets) + 1)
+        )
+        self.sums: Dict[Tuple[str, str], float] = defaultdict(float)
+        self.errors: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, phase: str, start: float, end: float) -> None:
+        duration = end - start
+        i = bisect_left(self.buckets, duration)
+        with self._lock:
+            self.histograms[(endpoint, phase)][i] += 1
+            self.sums[(endpoint, phase)] += duration
+
+    def error(self, endpoint: str, code) -> None:
+        with self._lock:
+            self.errors[(endpoint, str(code))] += 1
+
+    def quantile(self, endpoint: str, phase: str, q: float) -> Optional[float]:
+        """
+        Upper bound of the bucket where quantile q falls, ex. q=0.99.
+        """
+        with self._lock:
+            counts = list(self.histograms.get((endpoint, phase), ()))
+        total = sum(counts)
+        if not total:
+            return None
+        seen = 0
+        for i, count in enumerate(counts):
+            seen += count
+            if seen >= q * total:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+
+    def to_prometheus(self, prefix: str = 'kickex') -> str:
+        lines = [
+            f'# TYPE {prefix}_phase_seconds histogram',
+        ]
+        with self._lock:
+            for (endpoint, phase), counts in sorted(self.histograms.items()):
+                labels = f'endpoint="{endpoint}",phase="{phase}"'
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), counts):
+                    cumulative += count
+                    lines.append(
+                        f'{prefix}_phase_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f'{prefix}_phase_seconds_sum{{{labels}}} {self.sums[(endpoint, phase)]}')
+                lines.append(f'{prefix}_phase_seconds_count{{{labels}}} {cumulative}')
+            lines.append(f'# TYPE {prefix}_errors_total counter')
+            for (endpoint, code), count in sorted(self.errors.items()):
+                lines.append(
+                    f'{prefix}_errors_total{{endpoint="{endpoint}",code="{code}"}} {count}'
+                )
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str, prefix: str = 'kickex') -> None:
+        """
+        Write text file for node_exporter textfile collector.
+        """
+        with open(path, 'w') as f:
+            f.write(self.to_prometheus(prefix))
+
+
+class SpanExporter(Instrumentation):
+    """
+    Turns records into OpenTelemetry-like span dicts and passes them to export.
+    Phase spans have parent endpoint name in attributes.
+    """
+
+    def __init__(self, export: Callable[[dict], None]) -> None:
+        self.export = export
+
+    def record(self, endpoint: str, phase: str, start: float, end: float) -> None:
+        name = endpoint if phase == TOTAL else f'{endpoint}.{phase}'
+        self.export({
+            'name': name,
+            'start_time': start,
+            'end_time': end,
+            'attributes': {'endpoint': endpoint, 'phase': phase},
+        })
+
+    def error(self, endpoint: str, code) -> None:
+        self.export({
+            'name': f'{endpoint}.error',
+            'start_time': time.perf_counter(),
+            'end_time': None,
+            'attributes': {'endpoint': endpoint, 'code': str(code)},
+        })
+
+
+def get_error_code(result) -> Optional[object]:
+    """
+    Kickex error code from raw answer or from parse_* result.
+    """
+    if not isinstance(result, dict):
+        return None
+    if 'ok' in result and 'result' in result:
+        if result['ok']:
+            return None
+        result = result['result']
+        if not isinstance(result, dict):
+            return None
+    return result.get('code')
+
+
+def install(client, instrumentation: Optional[Instrumentation]) -> None:
+    """
+    Wrap client methods listed in client.TRACED_METHODS and
+    client.PHASE_METHODS on instance level. Class methods stay untouched,
+    so without instrumentation there is no overhead at all.
+    """
+    for name in tuple(client.TRACED_METHODS) + tuple(client.PHASE_METHODS):
+        client.__dict__.pop(name, None)
+    client.instrumentation = instrumentation
+    if instrumentation is None:
+        return
+    for name in client.TRACED_METHODS:
+        setattr(client, name, traced(getattr(client, name), name, instrumentation))
+    for name, phase in client.PHASE_METHODS.items():
+        setattr(client, name, timed(getattr(client, name), phase, instrumentation))
+
+
+def traced(method, name: str, instrumentation: Instrumentation):
+    """
+    Endpoint method wrapper: total time and errors.
+
+    Endpoint called by another one, ex. fetch_order by get_order_state,
+    is not recorded: its phases and errors belong to the outer call.
+    """
+    if iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            if current_endpoint.get() is not None:
+                return await method(*args, **kwargs)
+            token = current_endpoint.set(name)
+            start = time.perf_counter()
+            try:
+                result = await method(*args, **kwargs)
+            except Exception as e:
+                instrumentation.error(name, type(e).__name__)
+                raise
+            finally:
+                instrumentation.record(name, TOTAL, start, time.perf_counter())
+                current_endpoint.reset(token)
+            code = get_error_code(result)
+            if code is not None:
+                instrumentation.error(name, code)
+            return result
+    else:
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if current_endpoint.get() is not None:
+                return method(*args, **kwargs)
+            token = current_endpoint.set(name)
+            start = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            except Exception as e:
+                instrumentation.error(name, type(e).__name__)
+                raise
+            finally:
+                instrumentation.record(name, TOTAL, start, time.perf_counter())
+                current_endpoint.reset(token)
+            code = get_error_code(result)
+            if code is not None:
+                instrumentation.error(name, code)
+            return result
+
+    return wrapper
+
+
+def timed(method, phase: str, instrumentation: Instrumentation):
+    """
+    Wrapper for method doing one phase of endpoint call.
+    Records only when called from traced endpoint method.
+    """
+    if iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            endpoint = current_endpoint.get()
+            if endpoint is None:
+                return await method(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                instrumentation.record(endpoint, phase, start, time.perf_counter())
+    else:
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            endpoint = current_endpoint.get()
+            if endpoint is None:
+                return method(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                instrumentation.record(endpoint, phase, start, time.perf_counter())
+
+    return wrapper
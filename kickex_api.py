@@ -1,40 +1,118 @@
 import base64
+import copy
 import hashlib
 import hmac
 import json
-from functools import reduce
-from typing import List, Optional
+import threading
+from typing import TYPE_CHECKING, Iterator, List, Optional, Union
 from urllib import parse
 
-import requests
 import time
 
-from base_api import API, EmptyKeysException
-from config import KICKEX_PUB_KEY, KICKEX_PR_KEY, KICKEX_PASSWORD
-
-
-class Kickex(API):
-    """wrapper for kickex.com exchange api"""
-
-    ORDER_STATUSES = {
-        1: 'pending',  # 1 отложенный по каким - то причинам ордер
-        2: 'on hold',  # 2 состояние торгового ордера после подтверждения сервисом SOB тогда
-        3: 'placing',  # 3 ордер находится в процессе доставки в свой сервис(матчер или SOB)
-        4: 'accepted',  # 4 ордер на исполнении(размещен в LOB или в SOB);
-        5: 'executed',  # 5 исполненный ордер
-        6: 'rejected',  # 6 ордер, в исполнении которого отказано
-        7: 'cancelled',  # 7 отмененный ордер.
-        45: 'partially executed',  # статус для внутреннего пользования, кикекс такой не присылает
+from base_api import API, EmptyKeysException, ResponseException
+from decoders import JSONDecoder, get_decoder
+from fixed_point import FLOAT, Fixed
+from instrumentation import (
+    DECODE, NETWORK, PARSE, SIGN, Instrumentation, install,
+)
+from balance_cache import BalanceCache
+from kickex_parsers import KickexParser, get_float_value_or_None  # noqa: F401, re-export
+from order_store import OrderStore
+from pair_metadata import INVALID_ORDER, PairMetadata, PairSpec
+from rate_limiter import (
+    CRITICAL, HIGH, HISTORY, LOW, MARKET, NORMAL, TRADING, RequestScheduler,
+)
+from signing import KickexSigner
+from config import DEFAULT_KEY_SET, get_credentials
+
+if TYPE_CHECKING:  # heavy imports, loaded only by code which needs them
+    import requests
+
+    from history_store import OrderHistoryStore
+
+
+class Kickex(KickexParser, API):
+    """
+    wrapper for kickex.com exchange api
+
+    requests, .env and api keys are loaded on construction, parse_*
+    methods alone are in kickex_parsers.KickexParser.
+    """
+
+    # methods timed when client has instrumentation
+    TRACED_METHODS = (
+        'get_order_book', 'check_accounts_state', 'place_order', 'cancel_order',
+        'get_user_orders', 'get_order_state', 'fetch_order', 'get_orders_history',
+        'fetch_balance', 'fetch_pairs',
+    )
+    PHASE_METHODS = {
+        'get_headers_and_stuff': SIGN,
+        'request': NETWORK,
+        'decode': DECODE,
+        'decode_order_book': DECODE,
+        'parse_get_order_book': PARSE,
+        'parse_check_accounts_state': PARSE,
+        'parse_placing_order_result': PARSE,
+        'parse_cancel_order': PARSE,
+        'parse_user_orders': PARSE,
+        'parse_order_state': PARSE,
     }
 
-    SIDES = {
-        'buy': 0,
-        'sell': 1,
-    }
-    SIDES.update({v: k for k, v in SIDES.items()})
+    HISTORY_PAGE_SIZE = 500
+    HISTORY_LIMIT_PARAM = 'limit'
+    HISTORY_OFFSET_PARAM = 'offset'
 
-    def __init__(self, market: str = "eth_usdt") -> None:
-        super().__init__(market)
+    def __init__(
+            self,
+            market: str = "eth_usdt",
+            pool_size: int = 10,
+            timeout: float = 10,
+            retries: int = 3,
+            backoff_factor: float = 0.3,
+            decoder: Union[str, JSONDecoder] = 'json',
+            scheduler: Optional[RequestScheduler] = None,
+            order_store: Optional[OrderStore] = None,
+            balance_cache: Optional[BalanceCache] = None,
+            instrumentation: Optional[Instrumentation] = None,
+            numeric: str = FLOAT,
+            pairs: Optional[PairMetadata] = None,
+            pub_key: Optional[str] = None,
+            pr_key: Optional[str] = None,
+            password: Optional[str] = None,
+            key_set: str = DEFAULT_KEY_SET,
+    ) -> None:
+        """
+        :param market: string. ex. 'del_usdt'
+        :param pool_size: int. max keep-alive connections kept to the gate
+        :param timeout: float. seconds to wait for connect and for response
+        :param retries: int. retries for connection errors and 429/5xx
+            responses. POST and DELETE are never retried on response status
+            so an order can't be placed or cancelled twice
+        :param backoff_factor: float. sleep between retries is
+            backoff_factor * 2 ** (retry number - 1)
+        :param decoder: 'json', 'orjson', 'msgspec', 'auto' or JSONDecoder
+            instance used for all responses. See decoders.get_decoder
+        :param scheduler: RequestScheduler pacing all requests, may be shared
+            by several clients using the same keys. No pacing if None
+        :param order_store: OrderStore kept up to date by endpoint methods,
+            get_order_state reads it before fetching order
+        :param balance_cache: BalanceCache kept up to date by endpoint
+            methods, check_accounts_state reads it before downloading balances
+        :param instrumentation: receiver of per phase timings and errors of
+            endpoint methods, ex. HistogramRecorder. Nothing is timed if None
+        :param numeric: 'float' or 'fixed'. With 'fixed' prices, amounts,
+            balances and order book levels are exact fixed_point.Fixed
+            scaled by base/quote decimals of the pair instead of floats
+        :param pairs: PairMetadata, may be shared by clients. With it
+            place_order rounds amount and price to pair steps and rejects
+            too small orders without sending them. See get_pair_spec
+        :param pub_key: string. api key, by default from env / .env
+        :param pr_key: string. api secret, by default from env / .env
+        :param password: string. api key password, by default from env / .env
+        :param key_set: string. prefix of env variables with keys, ex.
+            'KICKEX_MM' for KICKEX_MM_PUB_KEY etc. See config.get_credentials
+        """
+        API.__init__(self, market)
 
         self.BASE_URI = "https://gate.kickex.com/api/v1"
         self.GET_DEPTH_URI = "/market/orderbook"
@@ -45,123 +123,319 @@ class Kickex(API):
         self.GET_ORDER_STATE = '/ordersHistory'
         self.FETCH_ORDER = '/order'
         self.GET_ORDERS_HISTORY = '/ordersHistory'
+        self.GET_PAIRS_URI = '/market/pairs'  # assumed, see PairSpec
 
-        self.kkx_pubKey = KICKEX_PUB_KEY
-        self.kkx_prKey = KICKEX_PR_KEY
-        self.password = KICKEX_PASSWORD
+        self.kkx_pubKey, self.kkx_prKey, self.password = get_credentials(
+            pub_key, pr_key, password, key_set
+        )
 
         if not all([self.kkx_pubKey, self.kkx_prKey, self.password]):
-            raise EmptyKeysException('Kickex has no api keys')
+            raise EmptyKeysException(
+                f'Kickex has no api keys: pass them or set {key_set}_PUB_KEY, '
+                f'{key_set}_PR_KEY and {key_set}_PASSWORD like in .env.example'
+            )
+        self.signer = KickexSigner(self.kkx_pubKey, self.kkx_prKey, self.password)
 
         self.pair_name = f'{self.currency_1}/{self.currency_2}'
+        self.set_numeric(numeric)
+
+        self.decoder = get_decoder(decoder)
+        self.scheduler = scheduler
+        self.order_store = order_store
+        self.balance_cache = balance_cache
+        self.pairs = pairs
+        install(self, instrumentation)
+        self.timeout = timeout
+        self.session = self.create_session(pool_size, retries, backoff_factor)
+
+    def for_market(self, market: str) -> 'Kickex':
+        """
+        Client for another market sharing connection pool, signing context,
+        scheduler and order store with this one. Closing any of them closes
+        the shared pool. See AsyncKickex.for_market for the async pool.
+        """
+        client = copy.copy(self)
+        API.__init__(client, market)
+        client.pair_name = f'{client.currency_1}/{client.currency_2}'
+        install(client, self.instrumentation)  # rebind wrappers to the copy
+        return client
 
-    def get_order_book(self) -> dict:
-        url = self.BASE_URI + self.GET_DEPTH_URI + f"?pairName={self.pair_name}"
-        order_book = requests.get(url).json()
-        return self.parse_get_order_book(order_book=order_book)
-
-    def parse_get_order_book(self, order_book: dict) -> dict:
-        if 'asks' in order_book and 'bids' in order_book:
-            ok = True
-            result = {
-                "asks": [
-                    (order['price'], order['amount']) for order in order_book["asks"]
-                ],
-                "bids": [
-                    (order['price'], order['amount']) for order in order_book["bids"]
-                ],
-            }
-        else:
-            ok = False
-            result = order_book
+    @staticmethod
+    def create_session(
+            pool_size: int,
+            retries: int,
+            backoff_factor: float,
+    ) -> 'requests.Session':
+        """
+        Session keeps connections to the gate alive between calls,
+        so only the first request pays for DNS + TCP + TLS handshake.
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
 
-        return {
-            'ok': ok,
-            'result': result,
-        }
+    def request(
+            self,
+            method: str,
+            url: str,
+            group: str = TRADING,
+            priority: int = NORMAL,
+            **kwargs,
+    ) -> 'requests.Response':
+        """
+        :param group: rate limit group, see rate_limiter
+        :param priority: rate limiter lane, lower goes first
+        """
+        if self.scheduler is not None:
+            self.scheduler.acquire(group, priority)
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def request_json(self, method: str, url: str, **kwargs):
+        return self.decode(self.request(method, url, **kwargs).content)
+
+    def decode(self, content: bytes):
+        return self.decoder.loads(content)
+
+    def decode_order_book(self, content: bytes) -> Optional[dict]:
+        return self.decoder.decode_order_book(content)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def start_recording(self, path: str) -> None:
+        """
+        Write all following requests and answers to path, see recording.
+        """
+        from recording import RecordingSession
+
+        self.session = RecordingSession(self.session, path)
+
+    def start_replay(self, path: str, speed: Optional[float] = 1.0) -> None:
+        """
+        Answer all following requests from recording instead of network.
+
+        :param speed: 1 keeps recorded durations, None answers instantly
+        """
+        from recording import ReplaySession
+
+        self.session.close()
+        self.session = ReplaySession(path, speed)
+
+    def on_order_placed(self, result: dict) -> None:
+        """
+        Update local state with place_order result.
+        """
+        if not result['ok']:
+            return
+        if self.order_store is not None:
+            self.order_store.update(result['result'])
+        if self.balance_cache is not None:
+            self.balance_cache.on_order_placed(result['result'], self.pair_name)
+            self.balance_cache.on_orders([result['result']])
+
+    def on_order_cancelled(self, order_id: str, result: dict) -> None:
+        """
+        Update local state with cancel_order result.
+        """
+        if self.order_store is not None:
+            self.order_store.invalidate(order_id)
+        if self.balance_cache is not None:
+            if result['ok']:
+                self.balance_cache.on_order_cancelled(order_id)
+            else:
+                self.balance_cache.invalidate()
+
+    def on_orders(self, orders: List[dict], active: bool = False) -> None:
+        """
+        Update local state with fresh order states.
+
+        :param active: orders is the full list of active orders
+        """
+        if self.order_store is not None:
+            if active:
+                self.order_store.seed(orders)
+            else:
+                for order in orders:
+                    self.order_store.update(order)
+        if self.balance_cache is not None:
+            self.balance_cache.on_orders(orders)
+
+    def get_order_book(self, as_order_book: bool = False) -> dict:
+        """
+        :param as_order_book: bool. return OrderBook with numeric levels
+            as result instead of lists of (price, amount) strings
+        """
+        url = self.BASE_URI + self.GET_DEPTH_URI + f"?pairName={self.pair_name}"
+        content = self.request('GET', url, group=MARKET, priority=NORMAL).content
+
+        levels = self.decode_order_book(content)
+        if levels is not None:  # typed decoder already built levels
+            return self.parse_order_book_levels(levels, as_order_book)
+        order_book = self.decode(content)
+        return self.parse_get_order_book(
+            order_book=order_book, as_order_book=as_order_book
+        )
 
     def check_accounts_state(self) -> dict:
+        return self.parse_check_accounts_state(self.get_account_balance())
+
+    def get_account_balance(self):
+        """
+        Raw balances of all currencies. With balance_cache they are
+        downloaded only when cache is stale.
+        """
+        if self.balance_cache is not None:
+            account_balance = self.balance_cache.get()
+            if account_balance is not None:
+                return account_balance
+
+        account_balance = self.fetch_balance()
+        if self.balance_cache is not None and isinstance(account_balance, list):
+            self.balance_cache.store(account_balance)
+        return account_balance
+
+    def fetch_balance(self):
+        """
+        Raw balances of all currencies.
+        """
         method = 'GET'
         headers, url_params, params = self.get_headers_and_stuff(
             self.GET_BALANCE_URI, method=method
         )
         url = self.BASE_URI + self.GET_BALANCE_URI + url_params
-        account_balance = requests.request(
-            method, url, headers=headers, data=params
-        ).json()
-
-        return self.parse_check_accounts_state(account_balance)
-
-    def parse_check_accounts_state(self, account_balance: dict) -> dict:
-        if 'code' not in account_balance:
-            ok = True
-            balances = {
-                balance['currencyCode']: balance['available']
-                for balance in account_balance
-            }
-            bt_base = balances.get(self.currency_1, -1)  # -1 if balance for token doesn't exist
-            bt_exch = balances.get(self.currency_2, -1)
-            account_state = {
-                "account_state": {
-                    self.currency_1: float(bt_base),
-                    self.currency_2: float(bt_exch),
-                },
-            }
-            result = account_state
-        else:
-            ok = False
-            result = account_balance
-
-        return {
-            'ok': ok,
-            'result': result,
-        }
+        return self.request_json(
+            method, url, headers=headers, data=params,
+            group=TRADING, priority=NORMAL,
+        )
 
     def place_order(
         self,
         side: str,
-        amount: str,
-        price: str,
+        amount: Union[str, Fixed],
+        price: Union[str, Fixed],
         order_type: str,
     ) -> dict:
         """
         :param pair_name: string. ex. 'DEL/USDT'
         :param side: integer. 0 to buy, 1 to sell. ex. 1
-        :param amount: string. ex. '0.1'
-        :param price: string. ex. '0.112'
+        :param amount: string or Fixed. ex. '0.1'
+        :param price: string or Fixed. ex. '0.112'
         :param order_type: this method creates ONLY limit orders
         :return:
         """
-        trade_intent = self.SIDES[side]
+        if self.pairs is not None:
+            checked = self.check_order(self.get_pair_spec(), side, amount, price)
+            if not checked['ok']:
+                return checked
+            amount, price = checked['result']['amount'], checked['result']['price']
 
-        payload = {
-            "pairName": self.pair_name,
-            "orderedAmount": amount,
-            "limitPrice": price,
-            "tradeIntent": trade_intent,
-            "modifier": "GTC",
-        }
+        payload = self.get_place_order_payload(side, amount, price)
         method = 'POST'
 
         headers, url_params, body = self.get_headers_and_stuff(
             self.PLACE_ORDER_URI, method, params=payload
         )
         url = self.BASE_URI + self.PLACE_ORDER_URI + url_params
-        placing_order_result = requests.request(
-            method, url, headers=headers, data=body
-        ).json()
-        return self.parse_placing_order_result(placing_order_result)
-
-    def parse_placing_order_result(self, placing_order_result: dict) -> dict:
-        if 'orderId' in placing_order_result:
-            ok = True
-            result = self.parse_orders([placing_order_result])[0]
-        else:
-            ok = False
-            result = placing_order_result
+        placing_order_result = self.request_json(
+            method, url, headers=headers, data=body,
+            group=TRADING, priority=HIGH,
+        )
+        result = self.parse_placing_order_result(placing_order_result)
+        self.on_order_placed(result)
+        return result
+
+    def check_order(
+            self,
+            spec: Optional[PairSpec],
+            side: str,
+            amount: Union[str, Fixed],
+            price: Union[str, Fixed],
+    ) -> dict:
+        """
+        Round order to pair steps, see PairSpec.prepare_order.
+        Without spec the order is passed as is.
+        """
+        if spec is None:
+            return {'ok': True, 'result': {'amount': amount, 'price': price}}
+        try:
+            amount, price = spec.prepare_order(side, amount, price)
+        except ValueError as e:
+            return {
+                'ok': False,
+                'result': {'code': INVALID_ORDER, 'message': str(e)},
+            }
+        return {'ok': True, 'result': {'amount': amount, 'price': price}}
+
+    def get_pair_spec(self) -> Optional[PairSpec]:
+        """
+        Spec of client pair. Stale pairs are refreshed in background thread
+        and the last known specs are served meanwhile, only the very first
+        download is waited for. Failed download is retried after
+        PairMetadata.retry_interval and never fails the order.
+        None if there is no pairs metadata or the pair is unknown.
+        """
+        if self.pairs is None:
+            return None
+        if self.pairs.should_refresh():
+            if self.pairs.updated is None:
+                self.refresh_pairs()
+            else:
+                threading.Thread(target=self.refresh_pairs, daemon=True).start()
+        return self.pairs.get(self.pair_name)
+
+    def refresh_pairs(self) -> bool:
+        """
+        :return: True if pairs were downloaded
+        """
+        try:
+            raw_pairs = self.fetch_pairs()
+            if isinstance(raw_pairs, list):
+                self.pairs.update(raw_pairs)
+                return True
+        except Exception:  # last known specs are served meanwhile
+            pass
+        return False
+
+    def fetch_pairs(self):
+        """
+        Raw specs of all kickex pairs.
+        """
+        url = self.BASE_URI + self.GET_PAIRS_URI
+        return self.request_json('GET', url, group=MARKET, priority=LOW)
+
+    def get_place_order_payload(
+            self,
+            side: str,
+            amount: Union[str, Fixed],
+            price: Union[str, Fixed],
+    ) -> dict:
         return {
-            'ok': ok,
-            'result': result,
+            "pairName": self.pair_name,
+            "orderedAmount": str(amount),  # Fixed formats itself exactly
+            "limitPrice": str(price),
+            "tradeIntent": self.SIDES[side],
+            "modifier": "GTC",
         }
 
     def cancel_order(self, order_id: str) -> dict:
@@ -171,21 +445,14 @@ class Kickex(API):
         )
         url = self.BASE_URI + self.CANCEL_ORDER_URI + order_id
 
-        canceling_order_result = requests.request(method, url, headers=headers).json()
+        canceling_order_result = self.request_json(
+            method, url, headers=headers,
+            group=TRADING, priority=CRITICAL,
+        )
 
-        return self.parse_cancel_order(canceling_order_result)
-
-    def parse_cancel_order(self, canceling_order_result: dict) -> dict:
-        if canceling_order_result == {}:
-            ok = True
-            result = {'message': 'The request to cancel your order was received'}
-        else:
-            ok = False
-            result = canceling_order_result
-        return {
-            'ok': ok,
-            'result': result,
-        }
+        result = self.parse_cancel_order(canceling_order_result)
+        self.on_order_cancelled(order_id, result)
+        return result
 
     def get_user_orders(self, order_status: str) -> dict:
         method = 'GET'
@@ -194,94 +461,28 @@ class Kickex(API):
         )
         url = self.BASE_URI + self.GET_USER_ORDERS + url_params
 
-        current_orders = requests.request(
-            method, url, headers=headers, data=params
-        ).json()
-        return self.parse_user_orders(current_orders)
-
-    def parse_user_orders(self, current_orders) -> dict:
-        if isinstance(current_orders, list):
-            ok = True
-            result = {
-                'count': len(current_orders),
-                'orders': self.parse_orders(current_orders),
-            }
-        else:
-            ok = False
-            result = {**current_orders}
-
-        return {
-            'ok': ok,
-            'result': result,
-        }
-
-    def parse_orders(self, orders: List[dict]) -> List[dict]:
-        handled_orders = []
-        for order in orders:
-            handled_orders.append(
-                {
-                    'order_id': int(order.get('orderId')),
-                    'user_id': order.get('userId'),
-                    'quantity': get_float_value_or_None(order.get('orderedVolume')),
-                    'pair': order.get('pairName'),
-                    'side': self.SIDES.get(order.get('tradeIntent')),
-                    'price': get_float_value_or_None(order.get('limitPrice')),
-                    'executed': get_float_value_or_None(order.get('totalSellVolume')),
-                    'status': self.get_order_status(order),
-                    'base_decimals': order.get('baseDecimals'),
-                    'quote_decimals': order.get('quoteDecimals'),
-                    'pair_id': order.get('pairId'),
-                    'type': order.get('type'),
-                    'stop_price': order.get('stopPrice'),
-                    'slippage': order.get('slippage'),
-                    'timestamp': self.get_formatted_timestamp(
-                        order.get('createdTimestamp')
-                    ),
-                    'updated_at': order.get('updatedAt'),
-                    'created_at': order.get('createdAt'),
-                    'executed_price': get_float_value_or_None(
-                        order.get('executedPrice')
-                    ),
-                    'fee': get_float_value_or_None(order.get('fee')),
-                    'order_cid': order.get('orderCid'),
-                    'expires': order.get('expires'),
-                }
-            )
-        return handled_orders
+        current_orders = self.request_json(
+            method, url, headers=headers, data=params,
+            group=TRADING, priority=NORMAL,
+        )
+        result = self.parse_user_orders(current_orders)
+        if result['ok']:
+            self.on_orders(result['result']['orders'], active=True)
+        return result
 
-    @staticmethod
-    def get_formatted_timestamp(nanoseconds: float) -> Optional[int]:
+    def get_order_state(self, order_id: str) -> dict:
         """
-        Kickex returns timestamp in nanoseconds but we need just seconds
+        With order_store answers from memory while order state is fresh.
         """
-        if nanoseconds is None:
-            return None
-        return int(float(nanoseconds) / 1e9)
-
-    def get_order_state(self, order_id: str) -> dict:
-        return self.parse_order_state(self.fetch_order(order_id))
+        if self.order_store is not None:
+            order = self.order_store.get(order_id)
+            if order is not None:
+                return {'ok': True, 'result': order}
 
-    def parse_order_state(self, order_state: dict) -> dict:
-        if 'orderId' in order_state:
-            ok = True
-            result = self.parse_orders([order_state])[0]
-        else:
-            ok = False
-            result = order_state
-
-        return {
-            'ok': ok,
-            'result': result,
-        }
-
-    def get_order_status(self, order: dict) -> Optional[str]:
-        status = order.get('state', None)
-        if status is None:
-            return None
-
-        if status == 5 and order['totalSellVolume'] < order['orderedVolume']:
-            status = 45
-        return self.ORDER_STATUSES[status]
+        result = self.parse_order_state(self.fetch_order(order_id))
+        if result['ok']:
+            self.on_orders([result['result']])
+        return result
 
     def fetch_order(self, order_id: str) -> dict:
         method = 'GET'
@@ -290,8 +491,10 @@ class Kickex(API):
             self.FETCH_ORDER, method=method, params=params
         )
         url = self.BASE_URI + self.FETCH_ORDER + url_params
-        response = requests.request(method, url, headers=headers, data=params)
-        return response.json()
+        return self.request_json(
+            method, url, headers=headers, data=params,
+            group=TRADING, priority=NORMAL,
+        )
 
     def get_headers_and_stuff(self, path, method, params=None):
         full_path = "/api/v1" + path
@@ -312,15 +515,7 @@ class Kickex(API):
 
         signature = self.get_signature(timestamp, method, full_path, body_for_signature)
 
-        headers = {
-            'Content-Type': 'application/json',
-            'KICK-API-KEY': self.kkx_pubKey,
-            'KICK-API-PASS': (
-                base64.standard_b64encode(self.password.encode('latin-1'))
-            ),
-            'KICK-API-TIMESTAMP': timestamp,
-            'KICK-SIGNATURE': signature,
-        }
+        headers = self.signer.headers(timestamp, signature)
         return headers, url_params, body
 
     def get_signature(
@@ -330,31 +525,7 @@ class Kickex(API):
             full_path,
             body_for_signature,
     ):
-        secret = base64.standard_b64decode(
-            self.kkx_prKey.replace('-', '+').replace('_', '/')
-        )
-
-        signature = (
-            base64.standard_b64encode(
-                (
-                    hmac.new(
-                        timestamp.encode('latin-1'),
-                        method.lower().encode('latin-1'),
-                        hashlib.sha512,
-                    )
-                ).digest()
-            )
-        ).decode('latin-1')
-
-        arguments = [
-            signature,
-            full_path.encode('latin-1'),
-            body_for_signature.encode('latin-1'),
-            secret,
-        ]
-        signature = reduce(self.generate_sign, arguments)
-
-        return signature
+        return self.signer.sign(timestamp, method, full_path, body_for_signature)
 
     @staticmethod
     def generate_sign(key: str, message) -> str:
@@ -371,24 +542,106 @@ class Kickex(API):
             ).decode('latin-1')
         return signature
 
-    def get_orders_history(self):
-        params = {'pairName': self.pair_name}
+    def get_orders_history(
+            self,
+            limit: Optional[int] = None,
+            offset: Optional[int] = None,
+    ):
+        """
+        Raw kickex orders history of the market, newest first.
+        Without limit the whole history is returned at once.
+
+        :param limit: int. page size
+        :param offset: int. orders to skip from the newest one
+        """
         method = 'GET'
         headers, url_params, params = self.get_headers_and_stuff(
-            self.GET_ORDERS_HISTORY, method=method, params=params
+            self.GET_ORDERS_HISTORY, method=method,
+            params=self.get_orders_history_params(limit, offset),
         )
         url = self.BASE_URI + self.GET_ORDERS_HISTORY + url_params
 
-        orders = requests.request(
-            method, url, headers=headers, data=params
-        ).json()
+        orders = self.request_json(
+            method, url, headers=headers, data=params,
+            group=HISTORY, priority=LOW,
+        )
         return orders
 
+    def get_orders_history_params(
+            self,
+            limit: Optional[int],
+            offset: Optional[int],
+    ) -> dict:
+        params = {'pairName': self.pair_name}
+        if limit is not None:
+            params[self.HISTORY_LIMIT_PARAM] = limit
+        if offset:
+            params[self.HISTORY_OFFSET_PARAM] = offset
+        return params
+
+    def iter_orders_history(
+            self,
+            page_size: int = HISTORY_PAGE_SIZE,
+            since: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """
+        Stream raw orders history page by page, newest first.
+
+        :param page_size: int. orders per request
+        :param since: int. createdTimestamp in nanoseconds, stop on first
+            order created before it. Orders created at since are streamed,
+            other orders of the same nanosecond may be unseen yet
+        """
+        offset = 0
+        while True:
+            page = self.get_orders_history(limit=page_size, offset=offset)
+            if not isinstance(page, list):
+                raise ResponseException(page)
+            for order in page:
+                if since is not None and int(order['createdTimestamp']) < since:
+                    return
+                yield order
+            if len(page) < page_size:
+                return
+            offset += len(page)
+
+    def sync_orders_history(
+            self,
+            store: 'OrderHistoryStore',
+            page_size: int = HISTORY_PAGE_SIZE,
+    ) -> int:
+        """
+        Download orders created since the last complete sync into store.
 
-def get_float_value_or_None(value) -> Optional[float]:
-    if value is None:
-        return None
-    return float(value)
+        Pages come newest first, so the mark moves only when the walk
+        reaches the previous mark. An interrupted sync leaves it where it
+        was, the next one walks down to it again and already stored
+        orders are just replaced. Orders stored before the mark in a non
+        final state are refetched one by one, the walk doesn't reach them.
+
+        :return: number of downloaded orders
+        """
+        since = store.synced_mark(self.pair_name)
+        newest = since
+        saved = 0
+        page = []
+        for order in self.iter_orders_history(page_size, since):
+            created = int(order['createdTimestamp'])
+            newest = created if newest is None else max(newest, created)
+            page.append(order)
+            if len(page) == page_size:
+                saved += store.add(page)
+                page = []
+        saved += store.add(page)
+        if newest is not None:  # reached since, everything newer is stored
+            store.set_synced_mark(self.pair_name, newest)
+        if since is not None:  # older orders could be filled or cancelled since
+            for order_id in store.open_order_ids(self.pair_name, until=since):
+                order = self.fetch_order(str(order_id))
+                if 'orderId' not in order:
+                    raise ResponseException(order)
+                saved += store.add([order])
+        return saved
 
 
 if __name__ == '__main__':
@@ -0,0 +1,278 @@
+from typing import List, Optional
+
+from fixed_point import FIXED, FLOAT, Fixed, get_fixed_value_or_None, to_fixed_levels
+from order_batch import OrderBatch
+from order_book import OrderBook
+
+
+class KickexParser:
+    """
+    parse_* methods turning raw kickex answers into wrapper results.
+
+    Kickex inherits them, alone they work without api keys and without
+    network, ex. for recorded or streamed payloads:
+
+    parser = KickexParser('del_usdt', numeric='fixed')
+    parser.parse_orders(raw_orders)
+    """
+
+    ORDER_STATUSES = {
+        1: 'pending',  # 1 отложенный по каким - то причинам ордер
+        2: 'on hold',  # 2 состояние торгового ордера после подтверждения сервисом SOB тогда
+        3: 'placing',  # 3 ордер находится в процессе доставки в свой сервис(матчер или SOB)
+        4: 'accepted',  # 4 ордер на исполнении(размещен в LOB или в SOB);
+        5: 'executed',  # 5 исполненный ордер
+        6: 'rejected',  # 6 ордер, в исполнении которого отказано
+        7: 'cancelled',  # 7 отмененный ордер.
+        45: 'partially executed',  # статус для внутреннего пользования, кикекс такой не присылает
+    }
+
+    SIDES = {
+        'buy': 0,
+        'sell': 1,
+    }
+    SIDES.update({v: k for k, v in SIDES.items()})
+
+    def __init__(self, market: str = "eth_usdt", numeric: str = FLOAT) -> None:
+        """
+        :param market: string. ex. 'del_usdt'
+        :param numeric: 'float' or 'fixed', see set_numeric
+        """
+        self.market = market
+        self.currency_1, self.currency_2 = [s.upper() for s in market.split('_')]
+        self.pair_name = f'{self.currency_1}/{self.currency_2}'
+        self.set_numeric(numeric)
+
+    def set_numeric(
+            self,
+            numeric: str,
+            price_decimals: Optional[int] = None,
+            amount_decimals: Optional[int] = None,
+    ) -> None:
+        """
+        :param numeric: 'float' or 'fixed'. With 'fixed' prices, amounts,
+            balances and order book levels are exact fixed_point.Fixed
+            scaled by base/quote decimals of the pair instead of floats
+        :param price_decimals: int. scale of all order book prices in fixed
+            mode, ex. quote_decimals of the pair. None for the largest
+            of each side
+        :param amount_decimals: int. same for order book amounts
+        """
+        if numeric not in (FLOAT, FIXED):
+            raise ValueError(f'unknown numeric mode {numeric!r}')
+        self.numeric = numeric
+        self.book_decimals = (price_decimals, amount_decimals)
+        self.to_number = get_fixed_value_or_None if numeric == FIXED else get_float_value_or_None
+
+    def parse_order_book_levels(self, levels: dict, as_order_book: bool = False) -> dict:
+        """
+        :param levels: {'asks': [(price, amount), ...], 'bids': [...]} strings
+        """
+        if as_order_book:
+            result = OrderBook(**levels)
+        elif self.numeric == FIXED:
+            result = {
+                side: to_fixed_levels(side_levels, *self.book_decimals)
+                for side, side_levels in levels.items()
+            }
+        else:
+            result = levels
+        return {
+            'ok': True,
+            'result': result,
+        }
+
+    def parse_get_order_book(
+            self,
+            order_book: dict,
+            as_order_book: bool = False,
+    ) -> dict:
+        if 'asks' in order_book and 'bids' in order_book and as_order_book:
+            ok = True
+            result = OrderBook(
+                asks=[
+                    (order['price'], order['amount']) for order in order_book["asks"]
+                ],
+                bids=[
+                    (order['price'], order['amount']) for order in order_book["bids"]
+                ],
+            )
+        elif 'asks' in order_book and 'bids' in order_book:
+            ok = True
+            result = {
+                "asks": [
+                    (order['price'], order['amount']) for order in order_book["asks"]
+                ],
+                "bids": [
+                    (order['price'], order['amount']) for order in order_book["bids"]
+                ],
+            }
+            if self.numeric == FIXED:
+                result = {
+                    side: to_fixed_levels(levels, *self.book_decimals)
+                    for side, levels in result.items()
+                }
+        else:
+            ok = False
+            result = order_book
+
+        return {
+            'ok': ok,
+            'result': result,
+        }
+
+    def parse_check_accounts_state(self, account_balance: dict) -> dict:
+        if 'code' not in account_balance:
+            ok = True
+            balances = {
+                balance['currencyCode']: balance['available']
+                for balance in account_balance
+            }
+            bt_base = balances.get(self.currency_1, -1)  # -1 if balance for token doesn't exist
+            bt_exch = balances.get(self.currency_2, -1)
+            account_state = {
+                "account_state": {
+                    self.currency_1: self.to_number(bt_base),
+                    self.currency_2: self.to_number(bt_exch),
+                },
+            }
+            result = account_state
+        else:
+            ok = False
+            result = account_balance
+
+        return {
+            'ok': ok,
+            'result': result,
+        }
+
+    def parse_placing_order_result(self, placing_order_result: dict) -> dict:
+        if 'orderId' in placing_order_result:
+            ok = True
+            result = self.parse_orders([placing_order_result])[0]
+        else:
+            ok = False
+            result = placing_order_result
+        return {
+            'ok': ok,
+            'result': result,
+        }
+
+    def parse_cancel_order(self, canceling_order_result: dict) -> dict:
+        if canceling_order_result == {}:
+            ok = True
+            result = {'message': 'The request to cancel your order was received'}
+        else:
+            ok = False
+            result = canceling_order_result
+        return {
+            'ok': ok,
+            'result': result,
+        }
+
+    def parse_user_orders(self, current_orders) -> dict:
+        if isinstance(current_orders, list):
+            ok = True
+            result = {
+                'count': len(current_orders),
+                'orders': self.parse_orders(current_orders),
+            }
+        else:
+            ok = False
+            result = {**current_orders}
+
+        return {
+            'ok': ok,
+            'result': result,
+        }
+
+    def parse_orders(self, orders: List[dict]) -> List[dict]:
+        """
+        Amounts are scaled by baseDecimals and prices by quoteDecimals
+        in fixed numeric mode.
+        """
+        to_number = self.to_number
+        handled_orders = []
+        for order in orders:
+            base_decimals = order.get('baseDecimals')
+            quote_decimals = order.get('quoteDecimals')
+            handled_orders.append(
+                {
+                    'order_id': int(order.get('orderId')),
+                    'user_id': order.get('userId'),
+                    'quantity': to_number(order.get('orderedVolume'), base_decimals),
+                    'pair': order.get('pairName'),
+                    'side': self.SIDES.get(order.get('tradeIntent')),
+                    'price': to_number(order.get('limitPrice'), quote_decimals),
+                    'executed': to_number(order.get('totalSellVolume'), base_decimals),
+                    'status': self.get_order_status(order),
+                    'base_decimals': base_decimals,
+                    'quote_decimals': quote_decimals,
+                    'pair_id': order.get('pairId'),
+                    'type': order.get('type'),
+                    'stop_price': order.get('stopPrice'),
+                    'slippage': order.get('slippage'),
+                    'timestamp': self.get_formatted_timestamp(
+                        order.get('createdTimestamp')
+                    ),
+                    'updated_at': order.get('updatedAt'),
+                    'created_at': order.get('createdAt'),
+                    'executed_price': to_number(
+                        order.get('executedPrice'), quote_decimals
+                    ),
+                    'fee': to_number(order.get('fee')),
+                    'order_cid': order.get('orderCid'),
+                    'expires': order.get('expires'),
+                }
+            )
+        return handled_orders
+
+    def parse_orders_columnar(self, orders: List[dict]) -> OrderBatch:
+        """
+        Same as parse_orders but into columns, much cheaper for big
+        payloads like get_orders_history. batch[i] gives parse_orders dict.
+        Columns are always float, whatever the numeric mode.
+        """
+        return OrderBatch.from_orders(orders, self.ORDER_STATUSES, self.SIDES)
+
+    @staticmethod
+    def get_formatted_timestamp(nanoseconds: float) -> Optional[int]:
+        """
+        Kickex returns timestamp in nanoseconds but we need just seconds
+        """
+        if nanoseconds is None:
+            return None
+        return int(float(nanoseconds) / 1e9)
+
+    def parse_order_state(self, order_state: dict) -> dict:
+        if 'orderId' in order_state:
+            ok = True
+            result = self.parse_orders([order_state])[0]
+        else:
+            ok = False
+            result = order_state
+
+        return {
+            'ok': ok,
+            'result': result,
+        }
+
+    def get_order_status(self, order: dict) -> Optional[str]:
+        status = order.get('state', None)
+        if status is None:
+            return None
+
+        if status == 5 and (
+                Fixed.parse(order['totalSellVolume']) < Fixed.parse(order['orderedVolume'])
+        ):  # volumes are strings, '9.5' < '10' must hold
+            status = 45
+        return self.ORDER_STATUSES[status]
+
+
+def get_float_value_or_None(value, decimals: Optional[int] = None) -> Optional[float]:
+    """
+    :param decimals: unused, same signature as fixed_point.get_fixed_value_or_None
+    """
+    if value is None:
+        return None
+    return float(value)
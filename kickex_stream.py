@@ -0,0 +1,205 @@
+import asyncio
+import itertools
+import json
+from typing import Callable, Dict, Optional
+
+import aiohttp
+
+from async_kickex_api import AsyncKickex
+
+
+class OrderBookStream:
+    """
+    Locally maintained order book fed by kickex websocket.
+
+    After subscribe the gate sends full book and then only changed levels,
+    level with zero amount has to be removed. When frames carry sequence
+    number and one of them is missed, book is reloaded from REST
+    GET_DEPTH_URI and stream continues from there. The same happens to
+    frames coming after error frame or failed reload: they are changes
+    only, so they trigger reload instead of replacing the book. Failed
+    reloads are retried by later frames, not sooner than RESYNC_INTERVAL.
+
+    get_order_book returns the same shape as Kickex.get_order_book,
+    but without network round trip.
+    """
+
+    WS_URI = 'wss://gate.kickex.com/ws'
+    SUBSCRIBE_TYPE = 'getOrderBookAndSubscribe'
+    SEQUENCE_FIELD = 'seq'
+    RESYNC_INTERVAL = 1.0  # seconds between failed and next reload
+
+    def __init__(
+            self,
+            client: AsyncKickex,
+            ws_uri: Optional[str] = None,
+            on_update: Optional[Callable[['OrderBookStream'], None]] = None,
+    ) -> None:
+        """
+        :param on_update: called with the stream after every applied
+            frame while book is synced, ex. to publish the book
+        """
+        self.client = client
+        self.ws_uri = ws_uri or self.WS_URI
+        self.on_update = on_update
+        self.asks: Dict[str, str] = {}
+        self.bids: Dict[str, str] = {}
+        self.sequence: Optional[int] = None
+        self.synced = False
+        self.awaiting_snapshot = False  # next frame is full book, after subscribe
+        self.resyncs = 0
+        self._next_resync = 0.0  # loop time
+        self.error: Optional[dict] = None
+        self._ids = itertools.count(1)
+        self._subscription_id: Optional[str] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+
+    def get_order_book(self) -> dict:
+        if not self.synced:
+            return {
+                'ok': False,
+                'result': self.error or {'message': 'order book is not synced yet'},
+            }
+        return {
+            'ok': True,
+            'result': {
+                'asks': sorted(self.asks.items(), key=_price),
+                'bids': sorted(self.bids.items(), key=_price, reverse=True),
+            },
+        }
+
+    async def run(self) -> None:
+        """
+        Subscribe and apply frames until connection is closed or stop is called.
+        """
+        session = await self.client.get_session()
+        async with session.ws_connect(self.ws_uri) as ws:
+            self._ws = ws
+            await self.subscribe()
+            async for message in ws:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    break
+                if not await self.handle_message(json.loads(message.data)):
+                    await self.try_resync()
+                if self.synced and self.on_update is not None:
+                    self.on_update(self)
+        self._ws = None
+        self.synced = False
+
+    async def stop(self) -> None:
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def subscribe(self) -> None:
+        self._subscription_id = str(next(self._ids))
+        await self._ws.send_json({
+            'id': self._subscription_id,
+            'type': self.SUBSCRIBE_TYPE,
+            'pair': self.client.pair_name,
+        })
+        self.awaiting_snapshot = True
+
+    async def resync(self) -> None:
+        """
+        Reload book from REST snapshot. Sequence is dropped, so first frame
+        after resync is accepted as is.
+        """
+        self.resyncs += 1
+        self.synced = False
+        self.sequence = None
+        url = (
+            self.client.BASE_URI + self.client.GET_DEPTH_URI
+            + f"?pairName={self.client.pair_name}"
+        )
+        self.apply_snapshot(await self.client.request_json('GET', url))
+
+    async def try_resync(self) -> None:
+        """
+        resync which leaves book unsynced on errors. Next attempt is
+        allowed RESYNC_INTERVAL after a failed one.
+        """
+        loop_time = asyncio.get_running_loop().time()
+        if loop_time < self._next_resync:
+            return
+        try:
+            await self.resync()
+        except Exception as e:  # network errors, broken answers
+            self.synced = False
+            self.error = {'message': f'order book reload failed: {e!r}'}
+        if not self.synced:
+            self._next_resync = loop_time + self.RESYNC_INTERVAL
+
+    async def handle_message(self, message: dict) -> bool:
+        """
+        Apply one websocket frame.
+
+        :return: False if book needs resync: sequence gap was detected,
+            or it is a change of unsynced book
+        """
+        if self._subscription_id is not None and message.get('id') != self._subscription_id:
+            return True
+        if 'error' in message:
+            self.error = message['error']
+            self.synced = False
+            return True
+        if not self.synced and not self.awaiting_snapshot:
+            return False
+
+        sequence = message.get(self.SEQUENCE_FIELD)
+        if sequence is not None:
+            sequence = int(sequence)
+            if self.sequence is not None and self.synced:
+                if sequence <= self.sequence:
+                    return True  # stale frame, already in snapshot
+                if sequence != self.sequence + 1:
+                    return False
+            self.sequence = sequence
+
+        if self.synced:
+            self.apply_update(message)
+        else:
+            self.awaiting_snapshot = False
+            self.apply_snapshot(message)
+        return True
+
+    def apply_snapshot(self, order_book: dict) -> None:
+        if 'asks' not in order_book or 'bids' not in order_book:
+            self.error = order_book
+            self.synced = False
+            return
+        self.asks = {
+            level['price']: level['amount'] for level in order_book['asks']
+            if float(level['amount'])
+        }
+        self.bids = {
+            level['price']: level['amount'] for level in order_book['bids']
+            if float(level['amount'])
+        }
+        self.error = None
+        self.synced = True
+
+    def apply_update(self, update: dict) -> None:
+        for side, levels in ((self.asks, update.get('asks', ())),
+                             (self.bids, update.get('bids', ()))):
+            for level in levels:
+                if float(level['amount']):
+                    side[level['price']] = level['amount']
+                else:
+                    side.pop(level['price'], None)
+
+
+def _price(level) -> float:
+    return float(level[0])
+
+
+if __name__ == '__main__':
+    async def main():
+        async with AsyncKickex() as k:
+            stream = OrderBookStream(k)
+            task = asyncio.create_task(stream.run())
+            await asyncio.sleep(5)
+            print(stream.get_order_book())
+            await stream.stop()
+            await task
+
+    asyncio.run(main())
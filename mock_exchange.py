@@ -0,0 +1,280 @@
+import json
+import random
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib import parse
+
+from signing import KickexSigner
+
+
+class MockKickex:
+    """
+    Local stand-in of gate.kickex.com REST api for offline tests and benchmarks.
+
+    Serves /market/orderbook, /market/pairs, /user/balance, /createTradeOrder,
+    /orders/{id}, /activeOrders, /order and /ordersHistory in kickex
+    formats, checks signatures of private calls and can add latency and
+    random errors.
+
+    with MockKickex(pub, pr, password) as mock:
+        client.BASE_URI = mock.base_uri
+    """
+
+    ERROR_INVALID_SIGNATURE = {'code': 1002, 'message': 'Invalid signature'}
+    ERROR_NOT_FOUND = {'code': 2002, 'message': 'Order not found'}
+    ERROR_RANDOM = {'code': 5001, 'message': 'Internal error'}
+    ERROR_INVALID_ORDER = {'code': 3001, 'message': 'Invalid order parameters'}
+
+    PAIRS = [
+        {
+            'pairName': 'DEL/USDT', 'pairId': 24,
+            'baseDecimals': 18, 'quoteDecimals': 6,
+            'tickSize': '0.000001', 'lotSize': '0.01',
+            'minOrderSize': '1', 'minOrderVolume': '0.01',
+        },
+        {
+            'pairName': 'ETH/USDT', 'pairId': 2,
+            'baseDecimals': 18, 'quoteDecimals': 2,
+            'tickSize': '0.01', 'lotSize': '0.0001',
+            'minOrderSize': '0.001', 'minOrderVolume': '1',
+        },
+    ]
+
+    def __init__(
+            self,
+            pub_key: str,
+            pr_key: str,
+            password: str,
+            host: str = '127.0.0.1',
+            port: int = 0,
+            latency: float = 0.0,
+            error_rate: float = 0.0,
+            book_depth: int = 50,
+            history_size: int = 1000,
+            seed: int = 0,
+    ) -> None:
+        """
+        :param latency: float. seconds added to every answer
+        :param error_rate: float. share of requests answered with ERROR_RANDOM
+        :param book_depth: int. levels on each side of order book
+        :param history_size: int. finished orders in /ordersHistory
+        """
+        self.signer = KickexSigner(pub_key, pr_key, password)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.orders: Dict[int, dict] = {}
+        self.balances = {
+            'USDT': {'available': '100000', 'reserved': '0'},
+        }
+        self.book_depth = book_depth
+        self.history = [
+            self.make_order(
+                order_id, 'DEL/USDT', str(order_id % 2), '1', '0.05', state=5,
+                created=1657000000 + order_id,
+            )
+            for order_id in range(history_size, 0, -1)
+        ]
+        self._ids = iter(range(10 ** 9, 10 ** 10))
+        self._lock = threading.Lock()
+        self.server = _Server((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_uri(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/api/v1'
+
+    def start(self) -> 'MockKickex':
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    @staticmethod
+    def make_order(
+            order_id: int,
+            pair_name: str,
+            trade_intent,
+            amount: str,
+            price: str,
+            state: int = 4,
+            created: Optional[float] = None,
+    ) -> dict:
+        created = time.time() if created is None else created
+        return {
+            'orderId': str(order_id),
+            'userId': 1,
+            'pairName': pair_name,
+            'pairId': 24,
+            'orderedVolume': amount,
+            'limitPrice': price,
+            'totalSellVolume': amount if state == 5 else '0',
+            'tradeIntent': int(trade_intent),
+            'state': state,
+            'baseDecimals': 18,
+            'quoteDecimals': 6,
+            'type': 'limit',
+            'createdTimestamp': str(int(created * 1e9)),
+        }
+
+    def fill(self, order_id, amount: Optional[str] = None) -> dict:
+        """
+        Execute open order as if market traded with it, ex. to test fill detection.
+
+        :param amount: string. executed now, the rest of order if None
+        :return: order in kickex format
+        """
+        with self._lock:
+            order = self.orders[int(order_id)]
+            ordered = Decimal(order['orderedVolume'])
+            executed = Decimal(order['totalSellVolume'])
+            executed = ordered if amount is None else min(ordered, executed + Decimal(amount))
+            order['totalSellVolume'] = str(executed)
+            if executed == ordered:
+                order['state'] = 5
+            return dict(order)
+
+    def order_book(self, pair_name: str) -> dict:
+        return {
+            'asks': [
+                {'price': f'{1 + i * 0.001:.6f}', 'amount': f'{1 + i % 7}'}
+                for i in range(1, self.book_depth + 1)
+            ],
+            'bids': [
+                {'price': f'{1 - i * 0.001:.6f}', 'amount': f'{1 + i % 5}'}
+                for i in range(1, self.book_depth + 1)
+            ],
+            'lastPrice': {'price': '1', 'pairName': pair_name},
+        }
+
+    def is_valid_order(self, payload: dict) -> bool:
+        """
+        Check createTradeOrder payload against PAIRS specs.
+        """
+        spec = next((p for p in self.PAIRS if p['pairName'] == payload['pairName']), None)
+        if spec is None:
+            return True
+        try:
+            amount = Decimal(payload['orderedAmount'])
+            price = Decimal(payload['limitPrice'])
+        except (InvalidOperation, TypeError):
+            return False
+        return (
+                amount % Decimal(spec['lotSize']) == 0
+                and price % Decimal(spec['tickSize']) == 0
+                and amount >= Decimal(spec['minOrderSize'])
+                and amount * price >= Decimal(spec['minOrderVolume'])
+        )
+
+    def handle(self, method: str, path: str, query: str, headers, body: str):
+        """
+        :return: (http status, answer)
+        """
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and self.random.random() < self.error_rate:
+            return 500, self.ERROR_RANDOM
+
+        params = dict(parse.parse_qsl(query))
+        if path == '/api/v1/market/orderbook':
+            return 200, self.order_book(params.get('pairName', 'DEL/USDT'))
+        if path == '/api/v1/market/pairs':
+            return 200, self.PAIRS
+
+        signed = query if method in ('GET', 'DELETE') else body
+        signature = self.signer.sign(
+            headers.get('KICK-API-TIMESTAMP', ''), method, path, signed
+        )
+        if (
+                headers.get('KICK-SIGNATURE') != signature
+                or headers.get('KICK-API-KEY') != self.signer.pub_key
+                or headers.get('KICK-API-PASS', '').encode() != self.signer.password_header
+        ):
+            return 401, self.ERROR_INVALID_SIGNATURE
+
+        with self._lock:
+            if path == '/api/v1/user/balance':
+                return 200, [
+                    {'currencyCode': code, **balance}
+                    for code, balance in self.balances.items()
+                ]
+            if path == '/api/v1/createTradeOrder' and method == 'POST':
+                payload = json.loads(body)
+                if not self.is_valid_order(payload):
+                    return 400, self.ERROR_INVALID_ORDER
+                order = self.make_order(
+                    next(self._ids), payload['pairName'], payload['tradeIntent'],
+                    payload['orderedAmount'], payload['limitPrice'],
+                )
+                self.orders[int(order['orderId'])] = order
+                return 200, order
+            if path.startswith('/api/v1/orders/') and method == 'DELETE':
+                order = self.orders.get(int(path.rsplit('/', 1)[1]))
+                if order is None:
+                    return 404, self.ERROR_NOT_FOUND
+                order['state'] = 7
+                return 200, {}
+            if path == '/api/v1/activeOrders':
+                return 200, [o for o in self.orders.values() if o['state'] == 4]
+            if path == '/api/v1/order':
+                order = self.orders.get(int(params.get('orderId', 0)))
+                if order is None:
+                    return 404, self.ERROR_NOT_FOUND
+                return 200, order
+            if path == '/api/v1/ordersHistory':
+                offset = int(params.get('offset', 0))
+                limit = int(params.get('limit', len(self.history)))
+                return 200, self.history[offset:offset + limit]
+        return 404, {'code': 404, 'message': 'Not found'}
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # headers and body in one segment, otherwise Nagle + delayed ACK
+            # add ~40ms to every keep-alive answer
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def answer(self):
+                url = parse.urlsplit(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length).decode('latin-1') if length else ''
+                status, answer = mock.handle(
+                    self.command, url.path, url.query, self.headers, body
+                )
+                content = json.dumps(answer).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_DELETE = answer
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # clients open whole pool at once
@@ -0,0 +1,74 @@
+from typing import Dict, Iterable, List, Optional
+
+from kickex_api import Kickex
+
+
+class KickexMarkets:
+    """
+    One Kickex client serving many markets.
+
+    All markets share one connection pool and signing context, balances are
+    downloaded once for all of them and order books are refreshed in parallel.
+
+    markets['del_usdt'] is a Kickex client of that market.
+    """
+
+    def __init__(self, markets: Iterable[str], **kwargs) -> None:
+        """
+        :param markets: ex. ['del_usdt', 'kick_usdt']
+        :param kwargs: Kickex arguments except market. pool_size defaults
+            to number of markets, so all books are fetched at once, but
+            not below Kickex default of 10
+        """
+        markets = list(markets)
+        if not markets:
+            raise Exception('markets must not be empty')
+        kwargs.setdefault('pool_size', max(len(markets), 10))
+        self.client = Kickex(markets[0], **kwargs)
+        self.markets: Dict[str, Kickex] = {
+            market: self.client.for_market(market) for market in markets
+        }
+
+    def __getitem__(self, market: str) -> Kickex:
+        return self.markets[market]
+
+    def __iter__(self):
+        return iter(self.markets)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.client.close()
+
+    def check_accounts_state(self) -> Dict[str, dict]:
+        """
+        One /user/balance request for all markets.
+
+        :return: {market: Kickex.check_accounts_state result}
+        """
+        account_balance = self.client.get_account_balance()
+        return {
+            market: client.parse_check_accounts_state(account_balance)
+            for market, client in self.markets.items()
+        }
+
+    def get_order_books(
+            self,
+            as_order_book: bool = False,
+            max_in_flight: Optional[int] = None,
+    ) -> Dict[str, dict]:
+        """
+        :param max_in_flight: int. books fetched at once, all by default
+        :return: {market: Kickex.get_order_book result}
+        """
+        clients: List[Kickex] = list(self.markets.values())
+        books = self.client.dispatch(
+            lambda client: client.get_order_book(as_order_book),
+            clients,
+            max_in_flight or len(clients),
+        )
+        return dict(zip(self.markets, books))
@@ -0,0 +1,145 @@
+from array import array
+from math import isnan, nan
+from typing import Dict, Iterator, List
+
+from fixed_point import Fixed
+
+FLOAT_COLUMNS = ('quantity', 'price', 'executed', 'executed_price', 'fee')
+INT_COLUMNS = ('order_id', 'timestamp', 'status', 'side')
+# fields passed as is, they are read from raw orders only on row access
+OBJECT_FIELDS = (
+    ('user_id', 'userId'),
+    ('pair', 'pairName'),
+    ('base_decimals', 'baseDecimals'),
+    ('quote_decimals', 'quoteDecimals'),
+    ('pair_id', 'pairId'),
+    ('type', 'type'),
+    ('stop_price', 'stopPrice'),
+    ('slippage', 'slippage'),
+    ('updated_at', 'updatedAt'),
+    ('created_at', 'createdAt'),
+    ('order_cid', 'orderCid'),
+    ('expires', 'expires'),
+)
+# order of keys in Kickex.parse_orders result
+FIELDS = (
+    'order_id', 'user_id', 'quantity', 'pair', 'side', 'price', 'executed',
+    'status', 'base_decimals', 'quote_decimals', 'pair_id', 'type',
+    'stop_price', 'slippage', 'timestamp', 'updated_at', 'created_at',
+    'executed_price', 'fee', 'order_cid', 'expires',
+)
+NONE = -1  # None in int columns, nan is None in float columns
+
+
+class OrderBatch:
+    """
+    Struct of arrays with parsed orders.
+
+    Numbers are kept in array columns, status and side as small int codes
+    (Kickex.ORDER_STATUSES / Kickex.SIDES keys). batch[i] and iteration
+    give dicts exactly like Kickex.parse_orders does.
+    """
+
+    def __init__(
+            self,
+            columns: Dict[str, array],
+            raw_orders: List[dict],
+            status_names: Dict[int, str],
+            side_names: Dict[int, str],
+    ) -> None:
+        self.columns = columns
+        self.raw_orders = raw_orders
+        self.status_names = status_names
+        self.side_names = side_names
+
+    @classmethod
+    def from_orders(
+            cls,
+            orders: List[dict],
+            status_names: Dict[int, str],
+            side_names: Dict[int, str],
+    ) -> 'OrderBatch':
+        """
+        Parse raw kickex orders in one pass.
+        """
+        columns = {name: array('d') for name in FLOAT_COLUMNS}
+        columns.update({name: array('q') for name in ('order_id', 'timestamp')})
+        columns.update({name: array('b') for name in ('status', 'side')})
+
+        order_id = columns['order_id'].append
+        timestamp = columns['timestamp'].append
+        status = columns['status'].append
+        side = columns['side'].append
+        quantity = columns['quantity'].append
+        price = columns['price'].append
+        executed = columns['executed'].append
+        executed_price = columns['executed_price'].append
+        fee = columns['fee'].append
+
+        for order in orders:
+            get = order.get
+            order_id(int(get('orderId')))
+            ordered_volume = get('orderedVolume')
+            total_sell_volume = get('totalSellVolume')
+            quantity(nan if ordered_volume is None else float(ordered_volume))
+            executed(nan if total_sell_volume is None else float(total_sell_volume))
+            value = get('limitPrice')
+            price(nan if value is None else float(value))
+            value = get('executedPrice')
+            executed_price(nan if value is None else float(value))
+            value = get('fee')
+            fee(nan if value is None else float(value))
+
+            state = get('state')
+            if state is None:
+                state = NONE
+            elif state == 5 and (
+                    Fixed.parse(total_sell_volume) < Fixed.parse(ordered_volume)
+            ):  # same check as Kickex.get_order_status, volumes are strings
+                state = 45
+            status(state)
+            value = get('tradeIntent')
+            side(NONE if value is None else value)
+            value = get('createdTimestamp')
+            timestamp(NONE if value is None else int(float(value) / 1e9))
+
+        return cls(columns, orders, status_names, side_names)
+
+    def __len__(self) -> int:
+        return len(self.columns['order_id'])
+
+    def __getitem__(self, i: int) -> dict:
+        columns = self.columns
+        raw = self.raw_orders[i]
+        row = dict.fromkeys(FIELDS)
+        for name in INT_COLUMNS + FLOAT_COLUMNS:
+            row[name] = columns[name][i]
+        for name, key in OBJECT_FIELDS:
+            row[name] = raw.get(key)
+        for name in FLOAT_COLUMNS:
+            if isnan(row[name]):
+                row[name] = None
+        if row['timestamp'] == NONE:
+            row['timestamp'] = None
+        row['status'] = self.status_names.get(row['status'])
+        row['side'] = self.side_names.get(row['side'])
+        return row
+
+    def __iter__(self) -> Iterator[dict]:
+        return (self[i] for i in range(len(self)))
+
+    def to_dicts(self) -> List[dict]:
+        return list(self)
+
+    def to_numpy(self):
+        """
+        Numeric columns as numpy record array, numpy is imported only here.
+        """
+        import numpy
+
+        names = INT_COLUMNS + FLOAT_COLUMNS
+        return numpy.rec.fromarrays(
+            [numpy.frombuffer(self.columns[name], dtype=self.columns[name].typecode)
+             for name in names],
+            names=names,
+        )
@@ -0,0 +1,122 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+FINAL_STATUSES = ('executed', 'partially executed', 'rejected', 'cancelled')
+
+
+class OrderStore:
+    """
+    Local state of orders keyed by order_id, orders are in parse_orders shape.
+
+    Kickex fills it from place_order results and get_user_orders('active')
+    lists, anything else (ex. private websocket order feed) can call update.
+    Order state is trusted for max_age seconds, orders in final status
+    don't change anymore and never get stale. They are kept for final_ttl
+    seconds after the last update and at most max_final of them, the
+    oldest are forgotten first, so a long running bot doesn't grow.
+    """
+
+    def __init__(
+            self,
+            max_age: float = 5.0,
+            clock: Callable[[], float] = time.monotonic,
+            final_ttl: Optional[float] = 3600.0,
+            max_final: int = 10000,
+    ) -> None:
+        """
+        :param final_ttl: float. seconds final orders are kept, None for no limit
+        :param max_final: int. final orders kept, the oldest are forgotten over it
+        """
+        self.max_age = max_age
+        self.clock = clock
+        self.final_ttl = final_ttl
+        self.max_final = max_final
+        self.orders: Dict[int, Tuple[dict, float]] = {}
+        self._final: Dict[int, float] = {}  # order_id -> updated, oldest first
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, order_id) -> Optional[dict]:
+        """
+        :return: order if it is known and fresh, else None
+        """
+        with self._lock:
+            now = self.clock()
+            self._evict(now)
+            item = self.orders.get(int(order_id))
+            if item is None or (
+                    item[0]['status'] not in FINAL_STATUSES
+                    and now - item[1] > self.max_age
+            ):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return dict(item[0])
+
+    def update(self, order: dict) -> None:
+        now = self.clock()
+        with self._lock:
+            self._store(order['order_id'], dict(order), now)
+            self._evict(now)
+
+    def invalidate(self, order_id) -> None:
+        """
+        Forget order state, ex. after cancel request: it will be fetched again.
+        """
+        with self._lock:
+            self.orders.pop(int(order_id), None)
+            self._final.pop(int(order_id), None)
+
+    def seed(self, active_orders: Iterable[dict]) -> None:
+        """
+        Replace active orders with fresh list of them. Orders which were
+        active here, but are missing in the list are finished somehow,
+        they are forgotten so their final state is fetched on next get.
+        """
+        now = self.clock()
+        active = {order['order_id']: dict(order) for order in active_orders}
+        with self._lock:
+            for order_id, (order, updated) in list(self.orders.items()):
+                if order['status'] not in FINAL_STATUSES and order_id not in active:
+                    del self.orders[order_id]
+            for order_id, order in active.items():
+                self._store(order_id, order, now)
+            self._evict(now)
+
+    def _store(self, order_id: int, order: dict, now: float) -> None:
+        self.orders[order_id] = (order, now)
+        self._final.pop(order_id, None)
+        if order['status'] in FINAL_STATUSES:
+            self._final[order_id] = now
+
+    def _evict(self, now: float) -> None:
+        """
+        Forget final orders over max_final or older than final_ttl.
+        """
+        final = self._final
+        expired = None if self.final_ttl is None else now - self.final_ttl
+        while final:
+            order_id, updated = next(iter(final.items()))
+            if len(final) <= self.max_final and (expired is None or updated >= expired):
+                break
+            del final[order_id]
+            del self.orders[order_id]
+
+    def active(self) -> List[dict]:
+        with self._lock:
+            return [
+                dict(order) for order, updated in self.orders.values()
+                if order['status'] not in FINAL_STATUSES
+            ]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'orders': len(self.orders),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / requests if requests else 0.0,
+            }
@@ -0,0 +1,194 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fixed_point import DOWN, UP, Fixed
+
+INVALID_ORDER = 'invalid_order'  # code of orders rejected before sending
+
+
+class PairSpec:
+    """
+    Trading rules of one kickex pair.
+
+    Steps are 10 ** -decimals unless the pair has explicit tick / lot size,
+    minimums are None when the exchange doesn't limit them.
+
+    The /market/pairs endpoint and the field names below are assumptions,
+    they are not in the public kickex api docs and were not checked
+    against the live gate. Missing step fields fall back to decimals and
+    missing minimums disable the checks, so a renamed field makes
+    rounding looser, never stricter than the exchange.
+    """
+
+    # kickex /market/pairs fields, assumed, see above
+    PAIR_NAME = 'pairName'
+    PAIR_ID = 'pairId'
+    BASE_DECIMALS = 'baseDecimals'
+    QUOTE_DECIMALS = 'quoteDecimals'
+    PRICE_STEP = 'tickSize'
+    AMOUNT_STEP = 'lotSize'
+    MIN_AMOUNT = 'minOrderSize'
+    MIN_VOLUME = 'minOrderVolume'  # in quote currency
+
+    def __init__(
+            self,
+            pair_name: str,
+            pair_id: Optional[int],
+            base_decimals: int,
+            quote_decimals: int,
+            price_step: Optional[Fixed] = None,
+            amount_step: Optional[Fixed] = None,
+            min_amount: Optional[Fixed] = None,
+            min_volume: Optional[Fixed] = None,
+    ) -> None:
+        self.pair_name = pair_name
+        self.pair_id = pair_id
+        self.base_decimals = base_decimals
+        self.quote_decimals = quote_decimals
+        self.price_step = price_step or Fixed(1, quote_decimals)
+        self.amount_step = amount_step or Fixed(1, base_decimals)
+        self.min_amount = min_amount
+        self.min_volume = min_volume
+
+    @classmethod
+    def from_kickex(cls, pair: dict) -> 'PairSpec':
+        def fixed(field):
+            value = pair.get(field)
+            return None if value in (None, '') else Fixed.parse(value)
+
+        return cls(
+            pair_name=pair[cls.PAIR_NAME],
+            pair_id=pair.get(cls.PAIR_ID),
+            base_decimals=int(pair[cls.BASE_DECIMALS]),
+            quote_decimals=int(pair[cls.QUOTE_DECIMALS]),
+            price_step=fixed(cls.PRICE_STEP),
+            amount_step=fixed(cls.AMOUNT_STEP),
+            min_amount=fixed(cls.MIN_AMOUNT),
+            min_volume=fixed(cls.MIN_VOLUME),
+        )
+
+    def prepare_order(self, side: str, amount, price) -> Tuple[Fixed, Fixed]:
+        """
+        Round order to pair steps and check minimums.
+
+        Amount is rounded down, price to the safe side: down for buy
+        and up for sell, so rounding never gives a worse deal.
+
+        :raise ValueError: order can't be placed on this pair
+        """
+        try:
+            amount = Fixed.parse(amount).quantize(self.amount_step, DOWN)
+            price = Fixed.parse(price).quantize(self.price_step, DOWN if side == 'buy' else UP)
+        except (ValueError, ArithmeticError):
+            raise ValueError(f'amount {amount!r} and price {price!r} must be numbers')
+
+        if amount <= 0:
+            raise ValueError(f'amount is less than {self.amount_step} step')
+        if price <= 0:
+            raise ValueError('price must be positive')
+        if self.min_amount is not None and amount < self.min_amount:
+            raise ValueError(f'amount {amount} is less than minimum {self.min_amount}')
+        if self.min_volume is not None and amount * price < self.min_volume:
+            raise ValueError(
+                f'volume {amount * price} is less than minimum {self.min_volume}'
+            )
+        return amount, price
+
+
+class PairMetadata:
+    """
+    Specs of all kickex pairs, downloaded once and shared by clients.
+
+    With path the raw /market/pairs answer is saved there, so restarts
+    within ttl don't download it again. Stale specs are still served when
+    refresh fails, and failed refresh is not tried again for
+    retry_interval, so a broken endpoint costs one request per interval
+    instead of one per order.
+
+    pairs = PairMetadata(path='kickex_pairs.json')
+    client = Kickex('del_usdt', pairs=pairs)
+    client.get_pair_spec().quote_decimals
+    """
+
+    def __init__(
+            self,
+            path: Optional[str] = None,
+            ttl: float = 24 * 60 * 60,
+            retry_interval: float = 60.0,
+    ) -> None:
+        """
+        :param path: cache file, specs are kept in memory only by default
+        :param ttl: float. seconds specs are trusted for
+        :param retry_interval: float. seconds between refresh attempts
+        """
+        self.path = path
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self.pairs: Dict[str, PairSpec] = {}
+        self.updated: Optional[float] = None  # time.time() of download
+        self.attempted: Optional[float] = None  # time.time() of refresh attempt
+        self._lock = threading.Lock()
+        self.load_cache()
+
+    def load_cache(self) -> bool:
+        """
+        :return: True if cache file was read
+        """
+        if self.path is None or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path) as f:
+                cache = json.load(f)
+            self.update(cache['pairs'], cache['updated'], save=False)
+        except (ValueError, KeyError, TypeError):
+            return False  # broken or foreign file, will be downloaded
+        return True
+
+    def is_fresh(self) -> bool:
+        return self.updated is not None and time.time() - self.updated < self.ttl
+
+    def should_refresh(self) -> bool:
+        """
+        True when specs are stale and no refresh was tried for
+        retry_interval. Only one of concurrent callers gets True.
+        """
+        now = time.time()
+        with self._lock:
+            if self.is_fresh():
+                return False
+            if self.attempted is not None and now - self.attempted < self.retry_interval:
+                return False
+            self.attempted = now
+            return True
+
+    def update(
+            self,
+            raw_pairs: List[dict],
+            updated: Optional[float] = None,
+            save: bool = True,
+    ) -> None:
+        """
+        :param raw_pairs: kickex /market/pairs answer
+        """
+        pairs = {}
+        for pair in raw_pairs:
+            spec = PairSpec.from_kickex(pair)
+            pairs[spec.pair_name] = spec
+        updated = time.time() if updated is None else updated
+        with self._lock:
+            self.pairs = pairs
+            self.updated = updated
+        if save and self.path is not None:
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'updated': updated, 'pairs': raw_pairs}, f)
+            os.replace(tmp_path, self.path)
+
+    def get(self, pair_name: str) -> Optional[PairSpec]:
+        """
+        :param pair_name: string. ex. 'DEL/USDT'
+        """
+        return self.pairs.get(pair_name)
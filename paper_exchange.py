@@ -0,0 +1,536 @@
+import itertools
+import json
+import random
+import time
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Union
+
+from base_api import API
+from fixed_point import FIXED, FLOAT, Fixed, format_scaled
+from kickex_parsers import KickexParser
+
+BUY = 0  # kickex tradeIntent
+SELL = 1
+
+ACCEPTED = 4
+EXECUTED = 5
+CANCELLED = 7
+
+CACHE_SIZE = 65536  # parsed / formatted numbers kept by PaperExchange
+
+
+class PaperOrder:
+    """
+    Order of paper exchange, amounts and prices are scaled integers.
+    """
+
+    __slots__ = (
+        'order_id', 'side', 'price', 'amount', 'executed', 'notional',
+        'fee', 'state', 'created', 'reserved',
+    )
+
+    def __init__(
+            self,
+            order_id: int,
+            side: int,
+            price: int,
+            amount: int,
+            created: int,
+            reserved: int,
+    ) -> None:
+        self.order_id = order_id
+        self.side = side
+        self.price = price
+        self.amount = amount
+        self.executed = 0
+        self.notional = 0  # sum of executed amount * price, base + quote decimals
+        self.fee = 0
+        self.state = ACCEPTED
+        self.created = created  # nanoseconds like kickex createdTimestamp
+        self.reserved = reserved  # part of balance still held by the order
+
+
+class OrderQueue:
+    """
+    Resting orders of one side in price-time priority: price levels are
+    sorted keys (negated for bids, so the best level is always first),
+    orders of one level are served first in, first out.
+    """
+
+    def __init__(self, side: int) -> None:
+        self.sign = -1 if side == BUY else 1
+        self.keys: List[int] = []
+        self.levels: Dict[int, Deque[PaperOrder]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.keys)
+
+    def add(self, order: PaperOrder) -> None:
+        key = self.sign * order.price
+        level = self.levels.get(key)
+        if level is None:
+            level = self.levels[key] = deque()
+            insort(self.keys, key)
+        level.append(order)
+
+    def remove(self, order: PaperOrder) -> None:
+        key = self.sign * order.price
+        level = self.levels[key]
+        level.remove(order)
+        if not level:
+            del self.levels[key]
+            del self.keys[bisect_left(self.keys, key)]
+
+    def best(self) -> Optional[PaperOrder]:
+        """
+        First order of the best price level.
+        """
+        if not self.keys:
+            return None
+        return self.levels[self.keys[0]][0]
+
+    def pop_best(self) -> None:
+        key = self.keys[0]
+        level = self.levels[key]
+        level.popleft()
+        if not level:
+            del self.levels[key]
+            del self.keys[0]
+
+    def depth(self) -> List[List[int]]:
+        """
+        :return: [[price, amount left], ...] best first
+        """
+        return [
+            [self.sign * key, sum(o.amount - o.executed for o in self.levels[key])]
+            for key in self.keys
+        ]
+
+
+class PaperExchange(KickexParser, API):
+    """
+    Local exchange with API interface for strategy simulations.
+
+    Market liquidity comes from order book snapshots (load_order_book,
+    see books_from_recording and synthetic_books). Limit orders take it
+    at snapshot prices and the rest waits in price-time priority queue;
+    resting orders are filled at their own price when a later snapshot
+    crosses them. Taken liquidity is gone until the next snapshot.
+    Own orders never trade with each other.
+
+    Results come from KickexParser.parse_* over kickex-shaped raw orders,
+    so they are exactly what Kickex returns. place_order and
+    get_order_state build the same dicts straight from scaled integers,
+    see parse_order. Cancel of partially filled
+    order gives state 5 with executed < ordered, i.e. 'partially executed'.
+
+    exchange = PaperExchange('del_usdt', balances={'USDT': '1000'})
+    for book in synthetic_books(mid=1.0):
+        exchange.load_order_book(book)
+        strategy(exchange)
+    """
+
+    ERROR_NOT_FOUND = {'code': 2002, 'message': 'Order not found'}
+    ERROR_INSUFFICIENT_FUNDS = {'code': 3002, 'message': 'Insufficient funds'}
+    ERROR_INVALID_ORDER = {'code': 3001, 'message': 'Invalid order parameters'}
+
+    def __init__(
+            self,
+            market: str = "eth_usdt",
+            balances: Optional[Dict[str, Union[str, Fixed]]] = None,
+            fee_rate: Union[str, Fixed] = '0',
+            base_decimals: int = 18,
+            quote_decimals: int = 6,
+            pair_id: int = 0,
+            user_id: int = 1,
+            clock: Callable[[], float] = time.time,
+            numeric: str = FLOAT,
+    ) -> None:
+        """
+        :param balances: available balances by currency code,
+            ex. {'USDT': '1000'}, missing currencies are 0
+        :param fee_rate: string. fee share taken from received currency,
+            ex. '0.001'
+        :param base_decimals: int. precision of amounts, see PairSpec
+        :param quote_decimals: int. precision of prices
+        :param clock: current time for order timestamps, load_order_book
+            sets simulated time when snapshot has it
+        :param numeric: 'float' or 'fixed', see KickexParser.set_numeric
+        """
+        API.__init__(self, market)
+        self.pair_name = f'{self.currency_1}/{self.currency_2}'
+        self.set_numeric(numeric, quote_decimals, base_decimals)
+
+        self.base_decimals = base_decimals
+        self.quote_decimals = quote_decimals
+        self.pair_id = pair_id
+        self.user_id = user_id
+        self.clock = clock
+        self.now: Optional[float] = None
+        # fee = received * fee_rate.value // fee_scale
+        self.fee_rate = Fixed.parse(fee_rate)
+        self.fee_scale = 10 ** self.fee_rate.decimals
+        self.notional_scale = 10 ** base_decimals  # amount * price -> quote
+
+        decimals = {self.currency_1: base_decimals, self.currency_2: quote_decimals}
+        self.available: Dict[str, int] = {currency: 0 for currency in decimals}
+        self.reserved: Dict[str, int] = {currency: 0 for currency in decimals}
+        self.decimals = decimals
+        for currency, amount in (balances or {}).items():
+            self.decimals.setdefault(currency, Fixed.parse(amount).decimals)
+            self.available[currency] = Fixed.parse(amount, self.decimals[currency]).value
+            self.reserved.setdefault(currency, 0)
+
+        self.orders: Dict[int, PaperOrder] = {}
+        self.queues = {BUY: OrderQueue(BUY), SELL: OrderQueue(SELL)}
+        # market liquidity [[price, amount], ...] best first, from snapshot
+        self.liquidity: Dict[int, List[List[int]]] = {BUY: [], SELL: []}
+        self._ids = itertools.count(1)
+        # simulations repeat the same amounts and prices, so strings are
+        # parsed and formatted once: {decimals: {str: int}}, {decimals: {int: str}}
+        self._parsed: Dict[int, dict] = {base_decimals: {}, quote_decimals: {}}
+        self._formatted: Dict[int, dict] = {base_decimals: {}, quote_decimals: {}}
+
+    # market data
+
+    def load_order_book(self, levels: dict, timestamp: Optional[float] = None) -> None:
+        """
+        Replace market liquidity with snapshot and fill crossed resting orders.
+
+        :param levels: Kickex.get_order_book result, {'asks': [(price,
+            amount), ...], 'bids': [...]}, best levels first
+        :param timestamp: float. snapshot time in seconds, becomes exchange time
+        """
+        if timestamp is not None:
+            self.now = timestamp
+        self.liquidity = {
+            SELL: self.scale_levels(levels['asks']),
+            BUY: self.scale_levels(levels['bids']),
+        }
+        for side in (BUY, SELL):
+            self.fill_resting(side)
+
+    def scale_levels(self, levels) -> List[List[int]]:
+        parse = Fixed.parse
+        return [
+            [parse(price, self.quote_decimals).value, parse(amount, self.base_decimals).value]
+            for price, amount in levels
+        ]
+
+    def fill_resting(self, side: int) -> None:
+        """
+        Fill resting orders of side crossed by market liquidity, best
+        price first and oldest first within price, at order price.
+        """
+        queue = self.queues[side]
+        liquidity = self.liquidity[1 - side]
+        while queue and liquidity:
+            order = queue.best()
+            if not self.crosses(side, order.price, liquidity[0][0]):
+                return
+            self.take(order, liquidity, order.price)
+            if order.executed == order.amount:
+                queue.pop_best()
+            elif not liquidity:
+                return
+
+    @staticmethod
+    def crosses(side: int, price: int, level_price: int) -> bool:
+        return level_price <= price if side == BUY else level_price >= price
+
+    def take(self, order: PaperOrder, liquidity: List[List[int]], price: Optional[int]) -> None:
+        """
+        Fill order from liquidity levels crossing it.
+
+        :param price: execution price, None for prices of levels
+        """
+        while liquidity and order.executed < order.amount:
+            level = liquidity[0]
+            if not self.crosses(order.side, order.price, level[0]):
+                break
+            amount = min(level[1], order.amount - order.executed)
+            self.fill(order, amount, level[0] if price is None else price)
+            level[1] -= amount
+            if not level[1]:
+                liquidity.pop(0)
+
+    def fill(self, order: PaperOrder, amount: int, price: int) -> None:
+        base, quote = self.currency_1, self.currency_2
+        volume = amount * price // self.notional_scale
+        order.executed += amount
+        order.notional += amount * price
+        if order.side == BUY:
+            fee = amount * self.fee_rate.value // self.fee_scale
+            spent = min(volume, order.reserved)
+            order.reserved -= spent
+            self.reserved[quote] -= spent
+            self.available[base] += amount - fee
+        else:
+            fee = volume * self.fee_rate.value // self.fee_scale
+            order.reserved -= amount
+            self.reserved[base] -= amount
+            self.available[quote] += volume - fee
+        order.fee += fee
+        if order.executed == order.amount:
+            self.finish(order, EXECUTED)
+
+    def finish(self, order: PaperOrder, state: int) -> None:
+        """
+        Close order and release what is left of its reservation.
+        """
+        order.state = state
+        if order.reserved:
+            currency = self.currency_2 if order.side == BUY else self.currency_1
+            self.reserved[currency] -= order.reserved
+            self.available[currency] += order.reserved
+            order.reserved = 0
+
+    # API
+
+    def get_order_book(self, as_order_book: bool = False) -> dict:
+        """
+        Market liquidity left after fills merged with own resting orders.
+        """
+        book = {}
+        for name, side in (('asks', SELL), ('bids', BUY)):
+            levels: Dict[int, int] = {}
+            for price, amount in self.liquidity[side] + self.queues[side].depth():
+                levels[price] = levels.get(price, 0) + amount
+            book[name] = [
+                {
+                    'price': format_scaled(price, self.quote_decimals),
+                    'amount': format_scaled(amount, self.base_decimals),
+                }
+                for price, amount in sorted(levels.items(), reverse=side == BUY)
+            ]
+        return self.parse_get_order_book(order_book=book, as_order_book=as_order_book)
+
+    def check_accounts_state(self) -> dict:
+        return self.parse_check_accounts_state(self.get_account_balance())
+
+    def get_account_balance(self) -> List[dict]:
+        """
+        Balances in kickex /user/balance shape.
+        """
+        return [
+            {
+                'currencyCode': currency,
+                'available': format_scaled(self.available[currency], decimals),
+                'reserved': format_scaled(self.reserved[currency], decimals),
+            }
+            for currency, decimals in self.decimals.items()
+        ]
+
+    def place_order(
+            self,
+            side: str,
+            amount: Union[str, Fixed],
+            price: Union[str, Fixed],
+            order_type: str,
+    ) -> dict:
+        """
+        See Kickex.place_order, only limit orders.
+        """
+        try:
+            intent = self.SIDES[side]
+            amount = self.scale(amount, self.base_decimals)
+            price = self.scale(price, self.quote_decimals)
+        except (KeyError, ValueError, ArithmeticError):
+            return self.parse_placing_order_result(dict(self.ERROR_INVALID_ORDER))
+        if amount <= 0 or price <= 0:
+            return self.parse_placing_order_result(dict(self.ERROR_INVALID_ORDER))
+
+        if intent == BUY:
+            currency = self.currency_2
+            reserved = -(-amount * price // self.notional_scale)  # rounded up
+        else:
+            currency = self.currency_1
+            reserved = amount
+        if self.available[currency] < reserved:
+            return self.parse_placing_order_result(dict(self.ERROR_INSUFFICIENT_FUNDS))
+        self.available[currency] -= reserved
+        self.reserved[currency] += reserved
+
+        order = PaperOrder(
+            next(self._ids), intent, price, amount,
+            int((self.clock() if self.now is None else self.now) * 1e9), reserved,
+        )
+        self.orders[order.order_id] = order
+        self.take(order, self.liquidity[1 - intent], None)
+        if order.state == ACCEPTED:
+            self.queues[intent].add(order)
+        return {'ok': True, 'result': self.parse_order(order)}
+
+    def cancel_order(self, order_id: str) -> dict:
+        order = self.orders.get(int(order_id))
+        if order is None or order.state != ACCEPTED:
+            return self.parse_cancel_order(dict(self.ERROR_NOT_FOUND))
+        self.queues[order.side].remove(order)
+        # partially filled order ends as executed, parse_orders makes it 45
+        self.finish(order, EXECUTED if order.executed else CANCELLED)
+        return self.parse_cancel_order({})
+
+    def get_user_orders(self, order_status: str) -> dict:
+        """
+        :param order_status: 'active' for resting orders, anything else
+            for all orders
+        """
+        return self.parse_user_orders([
+            self.raw_order(order) for order in self.orders.values()
+            if order_status != 'active' or order.state == ACCEPTED
+        ])
+
+    def get_order_state(self, order_id: str) -> dict:
+        order = self.orders.get(int(order_id))
+        if order is None:
+            return self.parse_order_state(dict(self.ERROR_NOT_FOUND))
+        return {'ok': True, 'result': self.parse_order(order)}
+
+    def get_orders_history(self) -> List[dict]:
+        """
+        Raw finished orders, newest first, like Kickex.get_orders_history.
+        """
+        return [
+            self.raw_order(order) for order in reversed(self.orders.values())
+            if order.state != ACCEPTED
+        ]
+
+    def scale(self, number: Union[str, Fixed], decimals: int) -> int:
+        cache = self._parsed[decimals]
+        value = cache.get(number)
+        if value is None:
+            value = Fixed.parse(number, decimals).value
+            if len(cache) >= CACHE_SIZE:
+                cache.clear()
+            cache[number] = value
+        return value
+
+    def format(self, value: int, decimals: int) -> str:
+        cache = self._formatted[decimals]
+        text = cache.get(value)
+        if text is None:
+            text = format_scaled(value, decimals)
+            if len(cache) >= CACHE_SIZE:
+                cache.clear()
+            cache[value] = text
+        return text
+
+    def number(self, value: int, decimals: int) -> Union[float, Fixed]:
+        """
+        to_number(format_scaled(value, decimals), decimals) without the
+        string: int / int is correctly rounded like float of the string.
+        """
+        if self.numeric == FIXED:
+            return Fixed(value, decimals)
+        return value / 10 ** decimals
+
+    def parse_order(self, order: PaperOrder) -> dict:
+        """
+        Same as parse_orders([raw_order(order)])[0], which costs more than
+        matching the order.
+        """
+        base_decimals, quote_decimals = self.base_decimals, self.quote_decimals
+        state = order.state
+        if state == EXECUTED and order.executed < order.amount:
+            state = 45
+        executed_price = fee = None
+        if order.executed:
+            executed_price = self.number(order.notional // order.executed, quote_decimals)
+            fee = self.number(order.fee, base_decimals if order.side == BUY else quote_decimals)
+        return {
+            'order_id': order.order_id,
+            'user_id': self.user_id,
+            'quantity': self.number(order.amount, base_decimals),
+            'pair': self.pair_name,
+            'side': self.SIDES[order.side],
+            'price': self.number(order.price, quote_decimals),
+            'executed': self.number(order.executed, base_decimals),
+            'status': self.ORDER_STATUSES[state],
+            'base_decimals': base_decimals,
+            'quote_decimals': quote_decimals,
+            'pair_id': self.pair_id,
+            'type': 'limit',
+            'stop_price': None,
+            'slippage': None,
+            'timestamp': int(order.created / 1e9),
+            'updated_at': None,
+            'created_at': None,
+            'executed_price': executed_price,
+            'fee': fee,
+            'order_cid': None,
+            'expires': None,
+        }
+
+    def raw_order(self, order: PaperOrder) -> dict:
+        """
+        Order as kickex sends it.
+        """
+        fee_decimals = self.base_decimals if order.side == BUY else self.quote_decimals
+        return {
+            'orderId': str(order.order_id),
+            'userId': self.user_id,
+            'pairName': self.pair_name,
+            'pairId': self.pair_id,
+            'orderedVolume': self.format(order.amount, self.base_decimals),
+            'limitPrice': self.format(order.price, self.quote_decimals),
+            'totalSellVolume': self.format(order.executed, self.base_decimals),
+            'tradeIntent': order.side,
+            'state': order.state,
+            'baseDecimals': self.base_decimals,
+            'quoteDecimals': self.quote_decimals,
+            'type': 'limit',
+            'createdTimestamp': str(order.created),
+            'executedPrice': format_scaled(
+                order.notional // order.executed, self.quote_decimals
+            ) if order.executed else None,
+            'fee': format_scaled(order.fee, fee_decimals) if order.executed else None,
+        }
+
+
+def books_from_recording(path: str) -> Iterator[dict]:
+    """
+    Order books with their time from recording.RecordingSession file,
+    for PaperExchange.load_order_book(book['levels'], book['timestamp']).
+    """
+    from recording import iter_records
+
+    parser = KickexParser('eth_usdt')
+    for record in iter_records(path, '/market/orderbook'):
+        if record['status'] != 200:
+            continue
+        result = parser.parse_get_order_book(json.loads(record['response']))
+        if result['ok']:
+            yield {'levels': result['result'], 'timestamp': record['started']}
+
+
+def synthetic_books(
+        mid: float = 1.0,
+        spread: float = 0.001,
+        tick: float = 0.000001,
+        depth: int = 20,
+        volatility: float = 0.0005,
+        amount: float = 10.0,
+        seed: int = 0,
+) -> Iterator[dict]:
+    """
+    Endless random walk of order books around mid, best levels first.
+
+    :param volatility: float. standard deviation of mid step, share of mid
+    """
+    rng = random.Random(seed)
+    decimals = max(0, len(f'{tick:.12f}'.rstrip('0').split('.')[1]))
+    while True:
+        mid *= 1 + rng.gauss(0, volatility)
+        best_ask = mid * (1 + spread / 2)
+        best_bid = mid * (1 - spread / 2)
+        yield {
+            'asks': [
+                (f'{best_ask + i * tick:.{decimals}f}', f'{amount * rng.uniform(0.5, 1.5):.4f}')
+                for i in range(depth)
+            ],
+            'bids': [
+                (f'{best_bid - i * tick:.{decimals}f}', f'{amount * rng.uniform(0.5, 1.5):.4f}')
+                for i in range(depth)
+            ],
+        }
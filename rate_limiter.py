@@ -0,0 +1,243 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# endpoint groups with separate limits
+MARKET = 'market'  # public market data
+TRADING = 'trading'  # private orders and balances
+HISTORY = 'history'  # private history, heavy and least urgent
+
+# priority lanes, lower goes first
+CRITICAL = 0  # cancels
+HIGH = 1  # placing orders
+NORMAL = 2  # polling
+LOW = 3  # history and reports
+
+
+class TokenBucket:
+    """
+    rate tokens per second, up to capacity tokens can be spent at once.
+    """
+
+    def __init__(
+            self,
+            rate: float,
+            capacity: float,
+            clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """
+        Seconds until one token is available, 0 if available now.
+        """
+        self.refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+class GroupMetrics:
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.waited = 0  # requests which had to wait
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.max_queue_depth = 0
+
+    def to_dict(self, queue_depth: int) -> dict:
+        return {
+            'requests': self.requests,
+            'waited': self.waited,
+            'queue_depth': queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'avg_wait_time': self.wait_time / self.requests if self.requests else 0.0,
+            'max_wait_time': self.max_wait_time,
+        }
+
+
+class RequestScheduler:
+    """
+    Paces requests with token bucket per endpoint group and one more
+    bucket shared by all groups, as the gate also limits the account as
+    a whole.
+
+    Callers waiting for the same group are served by priority, then in
+    arrival order. The shared bucket goes by priority across groups: a
+    caller ready in its group yields to a better one ready in another
+    group, so a cancel (TRADING, CRITICAL) never waits behind queued
+    book polling (MARKET, NORMAL). Works for threads (acquire) and
+    coroutines (acquire_async).
+
+    Limits are client side guesses, the gate doesn't publish them.
+
+    clock is injectable for tests. Waiting threads sleep by real time, so
+    after moving fake clock call wake() to let them check buckets again.
+    """
+
+    LIMITS = {
+        MARKET: (10, 20),  # (requests per second, burst)
+        TRADING: (10, 10),
+        HISTORY: (1, 2),
+    }
+    ACCOUNT_LIMIT = (15, 20)  # all groups together
+
+    def __init__(
+            self,
+            limits: Optional[Dict[str, Tuple[float, float]]] = None,
+            clock: Callable[[], float] = time.monotonic,
+            account_limit: Optional[Tuple[float, float]] = ACCOUNT_LIMIT,
+    ) -> None:
+        """
+        :param limits: {group: (rate, capacity)}, LIMITS by default
+        :param clock: function returning seconds, time.monotonic by default
+        :param account_limit: (rate, capacity) shared by all groups, None
+            for groups limited only by their own buckets
+        """
+        self.clock = clock
+        self.buckets = {
+            group: TokenBucket(rate, capacity, clock)
+            for group, (rate, capacity) in (limits or self.LIMITS).items()
+        }
+        self.account = None if account_limit is None else TokenBucket(*account_limit, clock)
+        self.queues: Dict[str, List[Tuple[int, int]]] = {
+            group: [] for group in self.buckets
+        }
+        self._metrics = {group: GroupMetrics() for group in self.buckets}
+        self._tickets = itertools.count()
+        self._condition = threading.Condition()
+
+    def acquire(self, group: str, priority: int = NORMAL) -> float:
+        """
+        Block until request of group may be sent.
+
+        :return: seconds waited
+        """
+        started = self.clock()
+        ticket = self._enqueue(group, priority)
+        with self._condition:
+            try:
+                while True:
+                    wait = self._try_take(group, ticket)
+                    if not wait:
+                        break
+                    self._condition.wait(wait)
+            except BaseException:  # ex. KeyboardInterrupt, ticket must not block others
+                self._remove(group, ticket)
+                raise
+            finally:
+                self._condition.notify_all()
+        return self._done(group, started)
+
+    async def acquire_async(self, group: str, priority: int = NORMAL) -> float:
+        """
+        Same as acquire, but sleeps without blocking event loop.
+        """
+        import asyncio  # not at module level: sync clients don't need it
+
+        started = self.clock()
+        ticket = self._enqueue(group, priority)
+        try:
+            while True:
+                with self._condition:
+                    wait = self._try_take(group, ticket)
+                    if not wait:
+                        self._condition.notify_all()
+                        break
+                await asyncio.sleep(min(wait, 0.05))
+        except BaseException:  # ex. task cancelled, ticket must not block others
+            with self._condition:
+                self._remove(group, ticket)
+                self._condition.notify_all()
+            raise
+        return self._done(group, started)
+
+    def wake(self) -> None:
+        with self._condition:
+            self._condition.notify_all()
+
+    def metrics(self) -> Dict[str, dict]:
+        with self._condition:
+            return {
+                group: metrics.to_dict(len(self.queues[group]))
+                for group, metrics in self._metrics.items()
+            }
+
+    def _enqueue(self, group: str, priority: int) -> Tuple[int, int]:
+        if group not in self.queues:
+            raise ValueError(f'unknown group {group}, use one of {list(self.queues)}')
+        ticket = (priority, next(self._tickets))
+        with self._condition:
+            queue = self.queues[group]
+            heapq.heappush(queue, ticket)
+            metrics = self._metrics[group]
+            metrics.max_queue_depth = max(metrics.max_queue_depth, len(queue))
+        return ticket
+
+    def _try_take(self, group: str, ticket: Tuple[int, int]) -> float:
+        """
+        Must be called under self._condition.
+
+        :return: 0 if token was taken, else seconds to wait before next try
+        """
+        queue = self.queues[group]
+        if queue[0] != ticket:
+            return self.buckets[group].wait_time() or 0.01
+        wait = self.buckets[group].wait_time()
+        if self.account is not None and not wait:
+            wait = self.account.wait_time()
+            if not wait and self._outranked(group, ticket):
+                wait = 0.01
+        if not wait:
+            self.buckets[group].take()
+            if self.account is not None:
+                self.account.take()
+            heapq.heappop(queue)
+        return wait
+
+    def _outranked(self, group: str, ticket: Tuple[int, int]) -> bool:
+        """
+        Whether a better ticket of another group could take the shared
+        token now. Must be called under self._condition.
+        """
+        return any(
+            queue and queue[0][0] < ticket[0] and not self.buckets[other].wait_time()
+            for other, queue in self.queues.items()
+            if other != group
+        )
+
+    def _remove(self, group: str, ticket: Tuple[int, int]) -> None:
+        """
+        Drop ticket of caller which gave up waiting. Must be called under
+        self._condition.
+        """
+        queue = self.queues[group]
+        if ticket in queue:
+            queue.remove(ticket)
+            heapq.heapify(queue)
+
+    def _done(self, group: str, started: float) -> float:
+        waited = self.clock() - started
+        with self._condition:
+            metrics = self._metrics[group]
+            metrics.requests += 1
+            metrics.wait_time += waited
+            metrics.max_wait_time = max(metrics.max_wait_time, waited)
+            if waited > 0:
+                metrics.waited += 1
+        return waited
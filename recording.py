@@ -0,0 +1,128 @@
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Iterator, Optional, Tuple
+from urllib import parse
+
+# request headers which never get into recordings
+SECRET_HEADERS = ('KICK-API-KEY', 'KICK-API-PASS', 'KICK-SIGNATURE')
+
+
+class RecordingSession:
+    """
+    requests.Session wrapper writing every exchange to gzipped json lines.
+
+    client.session = RecordingSession(client.session, 'kickex.jsonl.gz')
+
+    Record: {'started', 'duration', 'method', 'url', 'headers', 'body',
+    'status', 'response'} where response is the raw body text.
+    """
+
+    def __init__(self, session, path: str) -> None:
+        self.session = session
+        self.file = gzip.open(path, 'wt', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs):
+        started = time.time()
+        start = time.perf_counter()
+        response = self.session.request(method, url, **kwargs)
+        duration = time.perf_counter() - start
+
+        headers = {
+            key: value.decode('latin-1') if isinstance(value, bytes) else value
+            for key, value in (kwargs.get('headers') or {}).items()
+            if key not in SECRET_HEADERS
+        }
+        record = {
+            'started': started,
+            'duration': duration,
+            'method': method,
+            'url': url,
+            'headers': headers,
+            'body': kwargs.get('data') or '',
+            'status': response.status_code,
+            'response': response.content.decode('utf-8', 'replace'),
+        }
+        line = json.dumps(record, separators=(',', ':'))
+        with self._lock:
+            self.file.write(line + '\n')
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            self.file.close()
+        self.session.close()
+
+
+class ReplayResponse:
+    """
+    The part of requests.Response used by Kickex.
+    """
+
+    def __init__(self, status_code: int, content: bytes) -> None:
+        self.status_code = status_code
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class ReplaySession:
+    """
+    Serves recorded answers instead of network, so parse_* and everything
+    above them can be profiled on real payloads offline.
+
+    client.session = ReplaySession('kickex.jsonl.gz', speed=10)
+
+    Request gets the next unused answer recorded for the same method, path
+    and query parameters in any order, so books of different pairs or
+    different orders are not mixed up. Body is not compared, requests with
+    the same query get their answers in recorded order. Unknown requests
+    raise KeyError.
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = 1.0) -> None:
+        """
+        :param speed: 1 replays with recorded durations, 10 is 10 times
+            faster, None answers without any delay
+        """
+        self.speed = speed
+        self.answers: Dict[Tuple[str, str, str], Deque[dict]] = defaultdict(deque)
+        for record in iter_records(path):
+            self.answers[replay_key(record['method'], record['url'])].append(record)
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs) -> ReplayResponse:
+        with self._lock:
+            answers = self.answers.get(replay_key(method, url))
+            if not answers:
+                raise KeyError(f'no recorded answer for {method} {url}')
+            record = answers.popleft()
+        if self.speed:
+            time.sleep(record['duration'] / self.speed)
+        return ReplayResponse(record['status'], record['response'].encode('utf-8'))
+
+    def close(self) -> None:
+        pass
+
+
+def replay_key(method: str, url: str) -> Tuple[str, str, str]:
+    url = parse.urlsplit(url)
+    query = parse.urlencode(sorted(parse.parse_qsl(url.query, keep_blank_values=True)))
+    return method, url.path, query
+
+
+def iter_records(path: str, url_path: Optional[str] = None) -> Iterator[dict]:
+    """
+    Read recording.
+
+    :param url_path: only records whose url path ends with it, ex. '/ordersHistory'
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if url_path is None or parse.urlsplit(record['url']).path.endswith(url_path):
+                yield record
@@ -0,0 +1,465 @@
+import asyncio
+import logging
+import multiprocessing
+import struct
+import time
+from functools import partial
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fixed_point import FIXED, FLOAT, Fixed, format_scaled
+from order_book import OrderBook
+
+POLL = 'poll'
+STREAM = 'stream'
+
+MAGIC = b'KKXBOOK1'
+# magic, slots, max levels per side, slot size, published books count
+HEADER = struct.Struct('<8sIIIq')
+# sequence (odd while slot is written), time.time() of book,
+# asks count, bids count, price decimals, amount decimals
+SLOT_HEADER = struct.Struct('<qdIIBB6x')
+PUBLISHED_OFFSET = 20  # HEADER field offsets
+SEQUENCE_OFFSET = 0  # SLOT_HEADER field offset
+INT64_MAX = 2 ** 63 - 1
+
+logger = logging.getLogger(__name__)
+
+
+class BookRing:
+    """
+    Ring of order book snapshots of one market in shared memory.
+
+    One writer process, any number of readers. Every slot has its own
+    seqlock: writer makes sequence odd, writes levels, makes it even
+    again, then bumps published counter in header. Reader copies the
+    latest slot and retries if sequence was odd or changed meanwhile.
+    Writer goes round the ring, so readers of the latest book almost
+    never race with it.
+
+    Levels are int64 pairs scaled by per-book price / amount decimals.
+    Decimals are lowered when the largest number of a field wouldn't fit
+    int64 with them, ex. amount 250000000000.0 next to 1.123456789, and
+    numbers with more decimals are rounded half up then.
+    """
+
+    def __init__(self, memory: SharedMemory, owner: bool) -> None:
+        self.memory = memory
+        self.owner = owner
+        magic, self.slots, self.max_levels, self.slot_size, _ = HEADER.unpack_from(memory.buf)
+        if magic != MAGIC:
+            raise ValueError(f'{memory.name} is not an order book ring')
+        self.levels = struct.Struct(f'<{self.max_levels * 4}q')
+
+    @classmethod
+    def create(cls, name: str, slots: int = 8, max_levels: int = 100) -> 'BookRing':
+        slot_size = SLOT_HEADER.size + max_levels * 4 * 8
+        try:
+            memory = SharedMemory(name, create=True, size=HEADER.size + slots * slot_size)
+        except FileExistsError:  # left by killed publisher
+            SharedMemory(name).unlink()
+            memory = SharedMemory(name, create=True, size=HEADER.size + slots * slot_size)
+        untrack(memory)
+        HEADER.pack_into(memory.buf, 0, MAGIC, slots, max_levels, slot_size, 0)
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'BookRing':
+        memory = SharedMemory(name)
+        untrack(memory)
+        return cls(memory, owner=False)
+
+    def __getstate__(self):  # child process attaches by name
+        return {'name': self.memory.name, 'owner': self.owner}
+
+    def __setstate__(self, state) -> None:
+        memory = SharedMemory(state['name'])
+        untrack(memory)
+        self.__init__(memory, state['owner'])
+
+    def slot_offset(self, index: int) -> int:
+        return HEADER.size + (index % self.slots) * self.slot_size
+
+    def published(self) -> int:
+        return struct.unpack_from('<q', self.memory.buf, PUBLISHED_OFFSET)[0]
+
+    def write(self, levels: dict, timestamp: Optional[float] = None) -> None:
+        """
+        :param levels: {'asks': [(price, amount), ...], 'bids': [...]},
+            best levels first, strings or Fixed. Levels over max_levels
+            are dropped
+
+        :raises ValueError: if a number doesn't fit int64 even without decimals
+        """
+        asks = [
+            (Fixed.parse(price), Fixed.parse(amount))
+            for price, amount in levels['asks'][:self.max_levels]
+        ]
+        bids = [
+            (Fixed.parse(price), Fixed.parse(amount))
+            for price, amount in levels['bids'][:self.max_levels]
+        ]
+        price_decimals = fit_decimals([price for price, _ in asks + bids])
+        amount_decimals = fit_decimals([amount for _, amount in asks + bids])
+        values = [0] * (self.max_levels * 4)
+        for start, side in ((0, asks), (self.max_levels * 2, bids)):
+            for i, (price, amount) in enumerate(side):
+                values[start + 2 * i] = price.rescale(price_decimals).value
+                values[start + 2 * i + 1] = amount.rescale(amount_decimals).value
+
+        buf = self.memory.buf
+        published = self.published()
+        offset = self.slot_offset(published)
+        sequence = struct.unpack_from('<q', buf, offset + SEQUENCE_OFFSET)[0]
+        struct.pack_into('<q', buf, offset + SEQUENCE_OFFSET, sequence + 1)
+        SLOT_HEADER.pack_into(
+            buf, offset, sequence + 1, time.time() if timestamp is None else timestamp,
+            len(asks), len(bids), price_decimals, amount_decimals,
+        )
+        self.levels.pack_into(buf, offset + SLOT_HEADER.size, *values)
+        struct.pack_into('<q', buf, offset + SEQUENCE_OFFSET, sequence + 2)
+        struct.pack_into('<q', buf, PUBLISHED_OFFSET, published + 1)
+
+    def read(self, retries: int = 100) -> Optional[Tuple[tuple, tuple]]:
+        """
+        Consistent copy of the latest book.
+
+        :return: (slot header, levels) or None if nothing was published
+        """
+        data = self.read_raw(retries)
+        if data is None:
+            return None
+        return SLOT_HEADER.unpack_from(data), self.levels.unpack_from(data, SLOT_HEADER.size)
+
+    def read_raw(self, retries: int = 100) -> Optional[bytes]:
+        """
+        Consistent copy of the latest slot, header and levels as they
+        are in shared memory, taken with one memcpy.
+
+        :return: slot bytes or None if nothing was published
+        """
+        buf = self.memory.buf
+        for _ in range(retries):
+            published = self.published()
+            if not published:
+                return None
+            offset = self.slot_offset(published - 1)
+            sequence = struct.unpack_from('<q', buf, offset + SEQUENCE_OFFSET)[0]
+            if sequence % 2:
+                continue
+            data = bytes(buf[offset:offset + self.slot_size])
+            if struct.unpack_from('<q', buf, offset + SEQUENCE_OFFSET)[0] == sequence:
+                return data
+        raise TimeoutError(f'{self.memory.name} is overwritten faster than read')
+
+    def close(self) -> None:
+        self.memory.close()
+        if self.owner:
+            # unlink unregisters it again, see untrack
+            resource_tracker.register(self.memory._name, 'shared_memory')
+            self.memory.unlink()
+
+
+def fit_decimals(numbers: List[Fixed]) -> int:
+    """
+    Largest decimals of numbers, lowered until all of them fit int64.
+    """
+    decimals = max((number.decimals for number in numbers), default=0)
+    if not numbers:
+        return decimals
+    largest = max(numbers, key=abs)
+    while abs(largest.rescale(decimals).value) > INT64_MAX:
+        if decimals == 0:
+            raise ValueError(f'{largest} does not fit order book ring')
+        decimals -= 1
+    return decimals
+
+
+def untrack(memory: SharedMemory) -> None:
+    """
+    Every process opening SharedMemory registers it in resource tracker,
+    which unlinks it when that process exits. Rings live until the
+    publisher closes them, whoever reads them.
+    """
+    resource_tracker.unregister(memory._name, 'shared_memory')
+
+
+def ring_name(prefix: str, market: str) -> str:
+    return f'{prefix}_{market}'
+
+
+class MarketDataPublisher:
+    """
+    Process owning order book fetching for a set of markets. Books go
+    to shared memory BookRing per market, where SharedOrderBooks of any
+    number of strategy processes read them without requests or parsing.
+
+    with MarketDataPublisher(['del_usdt', 'kick_usdt'], **keys) as publisher:
+        publisher.start()
+        ...
+
+    Mode POLL refreshes all books every interval with one KickexMarkets,
+    mode STREAM keeps OrderBookStream per market and publishes every frame.
+    """
+
+    def __init__(
+            self,
+            markets: Iterable[str],
+            prefix: str = 'kickex_books',
+            mode: str = POLL,
+            interval: float = 0.5,
+            slots: int = 8,
+            max_levels: int = 100,
+            base_uri: Optional[str] = None,
+            ws_uri: Optional[str] = None,
+            **kwargs,
+    ) -> None:
+        """
+        :param prefix: string. shared memory names are {prefix}_{market}
+        :param mode: POLL or STREAM
+        :param interval: float. seconds between polls
+        :param slots: int. books kept in every ring
+        :param max_levels: int. levels kept on each side
+        :param base_uri: string. rest api root instead of Kickex.BASE_URI,
+            ex. MockKickex.base_uri
+        :param ws_uri: string. websocket instead of OrderBookStream.WS_URI
+        :param kwargs: Kickex arguments except market, ex. api keys
+        """
+        if mode not in (POLL, STREAM):
+            raise ValueError(f'unknown mode {mode!r}')
+        self.markets = list(markets)
+        self.mode = mode
+        self.interval = interval
+        self.base_uri = base_uri
+        self.ws_uri = ws_uri
+        self.kwargs = kwargs
+        self.rings: Dict[str, BookRing] = {
+            market: BookRing.create(ring_name(prefix, market), slots, max_levels)
+            for market in self.markets
+        }
+        self._stop = multiprocessing.Event()
+        self._process: Optional[multiprocessing.Process] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """
+        Fetch books in child process.
+        """
+        self._stop.clear()
+        self._process = multiprocessing.Process(target=self.main, daemon=True)
+        self._process.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._process is not None:
+            self._process.join()
+            self._process = None
+
+    def close(self) -> None:
+        """
+        Stop and remove shared memory, readers get no new books after it.
+        """
+        self.stop()
+        for ring in self.rings.values():
+            ring.close()
+
+    def main(self) -> None:
+        if self.mode == STREAM:
+            asyncio.run(self.run_streams())
+        else:
+            self.run()
+
+    def publish(self, market: str, levels: dict) -> bool:
+        """
+        Errors are logged, not raised, so one bad book doesn't stop
+        publishing of the others.
+
+        :param levels: Kickex.get_order_book result, ex. from own feed
+        :return: True if book was written
+        """
+        try:
+            self.rings[market].write(levels)
+        except Exception:  # readers see the book aging
+            logger.exception('order book of %s is not published', market)
+            return False
+        return True
+
+    def run(self) -> None:
+        """
+        Poll books until stop is called.
+        """
+        from multi_market import KickexMarkets
+
+        with KickexMarkets(self.markets, **self.kwargs) as markets:
+            if self.base_uri is not None:
+                for market in markets:
+                    markets[market].BASE_URI = self.base_uri
+            while not self._stop.is_set():
+                for market, result in markets.get_order_books().items():
+                    if result['ok']:  # on error readers see the book aging
+                        self.publish(market, result['result'])
+                self._stop.wait(self.interval)
+
+    async def run_streams(self) -> None:
+        """
+        Keep websocket stream of every market until stop is called,
+        reconnecting closed ones.
+        """
+        from async_kickex_api import AsyncKickex
+        from kickex_stream import OrderBookStream
+
+        def publish(stream: OrderBookStream) -> None:
+            self.publish(stream.client.market, stream.get_order_book()['result'])
+
+        async def keep(stream: OrderBookStream) -> None:
+            while not self._stop.is_set():
+                try:
+                    await stream.run()
+                except Exception:
+                    pass  # reconnect, readers see the book aging meanwhile
+                await asyncio.sleep(self.interval)
+
+        async with AsyncKickex(self.markets[0], **self.kwargs) as client:
+            if self.base_uri is not None:
+                client.BASE_URI = self.base_uri
+            await client.get_session()  # before copies, so they share it
+            streams = [
+                OrderBookStream(client.for_market(market), ws_uri=self.ws_uri, on_update=publish)
+                for market in self.markets
+            ]
+            tasks = [asyncio.create_task(keep(stream)) for stream in streams]
+            while not self._stop.is_set():
+                await asyncio.sleep(0.1)
+            for stream in streams:
+                await stream.stop()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for stream in streams:  # copies share the session, closing twice is fine
+                await stream.client.close()
+
+
+class SharedOrderBooks:
+    """
+    Reader of books published by MarketDataPublisher, get_order_book
+    has the same results as Kickex.get_order_book.
+
+    books = SharedOrderBooks('del_usdt')
+    books.get_order_book()['result']['asks'][0]  # ('1.001000', '2')
+
+    Prices and amounts are the same numbers the exchange sent, strings
+    of one side may get trailing zeros to the same number of decimals.
+    """
+
+    def __init__(
+            self,
+            market: str = "eth_usdt",
+            prefix: str = 'kickex_books',
+            max_age: Optional[float] = 5.0,
+            numeric: str = FLOAT,
+    ) -> None:
+        """
+        :param max_age: float. seconds after which book is stale and
+            get_order_book fails, ex. when publisher died. None to disable
+        :param numeric: 'float' gives strings like Kickex, 'fixed' gives Fixed
+        """
+        if numeric not in (FLOAT, FIXED):
+            raise ValueError(f'unknown numeric mode {numeric!r}')
+        self.market = market
+        self.currency_1, self.currency_2 = [s.upper() for s in market.split('_')]
+        self.pair_name = f'{self.currency_1}/{self.currency_2}'
+        self.max_age = max_age
+        self.numeric = numeric
+        self.ring = BookRing.attach(ring_name(prefix, market))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.ring.close()
+
+    def get_levels(self) -> dict:
+        """
+        Latest book without per level objects. asks and bids are
+        memoryviews of int64 price, amount, price, amount... best level
+        first, scaled by price_decimals and amount_decimals of the book.
+        They are views of a private copy, so stay valid after next reads.
+
+        levels = books.get_levels()['result']
+        levels['asks'][0] / 10 ** levels['price_decimals']  # best ask
+        numpy.frombuffer(levels['asks'], numpy.int64).reshape(-1, 2)  # no copy
+
+        :return: {'ok': True, 'result': {'timestamp', 'price_decimals',
+            'amount_decimals', 'asks', 'bids'}} or error like get_order_book
+        """
+        data = self.ring.read_raw()
+        if data is None:
+            return {'ok': False, 'result': {'message': 'order book is not published yet'}}
+        _, timestamp, n_asks, n_bids, price_decimals, amount_decimals = (
+            SLOT_HEADER.unpack_from(data)
+        )
+        if self.max_age is not None and time.time() - timestamp > self.max_age:
+            return {'ok': False, 'result': {'message': 'order book is stale'}}
+
+        values = memoryview(data)[SLOT_HEADER.size:].cast('q')
+        bids_start = self.ring.max_levels * 2
+        return {
+            'ok': True,
+            'result': {
+                'timestamp': timestamp,
+                'price_decimals': price_decimals,
+                'amount_decimals': amount_decimals,
+                'asks': values[:2 * n_asks],
+                'bids': values[bids_start:bids_start + 2 * n_bids],
+            },
+        }
+
+    def get_order_book(self, as_order_book: bool = False) -> dict:
+        """
+        See Kickex.get_order_book, get_levels is cheaper when numbers
+        are not needed as strings or Fixed.
+        """
+        levels = self.get_levels()
+        if not levels['ok']:
+            return levels
+        levels = levels['result']
+        price_decimals = levels['price_decimals']
+        amount_decimals = levels['amount_decimals']
+        if as_order_book:
+            price_scale = 10 ** price_decimals
+            amount_scale = 10 ** amount_decimals
+            price = lambda v: v / price_scale  # noqa: E731
+            amount = lambda v: v / amount_scale  # noqa: E731
+            result = OrderBook(
+                asks=self.to_levels(levels['asks'], price, amount),
+                bids=self.to_levels(levels['bids'], price, amount),
+            )
+        elif self.numeric == FIXED:
+            price = partial(Fixed, decimals=price_decimals)
+            amount = partial(Fixed, decimals=amount_decimals)
+            result = {
+                'asks': self.to_levels(levels['asks'], price, amount),
+                'bids': self.to_levels(levels['bids'], price, amount),
+            }
+        else:
+            price = partial(format_scaled, decimals=price_decimals)
+            amount = partial(format_scaled, decimals=amount_decimals)
+            result = {
+                'asks': self.to_levels(levels['asks'], price, amount),
+                'bids': self.to_levels(levels['bids'], price, amount),
+            }
+        return {
+            'ok': True,
+            'result': result,
+        }
+
+    @staticmethod
+    def to_levels(values: memoryview, price, amount) -> List[tuple]:
+        return list(zip(map(price, values[::2].tolist()), map(amount, values[1::2].tolist())))
@@ -0,0 +1,69 @@
+import base64
+import hashlib
+import hmac
+from typing import Dict, Optional, Tuple
+
+
+class KickexSigner:
+    """
+    Signing context built once per set of api keys.
+
+    Kickex signature is a chain of HMAC-SHA512 rounds where every round is
+    keyed by the previous digest:
+        HMAC(timestamp, method) -> HMAC(.., path) -> HMAC(.., body) -> HMAC(.., secret)
+    Digests are chained raw instead of base64 round trips, secret and
+    password header are decoded/encoded once, and the first rounds are
+    cached while timestamp (1 second resolution) stays the same.
+
+    One signer is shared by threads of a client and its for_market copies.
+    The cache is (timestamp, {(method, path): digest}) replaced in one
+    assignment, so a thread never reads digests of another second.
+    """
+
+    def __init__(self, pub_key: str, pr_key: str, password: str) -> None:
+        self.pub_key = pub_key
+        self.secret = base64.standard_b64decode(
+            pr_key.replace('-', '+').replace('_', '/')
+        )
+        self.password_header = base64.standard_b64encode(password.encode('latin-1'))
+        self._cache: Tuple[Optional[str], Dict[Tuple[str, str], bytes]] = (None, {})
+
+    def sign(
+            self,
+            timestamp: str,
+            method: str,
+            full_path: str,
+            body_for_signature: str,
+    ) -> str:
+        key = self._prefix(timestamp, method, full_path)
+        key = hmac.new(key, body_for_signature.encode('latin-1'), hashlib.sha512).digest()
+        signature = hmac.new(key, self.secret, hashlib.sha512).digest()
+        return base64.standard_b64encode(signature).decode('latin-1')
+
+    def headers(self, timestamp: str, signature: str) -> dict:
+        return {
+            'Content-Type': 'application/json',
+            'KICK-API-KEY': self.pub_key,
+            'KICK-API-PASS': self.password_header,
+            'KICK-API-TIMESTAMP': timestamp,
+            'KICK-SIGNATURE': signature,
+        }
+
+    def _prefix(self, timestamp: str, method: str, full_path: str) -> bytes:
+        """
+        Digest of timestamp + method + path rounds, cached for current second.
+        """
+        cached_timestamp, prefixes = self._cache
+        if timestamp != cached_timestamp:
+            prefixes = {}
+            self._cache = (timestamp, prefixes)
+        prefix = prefixes.get((method, full_path))
+        if prefix is None:
+            key = hmac.new(
+                timestamp.encode('latin-1'),
+                method.lower().encode('latin-1'),
+                hashlib.sha512,
+            ).digest()
+            prefix = hmac.new(key, full_path.encode('latin-1'), hashlib.sha512).digest()
+            prefixes[(method, full_path)] = prefix
+        return prefix
@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+from aggregated_book import AggregatedOrderBook
+from fixed_point import Fixed
+
+
+class Venue:
+    """
+    Venue adapter answering get_order_book with given levels, an error,
+    an exception, or not before release is set.
+    """
+
+    def __init__(self, asks=(), bids=(), ok=True, raises=None, blocked=False):
+        self.levels = {'asks': list(asks), 'bids': list(bids)}
+        self.ok = ok
+        self.raises = raises
+        self.release = threading.Event()
+        if not blocked:
+            self.release.set()
+        self.calls = 0
+
+    def get_order_book(self):
+        self.calls += 1
+        self.release.wait(5)
+        if self.raises is not None:
+            raise self.raises
+        if not self.ok:
+            return {'ok': False, 'result': {'message': 'maintenance'}}
+        return {'ok': True, 'result': self.levels}
+
+
+@pytest.fixture
+def venues():
+    return {
+        'a': Venue(asks=[('1.01', '2'), ('1.03', '5')], bids=[('0.99', '1')]),
+        'b': Venue(asks=[('1.010', '1.5'), ('1.02', '3')], bids=[('1.00', '4'), ('0.98', '0')]),
+    }
+
+
+def test_merged_levels_and_cost(venues):
+    with AggregatedOrderBook(venues) as book:
+        status = book.refresh()
+        assert all(venue_status['ok'] for venue_status in status.values())
+        assert book.get_order_book()['result'] == {
+            'asks': [
+                ('1.010', '2.0', 'a'), ('1.010', '1.5', 'b'),  # same price: venues in given order
+                ('1.020', '3.0', 'b'), ('1.030', '5.0', 'a'),
+            ],
+            'bids': [('1.000', '4.0', 'b'), ('0.990', '1.0', 'a')],  # zero amount level dropped
+        }
+        assert book.best_bid()['result'] == {'price': '1.000', 'amount': '4.0', 'venue': 'b'}
+
+        cost = book.cost_to_fill('buy', '4')
+        assert cost['ok']
+        assert cost['result']['cost'] == '4.0450'  # 3.5 * 1.01 + 0.5 * 1.02
+        assert cost['result']['worst_price'] == '1.020'
+        assert cost['result']['venues'] == {'a': '2.0', 'b': '2.0'}
+
+        too_much = book.cost_to_fill('sell', '10')
+        assert not too_much['ok']
+        assert too_much['result']['amount'] == '5.0'
+
+
+def test_fixed_numbers(venues):
+    with AggregatedOrderBook(venues, numeric='fixed') as book:
+        book.refresh()
+        assert book.best_ask()['result']['price'] == Fixed.parse('1.01')
+
+
+def test_failed_venue_keeps_previous_book(venues):
+    with AggregatedOrderBook(venues) as book:
+        book.refresh()
+        venues['a'].ok = False
+        venues['b'].raises = ConnectionError('reset')
+        status = book.refresh()
+        assert not status['a']['ok']
+        assert status['a']['result']['message'] == 'maintenance'
+        assert status['a']['result']['age'] >= 0
+        assert not status['b']['ok'] and 'reset' in status['b']['result']['message']
+        assert len(book.get_order_book()['result']['asks']) == 4
+
+
+def test_stale_venue_is_left_out(venues):
+    with AggregatedOrderBook(venues, max_age=0.0) as book:
+        book.refresh()
+        assert book.get_order_book()['result'] == {'asks': [], 'bids': []}
+
+
+def test_slow_venue_times_out_once_in_flight(venues):
+    venues['slow'] = Venue(asks=[('1.00', '1')], blocked=True)
+    with AggregatedOrderBook(venues, timeouts={'slow': 0.05}) as book:
+        status = book.refresh()
+        assert status['slow'] == {'ok': False, 'result': {'message': 'timeout'}}
+        assert book.best_ask()['result']['venue'] == 'a'
+        book.refresh()
+        assert venues['slow'].calls == 1  # not asked again while in flight
+
+        venues['slow'].release.set()
+        book.pending['slow'].result(1)
+        status = book.refresh()
+        assert status['slow']['ok']
+        assert book.best_ask()['result'] == {'price': '1.000', 'amount': '1.0', 'venue': 'slow'}
+
+
+def test_bad_book_is_reported(venues):
+    venues['a'].levels = {'asks': [('not a price', '1')], 'bids': []}
+    with AggregatedOrderBook(venues) as book:
+        status = book.refresh()
+        assert not status['a']['ok']
+        assert status['a']['result']['message'].startswith('bad order book')
+        assert status['b']['ok']
@@ -0,0 +1,69 @@
+from balance_cache import BalanceCache
+
+
+class FakeClock:
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_cache(**kwargs) -> BalanceCache:
+    cache = BalanceCache(clock=FakeClock(), **kwargs)
+    cache.store([
+        {'currencyCode': 'USDT', 'available': '100', 'reserved': '0'},
+        {'currencyCode': 'DEL', 'available': '10', 'reserved': '1'},
+    ])
+    return cache
+
+
+def order(order_id, executed=0.0, status='accepted', **fields):
+    return {
+        'order_id': order_id, 'pair': 'DEL/USDT', 'side': 'buy', 'quantity': 2.0,
+        'price': 1.5, 'executed': executed, 'status': status, **fields,
+    }
+
+
+def test_placed_and_cancelled_orders_move_volume():
+    cache = make_cache()
+    cache.on_order_placed(order(1))
+    cache.on_order_placed(order(2, side='sell'))
+    assert cache.get() == [
+        {'currencyCode': 'USDT', 'available': '97.00', 'reserved': '3.00'},
+        {'currencyCode': 'DEL', 'available': '8.0', 'reserved': '3.0'},
+    ]
+    cache.on_order_cancelled('1')
+    assert cache.get()[0] == {'currencyCode': 'USDT', 'available': '100.00', 'reserved': '0.00'}
+
+
+def test_order_without_pair_uses_client_pair():
+    cache = make_cache()
+    cache.on_order_placed(order(1, pair=None), 'DEL/USDT')
+    assert cache.get()[0]['reserved'] == '3.00'
+
+
+def test_unreadable_order_drops_cache_instead_of_raising():
+    cache = make_cache()
+    cache.on_order_placed(order(1, pair=None))
+    assert cache.get() is None
+    cache = make_cache()
+    cache.on_order_placed({'order_id': 1, 'pair': 'DEL/USDT', 'side': 'buy'})
+    assert cache.get() is None
+
+
+def test_fill_drops_cache():
+    cache = make_cache()
+    cache.on_orders([order(1)])
+    assert cache.get() is not None
+    cache.on_orders([order(1, executed=0.5)])
+    assert cache.get() is None
+
+
+def test_executed_amounts_are_bounded():
+    cache = make_cache(max_orders=3)
+    cache.on_orders([order(i, executed=1.0) for i in range(5)])
+    assert list(cache._executed) == [2, 3, 4]
+    cache.on_orders([order(3, executed=2.0, status='executed')])
+    assert list(cache._executed) == [2, 4]  # finished orders are forgotten
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+from async_kickex_api import AsyncKickex
+from base_api import UNKNOWN_OUTCOME
+from kickex_api import Kickex
+from mock_exchange import MockKickex
+
+ORDERS = [
+    {'side': 'sell', 'amount': '2', 'price': '1.5', 'order_type': 'limit'},
+    {'side': 'buy', 'amount': '0.001', 'price': '1', 'order_type': 'limit'},  # under lot size
+    {'side': 'buy', 'amount': '3', 'price': '0.5', 'order_type': 'limit'},
+]
+
+
+@pytest.fixture
+def mock(keys):
+    with MockKickex(**keys) as mock:
+        yield mock
+
+
+def check_placed(mock, results):
+    assert [result['ok'] for result in results] == [True, False, True]
+    assert results[1]['result'] == MockKickex.ERROR_INVALID_ORDER
+    assert [results[i]['result']['quantity'] for i in (0, 2)] == [2.0, 3.0]
+    assert sorted(mock.orders) == sorted(results[i]['result']['order_id'] for i in (0, 2))
+
+
+def test_place_and_cancel_orders(mock, keys):
+    with Kickex('del_usdt', **keys) as client:
+        client.BASE_URI = mock.base_uri
+        results = client.place_orders(ORDERS, max_in_flight=2)
+        check_placed(mock, results)
+
+        order_ids = [str(results[0]['result']['order_id']), '12345']
+        cancelled = client.cancel_orders(order_ids)
+        assert [result['ok'] for result in cancelled] == [True, False]
+        assert cancelled[1]['result'] == MockKickex.ERROR_NOT_FOUND
+        assert mock.orders[int(order_ids[0])]['state'] == 7
+        assert client.place_orders([]) == []
+
+
+def test_cancel_all_cancels_only_market_orders(mock, keys):
+    with Kickex('del_usdt', **keys) as client:
+        client.BASE_URI = mock.base_uri
+        client.place_orders(ORDERS)
+        eth = client.for_market('eth_usdt')
+        eth_order = eth.place_order('buy', '0.01', '1500', 'limit')['result']['order_id']
+
+        results = client.cancel_all()
+        assert [result['ok'] for result in results] == [True, True]
+        assert [order['state'] for order in mock.orders.values()].count(7) == 2
+        assert mock.orders[eth_order]['state'] == 4
+
+        mock.error_rate = 1.0
+        assert client.cancel_all() == [{'ok': False, 'result': MockKickex.ERROR_RANDOM}]
+
+
+def test_timeout_is_unknown_outcome_not_rejection(mock, keys):
+    mock.latency = 0.3
+    with Kickex('del_usdt', timeout=0.1, **keys) as client:
+        client.BASE_URI = mock.base_uri
+        results = client.place_orders(ORDERS[:1])
+    assert not results[0]['ok']
+    assert results[0]['result']['code'] == UNKNOWN_OUTCOME
+    assert 'Timeout' in results[0]['result']['message']
+    time.sleep(0.4)
+    # the order was placed after all
+    assert [order['orderedVolume'] for order in mock.orders.values()] == ['2']
+
+
+def test_async_batches(mock, keys):
+    async def main():
+        async with AsyncKickex('del_usdt', **keys) as client:
+            client.BASE_URI = mock.base_uri
+            results = await client.place_orders(ORDERS, max_in_flight=2)
+            check_placed(mock, results)
+            cancelled = await client.cancel_all()
+            assert [result['ok'] for result in cancelled] == [True, True]
+
+            mock.latency = 0.3
+            client.timeout = 0.1
+            await client.close()  # next session takes the short timeout
+            results = await client.place_orders(ORDERS[:1])
+            assert results[0]['result']['code'] == UNKNOWN_OUTCOME
+
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+import pytest
+
+from book_archive import BookArchive, BookArchiveWriter
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'books.kxa')
+    books = [
+        {'asks': [(f'1.{i:03d}', '2'), ('1.5', '0.25')], 'bids': [('0.9', str(i))]}
+        for i in range(25)
+    ]
+    with BookArchiveWriter(path, block_size=10) as writer:
+        for i, levels in enumerate(books):
+            writer.append(levels, timestamp=1700000000 + i)
+    with BookArchive(path) as archive:
+        assert len(archive) == 25
+        assert len(archive.index) == 3
+        assert archive.seek(1700000012.5) == (1700000012, {
+            'asks': [('1.012', '2.00'), ('1.500', '0.25')], 'bids': [('0.900', '12.00')],
+        })
+        assert [timestamp for timestamp, _ in archive.iter_books(1700000003, 1700000006)] == [
+            1700000003, 1700000004, 1700000005,
+        ]
+
+
+def test_numbers_not_fitting_common_decimals(tmp_path):
+    path = str(tmp_path / 'books.kxa')
+    writer = BookArchiveWriter(path)
+    writer.append({
+        'asks': [('0.00001234', '250000000000.0'), ('0.00001235', '1.1')],
+        'bids': [('0.00001233', '5')],
+    }, timestamp=1)
+    writer.append({'asks': [('1.5', '1.123456789')], 'bids': []}, timestamp=2)
+    with pytest.raises(ValueError):
+        writer.append({'asks': [('1', '10000000000000000000')], 'bids': []}, timestamp=3)
+    writer.append({'asks': [('1.6', '2')], 'bids': []}, timestamp=4)
+    writer.flush()
+    assert writer.pending == []
+    assert len(writer.index) == 2
+    writer.close()
+
+    with BookArchive(path) as archive:
+        books = list(archive.iter_books())
+    assert books == [
+        (1, {
+            'asks': [('0.00001234', '250000000000.0'), ('0.00001235', '1.1')],
+            'bids': [('0.00001233', '5.0')],
+        }),
+        (2, {'asks': [('1.5', '1.123456789')], 'bids': []}),
+        (4, {'asks': [('1.6', '2.000000000')], 'bids': []}),
+    ]
+
+
+def test_reopened_archive_is_continued(tmp_path):
+    path = str(tmp_path / 'books.kxa')
+    with BookArchiveWriter(path, block_size=2) as writer:
+        for i in range(3):
+            writer.append({'asks': [('1.5', str(i))], 'bids': []}, timestamp=i)
+    # not closed, like after a crash
+    writer = BookArchiveWriter(path, block_size=2)
+    writer.append({'asks': [('1.5', '3')], 'bids': []}, timestamp=3)
+    writer.flush()
+    with pytest.raises(ValueError):
+        writer.append({'asks': [], 'bids': []}, timestamp=2)
+    writer.file.close()
+
+    with BookArchiveWriter(path) as writer:
+        writer.append({'asks': [], 'bids': [('0.5', '1')]}, timestamp=4)
+
+    with BookArchive(path) as archive:
+        assert len(archive) == 5
+        assert [levels for _, levels in archive.iter_books()] == [
+            {'asks': [('1.5', '0')], 'bids': []},
+            {'asks': [('1.5', '1')], 'bids': []},
+            {'asks': [('1.5', '2')], 'bids': []},
+            {'asks': [('1.5', '3')], 'bids': []},
+            {'asks': [], 'bids': [('0.5', '1')]},
+        ]
+
+
+def test_column_scans(tmp_path):
+    path = str(tmp_path / 'books.kxa')
+    with BookArchiveWriter(path, block_size=3) as writer:
+        for i in range(5):
+            writer.append({'asks': [('1.0', '1'), ('1.1', str(i))], 'bids': [('0.9', '2')]}, timestamp=i)
+    with BookArchive(path) as archive:
+        blocks = list(archive.iter_blocks(1, 4))
+        assert [block[0] for block in blocks] == [[1000000, 2000000], [3000000]]
+        assert blocks[0][1:] == (
+            [0, 2, 4], [0, 1, 2], [10, 11, 10, 11], [1, 1, 1, 2], [9, 9], [2, 2], 1, 0,
+        )
+        assert list(archive.iter_raw(4)) == [(4, [10, 11], [1, 4], [9], [2], 1, 0)]
@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+
+import dotenv
+import pytest
+
+import config
+from base_api import EmptyKeysException
+from kickex_api import Kickex
+
+ENV_NAMES = [
+    f'{key_set}_{name}'
+    for key_set in ('KICKEX', 'KICKEX_MM')
+    for name in ('PUB_KEY', 'PR_KEY', 'PASSWORD')
+]
+
+
+@pytest.fixture
+def env(monkeypatch):
+    """
+    Clean key variables, .env loads counted instead of read.
+    """
+    for name in ENV_NAMES:
+        monkeypatch.delenv(name, raising=False)
+    loads = []
+    monkeypatch.setattr(config, '_dotenv_loaded', False)
+    monkeypatch.setattr(dotenv, 'load_dotenv', lambda *args, **kwargs: loads.append(1))
+    return loads
+
+
+def test_import_reads_nothing():
+    code = 'import sys, config; assert "dotenv" not in sys.modules; assert not config._dotenv_loaded'
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=os.path.dirname(config.__file__))
+
+
+def test_explicit_keys_skip_env(env):
+    assert config.get_credentials('pub', 'pr', 'pass') == ('pub', 'pr', 'pass')
+    assert env == []
+
+
+def test_env_is_loaded_once_and_key_sets_differ(env, monkeypatch):
+    monkeypatch.setenv('KICKEX_PUB_KEY', 'default-pub')
+    monkeypatch.setenv('KICKEX_MM_PUB_KEY', 'mm-pub')
+    monkeypatch.setenv('KICKEX_MM_PR_KEY', 'mm-pr')
+    monkeypatch.setenv('KICKEX_MM_PASSWORD', 'mm-pass')
+    assert config.get_credentials() == ('default-pub', None, None)
+    assert config.get_credentials(key_set='KICKEX_MM') == ('mm-pub', 'mm-pr', 'mm-pass')
+    assert config.get_credentials(pr_key='own', key_set='KICKEX_MM') == ('mm-pub', 'own', 'mm-pass')
+    assert env == [1]
+
+
+def test_module_attributes_are_resolved_on_access(env, monkeypatch):
+    monkeypatch.setenv('KICKEX_PUB_KEY', 'pub')
+    assert config.KICKEX_PUB_KEY == 'pub'
+    assert config.KICKEX_PASSWORD is None
+    with pytest.raises(AttributeError):
+        config.KICKEX_TOKEN
+
+
+def test_missing_keys_are_reported(env, monkeypatch):
+    monkeypatch.setenv('KICKEX_MM_PUB_KEY', 'mm-pub')
+    with pytest.raises(EmptyKeysException, match='KICKEX_MM_PR_KEY'):
+        Kickex('del_usdt', key_set='KICKEX_MM')
+    with pytest.raises(EmptyKeysException, match='KICKEX_PUB_KEY'):
+        Kickex('del_usdt')
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from async_kickex_api import AsyncKickex
+from kickex_api import Kickex
+from mock_exchange import MockKickex
+
+
+@pytest.fixture
+def mock(keys):
+    """
+    MockKickex counting accepted TCP connections.
+    """
+    mock = MockKickex(**keys)
+    mock.connections = 0
+    get_request = mock.server.get_request
+
+    def counting_get_request():
+        mock.connections += 1
+        return get_request()
+
+    mock.server.get_request = counting_get_request
+    with mock:
+        yield mock
+
+
+def test_sequential_calls_share_one_connection(mock, keys):
+    with Kickex('del_usdt', **keys) as client:
+        client.BASE_URI = mock.base_uri
+        for _ in range(10):
+            assert client.get_order_book()['ok']
+            assert client.check_accounts_state()['ok']
+    assert mock.requests == 20
+    assert mock.connections == 1
+
+
+def test_for_market_copies_share_connection(mock, keys):
+    with Kickex('del_usdt', **keys) as client:
+        client.BASE_URI = mock.base_uri
+        for market in ('del_usdt', 'kick_usdt', 'eth_usdt'):
+            assert client.for_market(market).get_order_book()['ok']
+    assert mock.connections == 1
+
+
+def test_async_calls_share_one_connection(mock, keys):
+    async def main():
+        async with AsyncKickex('del_usdt', **keys) as client:
+            client.BASE_URI = mock.base_uri
+            for _ in range(10):
+                assert (await client.get_order_book())['ok']
+
+    asyncio.run(main())
+    assert mock.requests == 10
+    assert mock.connections == 1
+
+
+def test_get_is_retried_post_is_not(mock, keys):
+    mock.error_rate = 1.0
+    with Kickex('del_usdt', retries=2, backoff_factor=0, **keys) as client:
+        client.BASE_URI = mock.base_uri
+        client.get_order_book()
+        assert mock.requests == 3
+        client.place_order('sell', '1', '1', 'limit')
+        assert mock.requests == 4
@@ -0,0 +1,70 @@
+import sys
+
+import pytest
+
+from decoders import DECODERS, JSONDecoder, MsgspecDecoder, OrjsonDecoder, get_decoder
+from kickex_api import Kickex
+from mock_exchange import MockKickex
+
+
+def installed_decoders():
+    names = []
+    for name, decoder in DECODERS.items():
+        try:
+            decoder()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def test_decoders_give_identical_results(keys):
+    results = {}
+    with MockKickex(**keys) as mock:
+        for name in installed_decoders():
+            with Kickex('del_usdt', decoder=name, backoff_factor=0, **keys) as client:
+                client.BASE_URI = mock.base_uri
+                mock.error_rate = 0.0
+                results[name] = [
+                    client.get_order_book(),
+                    client.get_order_book(as_order_book=True)['result'].to_dict(),
+                    client.check_accounts_state(),
+                    client.get_orders_history(),
+                ]
+                mock.error_rate = 1.0
+                results[name].append(client.get_order_book())  # error answer
+    assert results['json'][0]['ok'] and len(results['json'][0]['result']['asks']) == 50
+    assert results['json'][-1] == {'ok': False, 'result': MockKickex.ERROR_RANDOM}
+    for name, result in results.items():
+        assert result == results['json'], name
+
+
+def test_decode_order_book_returns_none_for_other_answers():
+    for name in installed_decoders():
+        decoder = get_decoder(name)
+        assert decoder.loads(b'{"a": [1, "2"]}') == {'a': [1, '2']}
+        assert decoder.decode_order_book(b'{"code": 5001, "message": "x"}') is None
+
+
+def test_auto_prefers_fastest_installed(monkeypatch):
+    pytest.importorskip('msgspec')
+    assert isinstance(get_decoder('auto'), MsgspecDecoder)
+
+
+def test_auto_falls_back_when_libraries_are_missing(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'msgspec', None)  # import raises ImportError
+    decoder = get_decoder('auto')
+    if 'orjson' in installed_decoders():
+        assert type(decoder) is OrjsonDecoder
+    monkeypatch.setitem(sys.modules, 'orjson', None)
+    assert type(get_decoder('auto')) is JSONDecoder
+    with pytest.raises(ImportError):
+        get_decoder('orjson')
+
+
+def test_get_decoder_names_and_instances():
+    decoder = JSONDecoder()
+    assert get_decoder(decoder) is decoder
+    assert type(get_decoder()) is JSONDecoder
+    with pytest.raises(ValueError):
+        get_decoder('simdjson')
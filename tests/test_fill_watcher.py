@@ -0,0 +1,117 @@
+import threading
+
+from fill_watcher import FillWatcher
+
+
+class FakeClock:
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Client:
+    """
+    get_order_state answers from states, optionally after release is set.
+    """
+
+    def __init__(self) -> None:
+        self.states = {}
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def get_order_state(self, order_id):
+        self.entered.set()
+        assert self.release.wait(5)
+        return {'ok': True, 'result': dict(self.states[int(order_id)])}
+
+    def get_user_orders(self, status):
+        orders = [dict(order) for order in self.states.values() if order['status'] == 'accepted']
+        return {'ok': True, 'result': {'count': len(orders), 'orders': orders}}
+
+    def get_order_book(self):
+        return {'ok': True, 'result': {'asks': [('1.01', '1')], 'bids': [('0.99', '1')]}}
+
+
+def order(order_id, executed=0.0, status='accepted', price=0.99):
+    return {
+        'order_id': order_id, 'side': 'buy', 'price': price,
+        'executed': executed, 'status': status,
+    }
+
+
+def test_fills_and_changes_are_reported():
+    client, clock = Client(), FakeClock()
+    fills, changes = [], []
+    watcher = FillWatcher(
+        client, clock=clock, coalesce=0,
+        on_fill=lambda previous, new: fills.append((previous['executed'], new['executed'])),
+        on_change=lambda previous, new: changes.append((previous['status'], new['status'])),
+    )
+    client.states[1] = order(1)
+    watcher.watch(order(1))
+    assert watcher.poll() == 0.5  # not due yet
+
+    clock.now += 0.5
+    client.states[1] = order(1, executed=0.5)
+    watcher.poll()
+    clock.now += 0.5
+    client.states[1] = order(1, executed=1.0, status='executed')
+    watcher.poll()
+    assert fills == [(0.0, 0.5), (0.5, 1.0)]
+    assert changes == [('accepted', 'executed')]
+    assert watcher.watched() == []
+    assert watcher.metrics()['requests'] == 3  # 2 order states, 1 book
+
+
+def test_far_order_is_checked_less_often():
+    client, clock = Client(), FakeClock()
+    watcher = FillWatcher(client, clock=clock, coalesce=0)
+    client.states[1] = order(1, price=0.9)  # 9% below best bid
+    watcher.watch(order(1, price=0.9))
+    clock.now += 0.5
+    assert watcher.poll() == 10.0
+
+
+def test_lock_is_not_held_during_requests_and_callbacks():
+    client, clock = Client(), FakeClock()
+    seen = []
+
+    def on_fill(previous, new):
+        seen.append(len(watcher.watched()))  # would deadlock from another thread
+        watcher.watch(order(2))
+
+    watcher = FillWatcher(client, clock=clock, coalesce=0, on_fill=on_fill)
+    client.states[1] = order(1, executed=0.5)
+    client.states[2] = order(2)
+    watcher.watch(order(1))
+    clock.now += 0.5
+    client.release.clear()
+    poll = threading.Thread(target=watcher.poll, daemon=True)
+    poll.start()
+    assert client.entered.wait(5)
+
+    other = threading.Thread(target=lambda: seen.append(watcher.watched()), daemon=True)
+    other.start()
+    other.join(1)
+    assert not other.is_alive()  # watched answered while request is in flight
+    client.release.set()
+    poll.join(5)
+    assert seen == [[order(1)], 1]
+    assert [o['order_id'] for o in watcher.watched()] == [1, 2]
+
+
+def test_coalesced_check():
+    client, clock = Client(), FakeClock()
+    watcher = FillWatcher(client, clock=clock, coalesce=2)
+    for order_id in (1, 2, 3):
+        client.states[order_id] = order(order_id)
+        watcher.watch(order(order_id))
+    client.states[3] = order(3, executed=1.0, status='executed')
+    clock.now += 0.5
+    watcher.poll()
+    assert watcher.metrics()['requests'] == 3  # book, active orders, final state of 3
+    assert [o['order_id'] for o in watcher.watched()] == [1, 2]
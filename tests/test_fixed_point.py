@@ -0,0 +1,108 @@
+from decimal import Decimal
+
+import pytest
+
+from fixed_point import DOWN, HALF_UP, UP, Fixed, notional, parse_column, to_fixed_levels
+
+
+@pytest.mark.parametrize('number, decimals, expected', [
+    ('0.0465', 6, (46500, 6)),
+    ('0.0465', None, (465, 4)),
+    ('12', 2, (1200, 2)),
+    ('-1.25', 1, (-13, 1)),
+    ('1.249', 2, (125, 2)),
+    ('.5', 2, (50, 2)),
+    ('-.5', None, (-5, 1)),
+    ('1e-3', None, (1, 3)),
+    ('1.5E3', 2, (150000, 2)),
+    (0.1, None, (1, 1)),
+    (1e-7, 8, (10, 8)),
+    (7, 3, (7000, 3)),
+    (Decimal('2.50'), None, (250, 2)),
+    (Fixed(25, 1), 3, (2500, 3)),
+])
+def test_parse(number, decimals, expected):
+    fixed = Fixed.parse(number, decimals)
+    assert (fixed.value, fixed.decimals) == expected
+
+
+def test_parse_rejects_garbage():
+    with pytest.raises(Exception):
+        Fixed.parse('1.2.3', 2)
+
+
+def test_str_and_conversions():
+    assert str(Fixed.parse('0.0465', 6)) == '0.046500'
+    assert str(Fixed(-5, 3)) == '-0.005'
+    assert str(Fixed(42, 0)) == '42'
+    assert float(Fixed(-125, 2)) == -1.25
+    assert int(Fixed(-199, 2)) == -1
+    assert Fixed(1234, 3).to_decimal() == Decimal('1.234')
+
+
+def test_rescale_rounds_half_up():
+    assert Fixed(12345, 4).rescale(2) == Fixed(123, 2)
+    assert Fixed(12350, 4).rescale(2).value == 124
+    assert Fixed(-12350, 4).rescale(2).value == -124
+    assert Fixed(5, 1).rescale(3).value == 500
+
+
+@pytest.mark.parametrize('rounding, expected', [(DOWN, '1.20'), (UP, '1.25'), (HALF_UP, '1.25')])
+def test_quantize(rounding, expected):
+    assert str(Fixed.parse('1.23').quantize(Fixed.parse('0.05'), rounding)) == expected
+    assert str(Fixed.parse('-1.23').quantize(Fixed.parse('0.05'), rounding)) == '-' + expected
+
+
+def test_quantize_half_up_goes_down_below_half():
+    assert str(Fixed.parse('1.22').quantize(Fixed.parse('0.05'))) == '1.20'
+    assert str(Fixed.parse('0.000123456').quantize(Fixed(1, 6))) == '0.000123'
+
+
+def test_operators():
+    a, b = Fixed.parse('1.5'), Fixed.parse('0.25')
+    assert a + b == Fixed(175, 2) and (a + b).decimals == 2
+    assert a - b == Fixed.parse('1.25')
+    assert b - a == Fixed.parse('-1.25')
+    assert a * b == Fixed(375, 3) and (a * b).decimals == 3
+    assert a + 1 == 1 + a == Fixed.parse('2.5')
+    assert 3 - a == Fixed.parse('1.5')
+    assert a * 2 == 2 * a == 3
+    assert -a == Fixed(-15, 1) and abs(-a) == a
+    assert a.divide(b, 2) == 6 and Fixed.parse('1').divide(3, 4) == Fixed(3333, 4)
+    assert Fixed.parse('-2').divide(3, 2) == Fixed(-67, 2)
+    assert b < a <= Fixed.parse('1.50') and a > b >= Fixed(25, 2)
+    assert Fixed.parse('1.50') == Fixed.parse('1.5')
+    assert hash(Fixed.parse('1.50')) == hash(Fixed.parse('1.5'))
+    assert not Fixed(0, 3) and Fixed(1, 3)
+    assert (a == 'x') is False
+
+
+@pytest.mark.parametrize('numbers, decimals, expected', [
+    (['1.50', '2.25', '-.75'], None, ([150, 225, -75], 2)),
+    (['1.5', '2.25'], None, ([150, 225], 2)),  # largest decimals, not the first
+    (['3', '4'], None, ([3, 4], 0)),
+    (['1', '2'], 3, ([1000, 2000], 3)),
+    (['1.500', '2.505'], 2, ([150, 251], 2)),
+    (['1e3', '2.0'], None, ([10000, 20], 1)),
+    ([1.5, Fixed(2, 0)], None, ([15, 20], 1)),
+    ([], None, ([], 0)),
+])
+def test_parse_column(numbers, decimals, expected):
+    assert parse_column(numbers, decimals) == expected
+
+
+def test_fixed_levels_share_scales():
+    levels = to_fixed_levels([('1.0', '2'), ('1.25', '0.5')])
+    assert [(price.decimals, amount.decimals) for price, amount in levels] == [(2, 1), (2, 1)]
+    assert levels == [(Fixed.parse('1'), Fixed.parse('2')), (Fixed.parse('1.25'), Fixed.parse('0.5'))]
+    assert [str(price) for price, _ in to_fixed_levels([('1.0', '2')], 6, 3)] == ['1.000000']
+    assert to_fixed_levels([]) == []
+
+
+def test_notional():
+    levels = to_fixed_levels([('1.0', '2'), ('1.25', '0.5')])
+    assert notional(levels) == Fixed.parse('2.625')
+    assert notional([]) == 0
+    # levels parsed one by one keep their own scales
+    mixed = [(Fixed.parse('1.0'), Fixed.parse('2')), (Fixed.parse('1.25'), Fixed.parse('0.5'))]
+    assert notional(mixed) == Fixed.parse('2.625')
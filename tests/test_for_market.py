@@ -0,0 +1,17 @@
+import asyncio
+
+from async_kickex_api import AsyncKickex
+
+
+def test_async_copies_share_session(keys):
+    async def main():
+        async with AsyncKickex('del_usdt', **keys) as client:
+            copies = [client.for_market(market) for market in ('kick_usdt', 'eth_usdt')]
+            nested = copies[0].for_market('btc_usdt')
+            session = await copies[1].get_session()  # opened by a copy first
+            assert await client.get_session() is session
+            assert await nested.get_session() is session
+            assert copies[0].pair_name == 'KICK/USDT'
+        assert session.closed
+
+    asyncio.run(main())
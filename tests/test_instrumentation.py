@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from async_kickex_api import AsyncKickex
+from instrumentation import NETWORK, TOTAL, HistogramRecorder
+from kickex_api import Kickex
+from mock_exchange import MockKickex
+
+
+@pytest.fixture
+def mock(keys):
+    with MockKickex(**keys) as mock:
+        yield mock
+
+
+def phases(recorder):
+    return {key: sum(counts) for key, counts in recorder.histograms.items()}
+
+
+def test_nested_endpoint_is_recorded_by_outer_one(mock, keys):
+    recorder = HistogramRecorder()
+    with Kickex('del_usdt', instrumentation=recorder, **keys) as client:
+        client.BASE_URI = mock.base_uri
+        client.get_order_state('404')
+        client.fetch_order('404')
+    recorded = phases(recorder)
+    assert recorded[('get_order_state', TOTAL)] == 1
+    assert recorded[('get_order_state', NETWORK)] == 1
+    assert recorded[('fetch_order', TOTAL)] == 1  # direct call only
+    assert recorded[('fetch_order', NETWORK)] == 1
+    assert dict(recorder.errors) == {('get_order_state', '2002'): 1, ('fetch_order', '2002'): 1}
+
+
+def test_nested_async_endpoint_is_recorded_by_outer_one(mock, keys):
+    recorder = HistogramRecorder()
+
+    async def main():
+        async with AsyncKickex('del_usdt', instrumentation=recorder, **keys) as client:
+            client.BASE_URI = mock.base_uri
+            await client.check_accounts_state()
+
+    asyncio.run(main())
+    recorded = phases(recorder)
+    assert recorded[('check_accounts_state', NETWORK)] == 1
+    assert not any(endpoint == 'fetch_balance' for endpoint, _ in recorded)
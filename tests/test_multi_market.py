@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from mock_exchange import MockKickex
+from multi_market import KickexMarkets
+
+MARKETS = ['del_usdt', 'eth_usdt', 'kick_usdt', 'btc_usdt']
+
+
+@pytest.fixture
+def mock(keys):
+    with MockKickex(**keys) as mock:
+        yield mock
+
+
+@pytest.fixture
+def markets(mock, keys):
+    with KickexMarkets(MARKETS, retries=0, **keys) as markets:
+        markets.client.BASE_URI = mock.base_uri
+        for market in markets:
+            markets[market].BASE_URI = mock.base_uri
+        yield markets
+
+
+def test_markets_share_one_client(markets):
+    assert list(markets) == MARKETS
+    assert markets['eth_usdt'].pair_name == 'ETH/USDT'
+    assert all(markets[market].session is markets.client.session for market in markets)
+    with pytest.raises(Exception):
+        KickexMarkets([])
+
+
+def test_one_balance_request_for_all_markets(mock, markets):
+    mock.balances['DEL'] = {'available': '12.5', 'reserved': '0'}
+    states = markets.check_accounts_state()
+    assert mock.requests == 1
+    assert list(states) == MARKETS
+    assert states['del_usdt']['result']['account_state']['DEL'] == 12.5
+    assert states['eth_usdt']['result']['account_state']['ETH'] == -1
+
+
+def test_order_books_in_parallel(mock, markets):
+    mock.latency = 0.1
+    started = time.monotonic()
+    books = markets.get_order_books()
+    parallel = time.monotonic() - started
+    assert list(books) == MARKETS
+    assert all(len(book['result']['asks']) == mock.book_depth for book in books.values())
+    assert mock.requests == len(MARKETS)
+
+    started = time.monotonic()
+    markets.get_order_books(max_in_flight=1)
+    assert time.monotonic() - started >= 0.1 * len(MARKETS) > parallel
+
+
+def test_failed_books_are_results(mock, markets):
+    mock.error_rate = 1
+    books = markets.get_order_books(as_order_book=True)
+    assert [book['ok'] for book in books.values()] == [False] * len(MARKETS)
+    mock.error_rate = 0
+    book = markets.get_order_books(as_order_book=True)['kick_usdt']['result']
+    assert book.best_ask()[0] == 1.001
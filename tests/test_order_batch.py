@@ -0,0 +1,47 @@
+import math
+
+import pytest
+
+from kickex_parsers import KickexParser
+from mock_exchange import MockKickex
+
+
+def make_orders():
+    orders = [
+        MockKickex.make_order(i, 'DEL/USDT', i % 2, f'{i}.5', '0.0465', state=(4, 5, 7)[i % 3],
+                              created=1657000000 + i)
+        for i in range(1, 31)
+    ]
+    orders[1].update({'executedPrice': '0.0466', 'fee': '0.001', 'orderCid': 'abc', 'expires': 99})
+    orders[2].update({'totalSellVolume': '1.25', 'state': 5})  # partially executed
+    orders[3].update({'limitPrice': None, 'type': 'market', 'stopPrice': '0.04'})
+    del orders[4]['state']
+    del orders[5]['createdTimestamp']
+    del orders[6]['tradeIntent']
+    return orders
+
+
+def test_columns_match_parse_orders():
+    parser = KickexParser('del_usdt')
+    orders = make_orders()
+    batch = parser.parse_orders_columnar(orders)
+    assert len(batch) == len(orders)
+    assert batch.to_dicts() == parser.parse_orders(orders)
+    assert list(batch) == batch.to_dicts()
+    assert batch[2]['status'] == 'partially executed'
+
+
+def test_numeric_columns():
+    batch = KickexParser('del_usdt').parse_orders_columnar(make_orders())
+    assert batch.columns['order_id'].tolist() == list(range(1, 31))
+    assert batch.columns['quantity'][0] == 1.5
+    assert math.isnan(batch.columns['price'][3])
+    assert batch.columns['timestamp'][5] == -1
+
+
+def test_to_numpy():
+    numpy = pytest.importorskip('numpy')
+    batch = KickexParser('del_usdt').parse_orders_columnar(make_orders())
+    records = batch.to_numpy()
+    assert records.order_id.tolist() == list(range(1, 31))
+    assert numpy.array_equal(records.quantity, [float(f'{i}.5') for i in range(1, 31)])
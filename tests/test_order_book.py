@@ -0,0 +1,80 @@
+import pytest
+
+from order_book import BookSide, OrderBook
+
+
+def make_book() -> OrderBook:
+    return OrderBook(
+        asks=[('1.03', '3'), ('1.01', '1'), ('1.02', '2'), ('1.05', '0')],
+        bids=[('0.98', '4'), ('0.99', '5')],
+    )
+
+
+def test_load_sorts_and_drops_empty_levels():
+    book = make_book()
+    assert book.to_dict() == {
+        'asks': [(1.01, 1.0), (1.02, 2.0), (1.03, 3.0)],
+        'bids': [(0.99, 5.0), (0.98, 4.0)],
+    }
+    assert len(book.asks) == 3 and len(book.bids) == 2
+
+
+def test_best_prices_mid_spread():
+    book = make_book()
+    assert book.best_ask() == (1.01, 1.0)
+    assert book.best_bid() == (0.99, 5.0)
+    assert book.mid() == pytest.approx(1.0)
+    assert book.spread() == pytest.approx(0.02)
+    empty = OrderBook(asks=[('1', '1')])
+    assert empty.best_bid() is None and empty.mid() is None and empty.spread() is None
+
+
+def test_update_insert_change_delete():
+    book = make_book()
+    book.update('asks', '1.005', '7')  # new best
+    book.update('asks', '1.02', '9')  # change
+    book.update('asks', '1.03', '0')  # delete
+    book.update('asks', '1.04', 0)  # delete of missing level is nothing
+    book.update('bids', 0.5, 1)  # far end
+    assert book.to_dict() == {
+        'asks': [(1.005, 7.0), (1.01, 1.0), (1.02, 9.0)],
+        'bids': [(0.99, 5.0), (0.98, 4.0), (0.5, 1.0)],
+    }
+    book.update('bids', '0.99', '0')
+    assert book.best_bid() == (0.98, 4.0)
+    with pytest.raises(ValueError):
+        book.update('middle', '1', '1')
+
+
+def test_depth():
+    book = make_book()
+    assert book.depth('asks', '1.02') == 3.0
+    assert book.depth('asks', '1.025') == 3.0
+    assert book.depth('asks', '1.00') == 0.0
+    assert book.depth('asks', 2) == 6.0
+    assert book.depth('bids', '0.98') == 9.0
+    assert book.depth('bids', '0.995') == 0.0
+
+
+def test_vwap_and_slippage():
+    book = make_book()
+    assert book.vwap('buy', '1') == (1.01, 1.0)
+    price, filled = book.vwap('buy', 2)
+    assert (price, filled) == (pytest.approx(1.015), 2.0)
+    price, filled = book.vwap('sell', '100')  # more than the side has
+    assert (price, filled) == (pytest.approx((0.99 * 5 + 0.98 * 4) / 9), 9.0)
+    assert book.slippage('buy', 2) == pytest.approx(0.005 / 1.01)
+    assert book.slippage('sell', 5) == pytest.approx(0.0)
+    assert OrderBook().vwap('buy', 1) == (None, 0.0)
+    assert OrderBook().slippage('buy', 1) is None
+    with pytest.raises(ValueError):
+        book.vwap('hold', 1)
+
+
+def test_book_side_keeps_best_last():
+    side = BookSide(-1)
+    for price in (3.0, 1.0, 2.0):
+        side.update(price, price * 10)
+    assert list(side.keys) == [-3.0, -2.0, -1.0]
+    assert side.best() == (1.0, 10.0)
+    assert side.levels() == [(1.0, 10.0), (2.0, 20.0), (3.0, 30.0)]
@@ -0,0 +1,163 @@
+import asyncio
+
+from aiohttp import web
+
+from async_kickex_api import AsyncKickex
+from kickex_stream import OrderBookStream
+
+
+def levels(*pairs):
+    return [{'price': price, 'amount': amount} for price, amount in pairs]
+
+
+REST_SNAPSHOT = {
+    'asks': levels(('1.03', '3'), ('1.04', '1')),
+    'bids': levels(('0.99', '2')),
+    'lastPrice': {'price': '1', 'pairName': 'DEL/USDT'},
+}
+
+
+async def replay(frames, check, keys, depth_failures=0):
+    """
+    Serve frames to the stream over local websocket after it subscribes,
+    /market/orderbook answers REST_SNAPSHOT after depth_failures broken
+    answers. check(stream, requests, books) runs after the server closes
+    the connection, books are the results seen by on_update.
+    """
+    requests = {'subscribe': [], 'depth': 0}
+
+    async def ws_handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        subscribe = await ws.receive_json()
+        requests['subscribe'].append(subscribe)
+        for frame in frames:
+            await ws.send_json({'id': subscribe['id'], **frame})
+        await ws.close()
+        return ws
+
+    async def depth_handler(request):
+        requests['depth'] += 1
+        assert request.query['pairName'] == 'DEL/USDT'
+        if requests['depth'] <= depth_failures:
+            return web.Response(text='<html>bad gateway</html>')
+        return web.json_response(REST_SNAPSHOT)
+
+    app = web.Application()
+    app.router.add_get('/ws', ws_handler)
+    app.router.add_get('/api/v1/market/orderbook', depth_handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    books = []
+    try:
+        async with AsyncKickex('del_usdt', **keys) as client:
+            client.BASE_URI = f'http://{host}:{port}/api/v1'
+            stream = OrderBookStream(
+                client,
+                ws_uri=f'ws://{host}:{port}/ws',
+                on_update=lambda stream: books.append(stream.get_order_book()['result']),
+            )
+            stream.RESYNC_INTERVAL = 0
+            await asyncio.wait_for(stream.run(), 5)
+            check(stream, requests, books)
+    finally:
+        await runner.cleanup()
+
+
+def test_snapshot_and_updates(keys):
+    frames = [
+        {'seq': 1, 'asks': levels(('1.01', '1'), ('1.02', '2')), 'bids': levels(('0.99', '5'))},
+        {'seq': 2, 'asks': levels(('1.01', '0')), 'bids': levels(('0.98', '1'))},
+        {'seq': 2, 'asks': levels(('1.05', '9'))},  # stale, ignored
+        {'seq': 3, 'bids': levels(('0.99', '4'))},
+    ]
+
+    def check(stream, requests, books):
+        assert requests['subscribe'] == [
+            {'id': '1', 'type': 'getOrderBookAndSubscribe', 'pair': 'DEL/USDT'}
+        ]
+        assert requests['depth'] == 0
+        assert books[1] == {'asks': [('1.02', '2')], 'bids': [('0.99', '5'), ('0.98', '1')]}
+        assert books[-1] == {'asks': [('1.02', '2')], 'bids': [('0.99', '4'), ('0.98', '1')]}
+        assert stream.sequence == 3
+        assert not stream.synced  # connection closed
+        assert stream.resyncs == 0
+
+    asyncio.run(replay(frames, check, keys))
+
+
+def test_gap_resyncs_from_rest(keys):
+    frames = [
+        {'seq': 1, 'asks': levels(('1.01', '1')), 'bids': levels(('0.99', '5'))},
+        {'seq': 2, 'asks': levels(('1.02', '2'))},
+        {'seq': 5, 'asks': levels(('1.00', '7'))},  # 3 and 4 are lost
+        {'seq': 6, 'asks': levels(('1.03', '0'))},
+        {'seq': 7, 'bids': levels(('0.98', '1'))},
+    ]
+
+    def check(stream, requests, books):
+        assert requests['depth'] == 1
+        assert stream.resyncs == 1
+        assert books[1] == {'asks': [('1.01', '1'), ('1.02', '2')], 'bids': [('0.99', '5')]}
+        # frame after the gap is dropped, book comes from REST
+        assert books[2] == {'asks': [('1.03', '3'), ('1.04', '1')], 'bids': [('0.99', '2')]}
+        assert books[-1] == {'asks': [('1.04', '1')], 'bids': [('0.99', '2'), ('0.98', '1')]}
+        assert stream.sequence == 7
+
+    asyncio.run(replay(frames, check, keys))
+
+
+def test_error_frame_unsyncs_book(keys):
+    frames = [
+        {'seq': 1, 'asks': levels(('1.01', '1')), 'bids': []},
+        {'error': {'code': 1001, 'message': 'unknown pair'}},
+    ]
+
+    def check(stream, requests, books):
+        assert len(books) == 1
+        assert stream.get_order_book() == {
+            'ok': False, 'result': {'code': 1001, 'message': 'unknown pair'},
+        }
+
+    asyncio.run(replay(frames, check, keys))
+
+
+def test_changes_after_error_frame_resync_instead_of_replacing_book(keys):
+    frames = [
+        {'seq': 1, 'asks': levels(('1.01', '1')), 'bids': levels(('0.99', '5'))},
+        {'error': {'code': 5001, 'message': 'internal error'}},
+        {'seq': 3, 'asks': levels(('1.02', '2'))},
+        {'seq': 4, 'bids': levels(('0.98', '1'))},
+    ]
+
+    def check(stream, requests, books):
+        assert requests['depth'] == 1
+        assert books[1] == {'asks': [('1.03', '3'), ('1.04', '1')], 'bids': [('0.99', '2')]}
+        assert books[-1] == {
+            'asks': [('1.03', '3'), ('1.04', '1')], 'bids': [('0.99', '2'), ('0.98', '1')],
+        }
+
+    asyncio.run(replay(frames, check, keys))
+
+
+def test_failed_resync_is_retried(keys):
+    frames = [
+        {'seq': 1, 'asks': levels(('1.01', '1')), 'bids': []},
+        {'seq': 3, 'asks': levels(('1.02', '2'))},  # gap, first reload fails
+        {'seq': 4, 'asks': levels(('1.05', '1'))},  # must not become the book
+        {'seq': 5, 'bids': levels(('0.98', '1'))},
+    ]
+
+    def check(stream, requests, books):
+        assert requests['depth'] == 2
+        assert stream.resyncs == 2
+        assert books == [
+            {'asks': [('1.01', '1')], 'bids': []},
+            {'asks': [('1.03', '3'), ('1.04', '1')], 'bids': [('0.99', '2')]},
+            {'asks': [('1.03', '3'), ('1.04', '1')], 'bids': [('0.99', '2'), ('0.98', '1')]},
+        ]
+
+    asyncio.run(replay(frames, check, keys, depth_failures=1))
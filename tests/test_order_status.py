@@ -0,0 +1,45 @@
+import pytest
+
+from kickex_parsers import KickexParser
+
+
+def make_order(state, executed, ordered):
+    return {
+        'orderId': '1',
+        'pairName': 'DEL/USDT',
+        'orderedVolume': ordered,
+        'totalSellVolume': executed,
+        'limitPrice': '1',
+        'tradeIntent': 0,
+        'state': state,
+        'baseDecimals': 18,
+        'quoteDecimals': 6,
+        'createdTimestamp': '1657000000000000000',
+    }
+
+
+@pytest.mark.parametrize('executed, ordered, status', [
+    ('9.5', '10', 'partially executed'),  # '9.5' > '10' as strings
+    ('10', '10', 'executed'),
+    ('10.000', '10', 'executed'),
+    ('0.999999999999999999', '1', 'partially executed'),  # equal as floats
+    ('2', '10', 'partially executed'),
+])
+def test_status_of_finished_order(executed, ordered, status):
+    parser = KickexParser('del_usdt')
+    orders = [make_order(5, executed, ordered)]
+    assert parser.parse_orders(orders)[0]['status'] == status
+    assert parser.parse_orders_columnar(orders)[0]['status'] == status
+
+
+def test_parsers_agree_on_statuses():
+    parser = KickexParser('del_usdt')
+    orders = [
+        make_order(state, executed, ordered)
+        for state in (4, 5, 7)
+        for executed, ordered in (('0', '10'), ('9.5', '10'), ('10', '10'))
+    ]
+    assert (
+        [order['status'] for order in parser.parse_orders(orders)]
+        == [order['status'] for order in parser.parse_orders_columnar(orders)]
+    )
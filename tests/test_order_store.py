@@ -0,0 +1,69 @@
+from order_store import OrderStore
+
+
+class FakeClock:
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def order(order_id, status='accepted'):
+    return {'order_id': order_id, 'pair': 'DEL/USDT', 'status': status, 'executed': 0.0}
+
+
+def test_open_orders_get_stale_final_do_not():
+    clock = FakeClock()
+    store = OrderStore(max_age=5, clock=clock)
+    store.update(order(1))
+    store.update(order(2, 'executed'))
+    assert store.get('1') == order(1)
+    clock.now += 6
+    assert store.get(1) is None
+    assert store.get(2) == order(2, 'executed')
+    assert store.get(3) is None
+    assert store.metrics() == {'orders': 2, 'hits': 2, 'misses': 2, 'hit_ratio': 0.5}
+
+
+def test_seed_forgets_finished_active_orders():
+    store = OrderStore(clock=FakeClock())
+    store.update(order(1))
+    store.update(order(2))
+    store.update(order(3, 'cancelled'))
+    store.seed([order(2)])
+    assert [o['order_id'] for o in store.active()] == [2]
+    assert store.get(1) is None
+    assert store.get(3) == order(3, 'cancelled')
+    store.invalidate(3)
+    assert store.get(3) is None
+
+
+def test_final_orders_expire():
+    clock = FakeClock()
+    store = OrderStore(clock=clock, final_ttl=60)
+    store.update(order(1, 'executed'))
+    clock.now += 30
+    store.update(order(2, 'rejected'))
+    store.update(order(3))
+    clock.now += 31
+    assert store.get(1) is None
+    assert store.get(2) == order(2, 'rejected')
+    clock.now += 30
+    store.update(order(3))  # open orders stay until seed drops them
+    assert store.metrics()['orders'] == 1
+    assert store.get(3) == order(3)
+
+
+def test_oldest_final_orders_are_evicted_over_limit():
+    store = OrderStore(clock=FakeClock(), final_ttl=None, max_final=3)
+    for order_id in range(1, 6):
+        store.update(order(order_id, 'executed'))
+    store.update(order(6))
+    store.update(order(3, 'cancelled'))  # updated again, now the newest
+    assert sorted(store.orders) == [3, 4, 5, 6]
+    for order_id in range(7, 10007):
+        store.update(order(order_id, 'executed'))
+    assert len(store.orders) == 4
+    assert store.get(6) == order(6)
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import parse
+
+import pytest
+
+from async_kickex_api import AsyncKickex
+from base_api import ResponseException
+from history_store import OrderHistoryStore
+from kickex_api import Kickex
+
+BASE_TIMESTAMP = 1657000000 * 10 ** 9
+
+
+class HistoryStub:
+    """
+    /ordersHistory of size orders generated on the fly, newest first.
+    Every two orders share createdTimestamp. Request number fail_on is
+    answered with error.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.requests = 0
+        self.fail_on = None
+        self.states = {}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = parse.urlsplit(self.path)
+                params = dict(parse.parse_qsl(url.query))
+                stub.requests += 1
+                if stub.requests == stub.fail_on:
+                    status, answer = 400, {'code': 5001, 'message': 'Internal error'}
+                elif url.path.endswith('/order'):
+                    status, answer = 200, stub.order(int(params['orderId']))
+                else:
+                    status, answer = 200, stub.page(int(params.get('offset', 0)), int(params['limit']))
+                body = json.dumps(answer).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def base_uri(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/api/v1'
+
+    def order(self, order_id: int) -> dict:
+        return {
+            'orderId': str(order_id),
+            'pairName': 'DEL/USDT',
+            'orderedVolume': '1',
+            'totalSellVolume': '1',
+            'limitPrice': '0.05',
+            'tradeIntent': order_id % 2,
+            'state': self.states.get(order_id, 5),
+            'createdTimestamp': str(BASE_TIMESTAMP + order_id // 2),
+        }
+
+    def page(self, offset: int, limit: int) -> list:
+        newest = self.size - offset
+        return [self.order(order_id) for order_id in range(newest, max(0, newest - limit), -1)]
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    stub = HistoryStub(0)
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def client(stub, keys):
+    client = Kickex('del_usdt', retries=0, **keys)
+    client.BASE_URI = stub.base_uri
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = OrderHistoryStore(str(tmp_path / 'history.sqlite3'))
+    yield store
+    store.close()
+
+
+def test_sync_one_million_orders(stub, client, store):
+    stub.size = 1_000_000
+    assert client.sync_orders_history(store, page_size=10_000) == 1_000_000
+    assert store.count('DEL/USDT') == 1_000_000
+    assert stub.requests == 101  # last page is empty
+
+    stub.size += 1500
+    stub.requests = 0
+    # new orders and order 1_000_000 sharing the mark timestamp
+    assert client.sync_orders_history(store, page_size=10_000) == 1501
+    assert stub.requests == 1
+    assert store.count('DEL/USDT') == 1_001_500
+
+
+def test_interrupted_sync_is_resumed(stub, client, store):
+    stub.size = 2000
+    stub.fail_on = 2
+    with pytest.raises(ResponseException):
+        client.sync_orders_history(store, page_size=500)
+    assert store.count() == 500
+    assert store.synced_mark('DEL/USDT') is None
+
+    stub.fail_on = None
+    client.sync_orders_history(store, page_size=500)
+    assert store.count() == 2000
+    assert store.synced_mark('DEL/USDT') == BASE_TIMESTAMP + 1000
+
+
+def test_async_interrupted_sync_is_resumed(stub, keys, store):
+    async def sync():
+        async with AsyncKickex('del_usdt', retries=0, **keys) as client:
+            client.BASE_URI = stub.base_uri
+            return await client.sync_orders_history(store, page_size=500)
+
+    stub.size = 2000
+    stub.fail_on = 3
+    with pytest.raises(ResponseException):
+        asyncio.run(sync())
+    assert store.count() == 1000
+
+    stub.fail_on = None
+    asyncio.run(sync())
+    assert store.count() == 2000
+    assert store.synced_mark('DEL/USDT') == BASE_TIMESTAMP + 1000
+
+
+def test_orders_sharing_mark_timestamp_are_not_skipped(stub, client, store):
+    stub.size = 10  # orders 10 and 11 share createdTimestamp
+    client.sync_orders_history(store, page_size=4)
+    stub.size = 11
+    client.sync_orders_history(store, page_size=4)
+    assert store.count() == 11
+
+
+def test_orders_finished_after_sync_are_refetched(stub, client, store):
+    stub.size = 20
+    stub.states = {3: 4, 15: 4}  # accepted
+    client.sync_orders_history(store, page_size=8)
+    assert sorted(store.open_order_ids('DEL/USDT')) == [3, 15]
+
+    stub.states = {15: 7}
+    stub.size = 22
+    stub.requests = 0
+    assert client.sync_orders_history(store, page_size=8) == 3 + 2  # new and mark, refetched
+    assert stub.requests == 1 + 2
+    assert store.open_order_ids('DEL/USDT') == []
+    states = {order['orderId']: order['state'] for order in store.iter_orders('DEL/USDT')}
+    assert states['3'] == 5 and states['15'] == 7
+
+
+def test_iter_orders_history_since(stub, client):
+    stub.size = 100
+    orders = list(client.iter_orders_history(page_size=30, since=BASE_TIMESTAMP + 45))
+    assert [int(order['orderId']) for order in orders] == list(range(100, 89, -1))
+
+
+def test_async_orders_finished_after_sync_are_refetched(stub, keys, store):
+    async def sync():
+        async with AsyncKickex('del_usdt', retries=0, **keys) as client:
+            client.BASE_URI = stub.base_uri
+            return await client.sync_orders_history(store, page_size=8)
+
+    stub.size = 20
+    stub.states = {3: 4}
+    asyncio.run(sync())
+    stub.states = {}
+    assert asyncio.run(sync()) == 1 + 1  # mark, refetched
+    assert store.open_order_ids('DEL/USDT') == []
@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+import pytest
+
+from async_kickex_api import AsyncKickex
+from kickex_api import Kickex
+from mock_exchange import MockKickex
+from pair_metadata import PairMetadata
+
+
+@pytest.fixture
+def mock(keys):
+    with MockKickex(**keys) as mock:
+        yield mock
+
+
+def make_client(mock, keys, pairs, cls=Kickex):
+    client = cls('del_usdt', pairs=pairs, **keys)
+    client.BASE_URI = mock.base_uri
+    return client
+
+
+def stale_pairs() -> PairMetadata:
+    pairs = PairMetadata(path=None, ttl=60)
+    pairs.update(MockKickex.PAIRS, updated=time.time() - 120)
+    return pairs
+
+
+def test_first_download_is_waited_for(mock, keys):
+    with make_client(mock, keys, PairMetadata(path=None)) as client:
+        result = client.place_order('sell', '1.234', '0.0500004', 'limit')
+        assert result['ok']
+        assert mock.orders[result['result']['order_id']]['orderedVolume'] == '1.23'
+
+
+def test_stale_specs_are_served_while_refresh_fails(mock, keys, monkeypatch):
+    pairs = stale_pairs()
+    with make_client(mock, keys, pairs) as client:
+        calls = []
+
+        def failing_fetch():
+            calls.append(1)
+            raise ConnectionError('gate is down')
+
+        monkeypatch.setattr(client, 'fetch_pairs', failing_fetch)
+        for _ in range(3):
+            assert client.place_order('sell', '1.234', '0.05', 'limit')['ok']
+        time.sleep(0.1)  # background refresh
+        assert calls == [1]  # not retried on every order
+        assert client.get_pair_spec().amount_step == pairs.get('DEL/USDT').amount_step
+
+        pairs.attempted -= pairs.retry_interval
+        monkeypatch.undo()
+        client.get_pair_spec()
+        for _ in range(100):
+            if pairs.is_fresh():
+                break
+            time.sleep(0.01)
+        assert pairs.is_fresh()
+
+
+def test_failed_first_download_does_not_abort_order(mock, keys, monkeypatch):
+    with make_client(mock, keys, PairMetadata(path=None)) as client:
+        def failing_fetch():
+            raise ConnectionError('gate is down')
+
+        monkeypatch.setattr(client, 'fetch_pairs', failing_fetch)
+        assert client.get_pair_spec() is None
+        result = client.place_order('sell', '1', '0.05', 'limit')  # sent unchecked
+        assert result['ok']
+
+
+def test_async_refresh_in_background(mock, keys):
+    async def main():
+        pairs = stale_pairs()
+        async with make_client(mock, keys, pairs, AsyncKickex) as client:
+            before = mock.requests
+            assert (await client.place_order('sell', '1.234', '0.05', 'limit'))['ok']
+            await client.pairs_refresh
+            assert pairs.is_fresh()
+            assert mock.requests == before + 2  # order and pairs
+
+    asyncio.run(main())
+
+
+def test_cache_file_only_with_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    PairMetadata().update(MockKickex.PAIRS)
+    assert list(tmp_path.iterdir()) == []
+
+    path = str(tmp_path / 'pairs.json')
+    PairMetadata(path=path).update(MockKickex.PAIRS)
+    pairs = PairMetadata(path=path)
+    assert pairs.is_fresh()
+    assert pairs.get('DEL/USDT') is not None
@@ -0,0 +1,37 @@
+import pytest
+
+from paper_exchange import PaperExchange, synthetic_books
+
+
+@pytest.mark.parametrize('numeric', ['float', 'fixed'])
+def test_parse_order_matches_parse_orders(numeric):
+    exchange = PaperExchange(
+        'del_usdt', balances={'USDT': '1000000', 'DEL': '1000000'},
+        fee_rate='0.001', numeric=numeric,
+    )
+    books = synthetic_books(seed=1)
+    exchange.load_order_book(next(books))
+    for i in range(300):
+        if i % 10 == 0:
+            exchange.load_order_book(next(books))
+        side = 'buy' if i % 2 else 'sell'
+        price = f'{1 + (i % 7 - 3) / 100:.4f}'
+        result = exchange.place_order(side, f'{0.1 + i % 13 / 3:.6f}', price, 'limit')
+        assert result['ok']
+        if i % 5 == 0:
+            exchange.cancel_order(str(result['result']['order_id']))
+
+    larger_than_book = exchange.place_order('buy', '100000', '2', 'limit')['result']
+    exchange.cancel_order(str(larger_than_book['order_id']))
+
+    statuses = set()
+    for order in exchange.orders.values():
+        expected = exchange.parse_orders([exchange.raw_order(order)])[0]
+        parsed = exchange.parse_order(order)
+        assert parsed == expected
+        assert [type(value) for value in parsed.values()] == [
+            type(value) for value in expected.values()
+        ]
+        statuses.add(parsed['status'])
+        assert exchange.get_order_state(str(order.order_id)) == {'ok': True, 'result': expected}
+    assert statuses == {'accepted', 'executed', 'partially executed', 'cancelled'}
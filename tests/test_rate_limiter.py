@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+
+from rate_limiter import CRITICAL, LOW, MARKET, NORMAL, TRADING, RequestScheduler
+
+
+class FakeClock:
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def wait_until(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.001)
+
+
+def make_scheduler(clock):
+    return RequestScheduler({TRADING: (1, 1)}, clock=clock, account_limit=None)
+
+
+def test_burst_then_rate():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+    assert scheduler.acquire(TRADING) == 0
+    assert scheduler.buckets[TRADING].wait_time() == 1.0
+    clock.now += 0.5
+    assert scheduler.buckets[TRADING].wait_time() == 0.5
+    clock.now += 0.5
+    assert scheduler.acquire(TRADING) == 0
+
+
+def test_critical_goes_before_queued_polling():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+    scheduler.acquire(TRADING)  # bucket is empty now
+    served = []
+
+    def acquire(priority):
+        scheduler.acquire(TRADING, priority)
+        served.append(priority)
+
+    for priority, depth in ((NORMAL, 1), (CRITICAL, 2)):
+        threading.Thread(target=acquire, args=(priority,), daemon=True).start()
+        wait_until(lambda: len(scheduler.queues[TRADING]) == depth)
+
+    clock.now += 1
+    scheduler.wake()
+    wait_until(lambda: served == [CRITICAL])
+    clock.now += 1
+    scheduler.wake()
+    wait_until(lambda: served == [CRITICAL, NORMAL])
+
+    metrics = scheduler.metrics()[TRADING]
+    assert metrics['requests'] == 3
+    assert metrics['waited'] == 2
+    assert metrics['max_queue_depth'] == 2
+    assert metrics['max_wait_time'] == 2.0
+
+
+def test_cancelled_async_waiter_leaves_queue():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+
+    async def main():
+        scheduler.acquire(TRADING)
+        waiter = asyncio.create_task(scheduler.acquire_async(TRADING, CRITICAL))
+        await asyncio.sleep(0.01)
+        assert scheduler.queues[TRADING] == [(CRITICAL, 1)]
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.queues[TRADING] == []
+
+        clock.now += 1
+        await asyncio.wait_for(scheduler.acquire_async(TRADING, CRITICAL), 1)
+
+    asyncio.run(main())
+
+
+def test_interrupted_thread_waiter_leaves_queue(monkeypatch):
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+    scheduler.acquire(TRADING)
+
+    def interrupted_wait(timeout=None):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(scheduler._condition, 'wait', interrupted_wait)
+    try:
+        scheduler.acquire(TRADING, CRITICAL)
+    except KeyboardInterrupt:
+        pass
+    assert scheduler.queues[TRADING] == []
+    monkeypatch.undo()
+
+    clock.now += 1
+    assert scheduler.acquire(TRADING, CRITICAL) == 0
+
+
+def test_cancel_preempts_polling_of_other_group():
+    clock = FakeClock()
+    scheduler = RequestScheduler(
+        {MARKET: (10, 10), TRADING: (10, 10)}, clock=clock, account_limit=(1, 1),
+    )
+    scheduler.acquire(MARKET)  # account bucket is empty now
+    served = []
+
+    def acquire(group, priority):
+        scheduler.acquire(group, priority)
+        served.append(group)
+
+    for group, priority, depth in ((MARKET, NORMAL, 1), (MARKET, NORMAL, 2), (TRADING, CRITICAL, 1)):
+        threading.Thread(target=acquire, args=(group, priority), daemon=True).start()
+        wait_until(lambda: len(scheduler.queues[group]) == depth)
+
+    clock.now += 1
+    scheduler.wake()
+    wait_until(lambda: served == [TRADING])
+    time.sleep(0.05)
+    assert served == [TRADING]  # one token only
+    clock.now += 1
+    scheduler.wake()
+    wait_until(lambda: served == [TRADING, MARKET])
+
+
+def test_groups_keep_own_limits_under_account_limit():
+    clock = FakeClock()
+    scheduler = RequestScheduler({MARKET: (1, 1), TRADING: (1, 1)}, clock=clock, account_limit=(10, 10))
+    assert scheduler.acquire(MARKET, LOW) == 0
+    # MARKET is empty, a better ticket there doesn't hold TRADING back
+    threading.Thread(target=scheduler.acquire, args=(MARKET, CRITICAL), daemon=True).start()
+    wait_until(lambda: scheduler.queues[MARKET])
+    assert scheduler.acquire(TRADING, LOW) == 0
+    assert scheduler.account.tokens == 8
+    clock.now += 1
+    scheduler.wake()
+    wait_until(lambda: not scheduler.queues[MARKET])
@@ -0,0 +1,52 @@
+import pytest
+
+from async_kickex_api import AsyncKickex
+from kickex_api import Kickex
+from mock_exchange import MockKickex
+from recording import iter_records
+
+
+def test_record_then_replay(keys, tmp_path):
+    path = str(tmp_path / 'kickex.jsonl.gz')
+    with MockKickex(**keys) as mock, Kickex('del_usdt', **keys) as client:
+        client.BASE_URI = mock.base_uri
+        client.start_recording(path)
+        mock.book_depth = 5
+        eth_book = client.for_market('eth_usdt').get_order_book()
+        mock.book_depth = 3
+        del_book = client.get_order_book()
+        first = client.place_order('sell', '1', '1', 'limit')['result']['order_id']
+        second = client.place_order('buy', '2', '0.5', 'limit')['result']['order_id']
+        second_order = client.fetch_order(str(second))
+        first_order = client.fetch_order(str(first))
+        client.close()
+        requests = mock.requests
+
+    records = list(iter_records(path))
+    assert len(records) == 6
+    assert all('KICK-SIGNATURE' not in record['headers'] for record in records)
+    assert len(list(iter_records(path, '/order'))) == 2
+
+    with Kickex('del_usdt', **keys) as client:
+        client.BASE_URI = 'http://127.0.0.1:1/api/v1'  # nothing may reach network
+        client.start_replay(path, speed=None)
+        # other order than recorded
+        assert client.get_order_book() == del_book
+        assert client.for_market('eth_usdt').get_order_book() == eth_book
+        assert len(del_book['result']['asks']) == 3
+        assert client.place_order('sell', '1', '1', 'limit')['result']['order_id'] == first
+        assert client.place_order('buy', '2', '0.5', 'limit')['result']['order_id'] == second
+        assert client.fetch_order(str(first)) == first_order
+        assert client.fetch_order(str(second)) == second_order
+        assert first_order['orderId'] == str(first)
+        with pytest.raises(KeyError):
+            client.fetch_order(str(first))
+    assert mock.requests == requests
+
+
+def test_async_client_refuses_recording(keys, tmp_path):
+    client = AsyncKickex('del_usdt', **keys)
+    with pytest.raises(NotImplementedError):
+        client.start_recording(str(tmp_path / 'kickex.jsonl.gz'))
+    with pytest.raises(NotImplementedError):
+        client.start_replay(str(tmp_path / 'kickex.jsonl.gz'))
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+from aiohttp import web
+
+from fixed_point import Fixed
+from shared_books import STREAM, BookRing, MarketDataPublisher, SharedOrderBooks
+
+
+@pytest.fixture
+def prefix():
+    return f'test_books_{os.getpid()}'
+
+
+def test_low_price_high_amount_book_fits(prefix):
+    with MarketDataPublisher(['del_usdt'], prefix=prefix, max_levels=5) as publisher:
+        assert publisher.publish('del_usdt', {
+            'asks': [('0.00001234', '250000000000.0'), ('0.00001235', '1.123456789')],
+            'bids': [('0.00001233', '5')],
+        })
+        with SharedOrderBooks('del_usdt', prefix=prefix, numeric='fixed') as books:
+            result = books.get_order_book()['result']
+    assert result['asks'] == [
+        (Fixed.parse('0.00001234'), Fixed.parse('250000000000')),
+        (Fixed.parse('0.00001235'), Fixed.parse('1.1234568')),  # rounded to fit int64
+    ]
+    assert result['bids'] == [(Fixed.parse('0.00001233'), Fixed.parse('5'))]
+
+
+def test_failed_publish_keeps_previous_book(prefix):
+    with MarketDataPublisher(['del_usdt'], prefix=prefix, max_levels=5) as publisher:
+        assert publisher.publish('del_usdt', {'asks': [('1.5', '2')], 'bids': []})
+        assert not publisher.publish('del_usdt', {'asks': [('1', str(2 ** 64))], 'bids': []})
+        with SharedOrderBooks('del_usdt', prefix=prefix) as books:
+            assert books.get_order_book()['result'] == {'asks': [('1.5', '2')], 'bids': []}
+
+
+def test_ring_round_trip(prefix):
+    ring = BookRing.create(f'{prefix}_ring', slots=2, max_levels=2)
+    try:
+        for i in range(3):  # goes round the ring
+            ring.write({'asks': [(f'1.{i}', '1')], 'bids': [('0.9', '2.25')]}, timestamp=i)
+        (_, timestamp, n_asks, n_bids, price_decimals, amount_decimals), values = ring.read()
+        assert (timestamp, n_asks, n_bids, price_decimals, amount_decimals) == (2, 1, 1, 1, 2)
+        assert values[:2] == (12, 100)
+        assert values[4:6] == (9, 225)
+    finally:
+        ring.close()
+
+
+def test_levels_are_views_of_scaled_ints(prefix):
+    with MarketDataPublisher(['del_usdt'], prefix=prefix, max_levels=5) as publisher:
+        with SharedOrderBooks('del_usdt', prefix=prefix) as books:
+            assert not books.get_levels()['ok']
+            publisher.publish('del_usdt', {
+                'asks': [('1.01', '2'), ('1.02', '0.5')],
+                'bids': [('0.99', '3')],
+            })
+            levels = books.get_levels()['result']
+            publisher.publish('del_usdt', {'asks': [], 'bids': []})
+            assert books.get_levels()['result']['asks'].tolist() == []
+    # copy of the slot, not shared memory, later books don't change it
+    assert (levels['price_decimals'], levels['amount_decimals']) == (2, 1)
+    assert levels['asks'].tolist() == [101, 20, 102, 5]
+    assert levels['bids'].tolist() == [99, 30]
+
+
+class StreamServer:
+    """
+    Websocket answering every subscribe with a snapshot of levels,
+    in a thread with its own event loop.
+    """
+
+    def __init__(self, levels: dict) -> None:
+        self.levels = levels
+        self.subscribed = []
+
+        async def ws_handler(request):
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            subscribe = await ws.receive_json()
+            self.subscribed.append(subscribe['pair'])
+            await ws.send_json({'id': subscribe['id'], 'seq': 1, **self.levels[subscribe['pair']]})
+            async for _ in ws:  # until publisher stops the stream
+                pass
+            return ws
+
+        async def serve():
+            app = web.Application()
+            app.router.add_get('/ws', ws_handler)
+            self.runner = web.AppRunner(app)
+            await self.runner.setup()
+            await web.TCPSite(self.runner, '127.0.0.1', 0).start()
+            host, port = self.runner.addresses[0][:2]
+            self.ws_uri = f'ws://{host}:{port}/ws'
+
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(serve())
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def close(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+def test_stream_mode_publishes_every_market(prefix, keys):
+    server = StreamServer({
+        'DEL/USDT': {'asks': [{'price': '0.051', 'amount': '10'}], 'bids': [{'price': '0.05', 'amount': '7'}]},
+        'KICK/USDT': {'asks': [{'price': '0.011', 'amount': '3'}], 'bids': []},
+    })
+    try:
+        with MarketDataPublisher(
+                ['del_usdt', 'kick_usdt'], prefix=prefix, mode=STREAM, max_levels=5,
+                ws_uri=server.ws_uri, **keys,
+        ) as publisher:
+            publisher.start()
+            with SharedOrderBooks('del_usdt', prefix=prefix) as del_books, \
+                    SharedOrderBooks('kick_usdt', prefix=prefix) as kick_books:
+                deadline = time.monotonic() + 5
+                while not (del_books.get_order_book()['ok'] and kick_books.get_order_book()['ok']):
+                    assert time.monotonic() < deadline, 'timed out'
+                    time.sleep(0.01)
+                assert del_books.get_order_book()['result'] == {
+                    'asks': [('0.051', '10')], 'bids': [('0.050', '7')],
+                }
+                assert kick_books.get_order_book()['result'] == {'asks': [('0.011', '3')], 'bids': []}
+            publisher.stop()
+        assert sorted(server.subscribed) == ['DEL/USDT', 'KICK/USDT']
+    finally:
+        server.close()
@@ -0,0 +1,62 @@
+import hmac
+import types
+
+import pytest
+
+import signing
+from kickex_api import Kickex
+from signing import KickexSigner
+
+# computed with Kickex.get_signature before KickexSigner, keys of conftest.KEYS
+VECTORS = [
+    (
+        ('1700000000', 'GET', '/api/v1/order', 'orderId=1'),
+        'hSTbCbBHCZOShMy6j1aupR1xnxv6ahuqfzHPjmsTg+FJUyX+9X2mzZIpJWDuS17ogHUUu9bunaXFfeYfLnkrUQ==',
+    ),
+    (
+        ('1700000000', 'POST', '/api/v1/createTradeOrder', '{"pair":"DEL/USDT","ordered_volume":"1"}'),
+        'afQnwNVzAI4flm4Vbnbke+0iBltEkiGz3vopx/J8L1Oluku9DgxZDlCWK+VZqM4lEC86OtalhO26jO5T38bb8g==',
+    ),
+    (
+        ('1700000001', 'DELETE', '/api/v1/order', 'orderId=42'),
+        '8HaE+IwppLMDhRBHIUP2ZEi90w7HeVsQcgv8DsPdI9GQA8fWGM5E5iCfMI9EglLl7h/bJv/7QhrClZCUae3VRg==',
+    ),
+    (
+        ('1700000001', 'GET', '/api/v1/user/balance', ''),
+        'UoanCXc3gq0RZIB1GIYs9KewWYQixLnkpsaW5TEgj68hVJDp7gb5merlIjSnn9TCBSQNNolq9AeiNokn46TueA==',
+    ),
+]
+
+
+@pytest.mark.parametrize('arguments, expected', VECTORS)
+def test_vectors(keys, arguments, expected):
+    assert KickexSigner(**keys).sign(*arguments) == expected
+    assert Kickex('del_usdt', **keys).get_signature(*arguments) == expected
+
+
+def test_cached_rounds_follow_timestamp(keys):
+    signer = KickexSigner(**keys)
+    for arguments, expected in VECTORS * 2:  # timestamps go back and forth
+        assert signer.sign(*arguments) == expected
+
+
+def test_preempted_sign_does_not_poison_next_second(keys, monkeypatch):
+    """
+    Thread signing for one second is preempted between computing and
+    caching its rounds by a thread signing for the next second.
+    """
+    signer = KickexSigner(**keys)
+    calls = []
+
+    def new(key, message, digestmod):
+        calls.append(message)
+        if len(calls) == 2:  # path round of the first sign
+            signer.sign(*VECTORS[2][0])  # next second
+        return hmac.new(key, message, digestmod)
+
+    monkeypatch.setattr(signing, 'hmac', types.SimpleNamespace(new=new))
+    assert signer.sign(*VECTORS[0][0]) == VECTORS[0][1]
+    monkeypatch.undo()
+    assert signer.sign('1700000001', 'GET', '/api/v1/order', 'orderId=1') == (
+        'E+Z5/OQhzNE3I9qqQR4/3EDGPdJVZguym+40UV4XYA6qJzrxKdu3yP8woJbnCMQihKv3548LIoPpbX2IWfY/Ng=='
+    )